@@ -0,0 +1,152 @@
+# Backend/agents/rule_engine.py
+# Declarative suggestion rules. A Rule is a message plus the conditions that must all hold for it;
+# a RuleSet is an ordered table of rules with a fallback message for inputs no rule matches.
+# The same table is evaluated two ways with identical results: on one input dict with plain
+# Python comparisons (the single-input routes), and on a whole DataFrame of inputs as one NumPy
+# boolean mask per condition (the batch routes), so a fleet is scored in a few array operations.
+import operator
+from typing import Any, Callable, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+from Backend.preprocess.frame_encoding import lookup
+
+# Numeric comparisons; a missing or NaN value never matches
+COMPARISONS = {"<": operator.lt, "<=": operator.le, ">": operator.gt, ">=": operator.ge}
+OPERATORS = (*COMPARISONS, "is", "on")
+
+
+class Field:
+    """Names another input field as the right-hand side of a comparison, e.g. Condition('a', '<', Field('b'))."""
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __repr__(self):
+        return f"Field({self.name!r})"
+
+
+def _compile_test(field: str, op: str, expected: Any) -> Callable[[Dict[str, Any]], bool]:
+    # A closure per condition keeps the single-input path close to a hand-written if-chain
+    if isinstance(expected, Field):
+        compare, other = COMPARISONS[op], expected.name
+        def test(input_data):
+            value, bound = input_data.get(field), input_data.get(other)
+            return value is not None and bound is not None and compare(value, bound)
+        return test
+    if op == "on":
+        return lambda input_data: bool(input_data.get(field))
+    if op == "is":
+        def test(input_data):
+            value = input_data.get(field)
+            return value is not None and str(value).lower() == expected
+        return test
+    compare = COMPARISONS[op]
+    def test(input_data):
+        value = input_data.get(field)
+        return value is not None and compare(value, expected)
+    return test
+
+
+class Condition:
+    """
+    One test on an input field:
+      Condition('battery_percentage', '<', 20)  - numeric comparison ('<', '<=', '>', '>=')
+      Condition('predicted_range_km', '<', Field('distance_to_next_charger_km'))
+                                                - the same, against another field
+      Condition('driving_mode', 'is', 'normal') - case-insensitive string match
+      Condition('hvac_on', 'on')                - truthiness of the value
+    """
+
+    def __init__(self, field: str, op: str, value: Any = None):
+        if op not in OPERATORS:
+            raise ValueError(f"Unknown operator: {op}. Expected one of {OPERATORS}.")
+        if isinstance(value, Field) and op not in COMPARISONS:
+            raise ValueError(f"Only numeric comparisons can take a Field, not '{op}'.")
+        if op == "is":
+            value = str(value).lower()
+        self.field = field
+        self.op = op
+        self.value = value
+        self.test = _compile_test(field, op, value) # test(input_data) -> bool
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        if self.field not in df.columns:
+            return np.zeros(len(df), dtype=bool)
+        column = df[self.field]
+        if self.op == "on":
+            return column.astype(bool).to_numpy()
+        if self.op == "is":
+            return lookup(column, str.lower, {self.value: True}, False, dtype=bool)[0]
+        expected = self.value
+        if isinstance(expected, Field):
+            if expected.name not in df.columns:
+                return np.zeros(len(df), dtype=bool)
+            expected = _numeric(df[expected.name])
+        with np.errstate(invalid="ignore"):
+            return COMPARISONS[self.op](_numeric(column), expected)
+
+    def __repr__(self):
+        return f"Condition({self.field!r}, {self.op!r}" + (f", {self.value!r})" if self.op != "on" else ")")
+
+
+def _numeric(column: pd.Series) -> np.ndarray:
+    return pd.to_numeric(column, errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+class Rule:
+    """A suggestion shown when all of its conditions hold."""
+
+    def __init__(self, message: str, *conditions: Condition):
+        if not conditions:
+            raise ValueError(f"Rule has no conditions: {message!r}")
+        self.message = message
+        self.conditions = conditions
+        tests = [condition.test for condition in conditions]
+        if len(tests) == 1:
+            self.test = tests[0] # test(input_data) -> bool
+        else:
+            self.test = lambda input_data: all([test(input_data) for test in tests])
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        result = self.conditions[0].mask(df)
+        for condition in self.conditions[1:]:
+            result = result & condition.mask(df)
+        return result
+
+
+class RuleSet:
+    """Ordered rules; an input gets the messages of every matching rule, in table order, or the fallback."""
+
+    def __init__(self, rules: Sequence[Rule], fallback: str):
+        if len(rules) > 62:
+            raise ValueError("A RuleSet holds at most 62 rules (outcomes are packed into an int64).")
+        self.rules = list(rules)
+        self.fallback = fallback
+        self._tests = [(rule.message, rule.test) for rule in self.rules]
+
+    def suggest(self, input_data: Dict[str, Any]) -> List[str]:
+        suggestions = [message for message, test in self._tests if test(input_data)]
+        return suggestions or [self.fallback]
+
+    def masks(self, df: pd.DataFrame) -> np.ndarray:
+        """(len(df), len(rules)) boolean matrix: which rules match which input."""
+        masks = np.zeros((len(df), len(self.rules)), dtype=bool)
+        for j, rule in enumerate(self.rules):
+            masks[:, j] = rule.mask(df)
+        return masks
+
+    def suggest_frame(self, df: pd.DataFrame) -> List[List[str]]:
+        """
+        suggest() for every row of 'df'. Rows are grouped by which rules they match, so the message
+        lists are built once per distinct outcome; rows with the same outcome share one list.
+        """
+        masks = self.masks(df)
+        outcomes = masks @ (np.int64(1) << np.arange(len(self.rules), dtype=np.int64))
+        unique, inverse = np.unique(outcomes, return_inverse=True)
+        messages = []
+        for outcome in unique:
+            suggestions = [rule.message for j, rule in enumerate(self.rules) if outcome >> j & 1]
+            messages.append(suggestions or [self.fallback])
+        return [messages[i] for i in inverse.ravel()]
@@ -2,63 +2,63 @@
 
 from typing import List, Dict, Any
 
-# These imports assume the input data will be passed as a dictionary
-# directly from the validated Pydantic models.
+import pandas as pd
+
+from Backend.agents.rule_engine import Condition, Field, Rule, RuleSet
+
+# Inputs are dictionaries from the validated Pydantic models (or DataFrames of them for the
+# batch functions). To add a suggestion, add a Rule to the table; rules are checked in order.
+# Rules on 'predicted_range_km' only fire on the combined predict-and-suggest routes, which add
+# the prediction to the input; a missing field never matches.
+
+# --- Rule table for EV suggestions (keys match the EVInput schema) ---
+EV_RULES = RuleSet([
+    Rule("Your predicted range is shorter than the distance to the next charging station. Charge before continuing, or slow down and limit HVAC use to stretch your range.",
+         Condition('predicted_range_km', '<', Field('distance_to_next_charger_km'))),
+    Rule("Your battery is low. Consider finding a charging station soon.",
+         Condition('battery_percentage', '<', 20)),
+    Rule("Your battery is aging. Regular check-ups can help maintain performance.",
+         Condition('battery_age_years', '>', 5)),
+    Rule("In cold weather, pre-conditioning your EV while plugged in can save significant range.",
+         Condition('ambient_temp', 'is', 'cold'), Condition('hvac_on', 'on')),
+    Rule("High speeds reduce range. Consider engaging 'Eco' mode for better efficiency on highways.",
+         Condition('speed_avg_kmph', '>', 100), Condition('driving_mode', 'is', 'normal')),
+    Rule("Turning off HVAC when not essential can significantly extend your EV's range.",
+         Condition('hvac_on', 'on')),
+], fallback="No specific suggestions at this moment, keep driving safely!")
+
+# --- Rule table for HV suggestions (keys match the HVInput schema) ---
+HV_RULES = RuleSet([
+    Rule("Your predicted range is shorter than the distance to the next hydrogen station. Refuel before continuing, or drive more gently to stretch your range.",
+         Condition('predicted_range_km', '<', Field('distance_to_next_station_km'))),
+    Rule("Your hydrogen tank is low. Plan for a refuel soon.",
+         Condition('hydrogen_percentage', '<', 15)),
+    Rule("Your fuel cell is aging. Regular inspections are recommended for optimal performance.",
+         Condition('fuel_cell_age_years', '>', 7)),
+    Rule("Consider a fuel cell system check-up to improve efficiency.",
+         Condition('fuel_cell_efficiency', '<', 60)),
+    Rule("Aggressive acceleration on steep slopes consumes more hydrogen. Try a gentler approach.",
+         Condition('terrain_slope', '>', 10), Condition('acceleration_level', '>', 0.5)),
+    Rule("Sport mode prioritizes power over efficiency. For better range, switch to 'Normal' or 'Eco' mode.",
+         Condition('driving_mode', 'is', 'sport')),
+], fallback="No specific suggestions at this moment, enjoy your drive!")
+
 
 # --- Rule-based agent for EV suggestions ---
 def get_ev_suggestions(input_data: Dict[str, Any]) -> List[str]:
-    suggestions = []
-
-    # Accessing input data (ensure keys match EVInput schema)
-    battery_percentage = input_data.get('battery_percentage')
-    battery_age_years = input_data.get('battery_age_years')
-    ambient_temp = input_data.get('ambient_temp')
-    speed_avg_kmph = input_data.get('speed_avg_kmph')
-    hvac_on = input_data.get('hvac_on') # This will be boolean due to schema
-    driving_mode = input_data.get('driving_mode')
+    return EV_RULES.suggest(input_data)
 
-    # Example Rules for EV
-    if battery_percentage is not None and battery_percentage < 20:
-        suggestions.append("Your battery is low. Consider finding a charging station soon.")
-    if battery_age_years is not None and battery_age_years > 5:
-        suggestions.append("Your battery is aging. Regular check-ups can help maintain performance.")
-    if ambient_temp is not None and ambient_temp.lower() == 'cold' and hvac_on:
-        suggestions.append("In cold weather, pre-conditioning your EV while plugged in can save significant range.")
-    if speed_avg_kmph is not None and speed_avg_kmph > 100 and driving_mode.lower() == 'normal':
-        suggestions.append("High speeds reduce range. Consider engaging 'Eco' mode for better efficiency on highways.")
-    if hvac_on:
-        suggestions.append("Turning off HVAC when not essential can significantly extend your EV's range.")
 
-    if not suggestions:
-        suggestions.append("No specific suggestions at this moment, keep driving safely!")
+def get_ev_suggestions_batch(inputs: pd.DataFrame) -> List[List[str]]:
+    """get_ev_suggestions for every row of a DataFrame of EV inputs, evaluated as NumPy masks."""
+    return EV_RULES.suggest_frame(inputs)
 
-    return suggestions
 
 # --- Rule-based agent for HV suggestions ---
 def get_hv_suggestions(input_data: Dict[str, Any]) -> List[str]:
-    suggestions = []
-
-    # Accessing input data (ensure keys match HVInput schema)
-    hydrogen_percentage = input_data.get('hydrogen_percentage')
-    fuel_cell_age_years = input_data.get('fuel_cell_age_years')
-    fuel_cell_efficiency = input_data.get('fuel_cell_efficiency')
-    terrain_slope = input_data.get('terrain_slope')
-    acceleration_level = input_data.get('acceleration_level')
-    driving_mode = input_data.get('driving_mode')
-
-    # Example Rules for HV
-    if hydrogen_percentage is not None and hydrogen_percentage < 15:
-        suggestions.append("Your hydrogen tank is low. Plan for a refuel soon.")
-    if fuel_cell_age_years is not None and fuel_cell_age_years > 7:
-        suggestions.append("Your fuel cell is aging. Regular inspections are recommended for optimal performance.")
-    if fuel_cell_efficiency is not None and fuel_cell_efficiency < 60:
-        suggestions.append("Consider a fuel cell system check-up to improve efficiency.")
-    if terrain_slope is not None and terrain_slope > 10 and acceleration_level is not None and acceleration_level > 0.5:
-        suggestions.append("Aggressive acceleration on steep slopes consumes more hydrogen. Try a gentler approach.")
-    if driving_mode is not None and driving_mode.lower() == 'sport':
-        suggestions.append("Sport mode prioritizes power over efficiency. For better range, switch to 'Normal' or 'Eco' mode.")
+    return HV_RULES.suggest(input_data)
 
-    if not suggestions:
-        suggestions.append("No specific suggestions at this moment, enjoy your drive!")
 
-    return suggestions
\ No newline at end of file
+def get_hv_suggestions_batch(inputs: pd.DataFrame) -> List[List[str]]:
+    """get_hv_suggestions for every row of a DataFrame of HV inputs, evaluated as NumPy masks."""
+    return HV_RULES.suggest_frame(inputs)
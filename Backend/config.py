@@ -0,0 +1,81 @@
+# Backend/config.py
+# Runtime settings for the API, read from environment variables with safe defaults.
+import os
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+# --- Micro-batching of single-row predictions (Backend/models/micro_batcher.py) ---
+# Concurrent /predict/ev and /predict/hv requests are gathered into one model call of up to
+# MICRO_BATCH_MAX_SIZE rows, waiting at most MICRO_BATCH_MAX_WAIT_MS for the batch to fill.
+# MICRO_BATCH_MAX_SIZE=1 turns batching off.
+MICRO_BATCH_MAX_SIZE = _env_int("MICRO_BATCH_MAX_SIZE", 64)
+MICRO_BATCH_MAX_WAIT_MS = _env_float("MICRO_BATCH_MAX_WAIT_MS", 2.0)
+
+# --- Prediction cache (Backend/models/prediction_cache.py) ---
+# Single-row predictions are cached per model, keyed on the encoded feature row and the model
+# file version. PREDICTION_CACHE_SIZE=0 turns caching off.
+PREDICTION_CACHE_SIZE = _env_int("PREDICTION_CACHE_SIZE", 10000)
+PREDICTION_CACHE_TTL_S = _env_float("PREDICTION_CACHE_TTL_S", 300.0)
+
+# --- Model loading (Backend/models/registry.py) ---
+# Models load lazily on first use. At startup they can also be warmed up in parallel:
+# "background" starts serving right away while the models load, "blocking" waits for them,
+# "off" loads each model on its first request.
+MODEL_WARM_UP = os.getenv("MODEL_WARM_UP", "background")
+
+# Model artifact served by the API: "joblib" (sklearn-wrapped XGBRegressor), "native"
+# (bare xgboost.Booster exported by Backend/scripts/export_booster.py) or "compiled"
+# (NumPy tree arrays from Backend/scripts/compile_trees.py, evaluated without XGBoost)
+MODEL_FORMAT = os.getenv("MODEL_FORMAT", "joblib")
+
+# Hot reload (ModelRegistry.reload, POST /admin/models/{name}/reload). With MODEL_RELOAD_POLL_S > 0
+# a background thread checks the served model files that often and reloads one once its mtime has
+# changed and then stayed the same for one more check (so half-written files are skipped).
+# A reloaded model is rejected when its predictions on the smoke rows move by more than
+# MODEL_RELOAD_MAX_DRIFT of their mean magnitude (0 turns that check off).
+MODEL_RELOAD_POLL_S = _env_float("MODEL_RELOAD_POLL_S", 0.0)
+MODEL_RELOAD_MAX_DRIFT = _env_float("MODEL_RELOAD_MAX_DRIFT", 0.5)
+
+# --- Process-pool scoring (Backend/models/process_pool.py) ---
+# Batch requests of at least PROCESS_POOL_MIN_ROWS valid rows are scored across
+# PROCESS_POOL_WORKERS processes; smaller ones stay in process. 0 workers turns the pool off.
+PROCESS_POOL_WORKERS = _env_int("PROCESS_POOL_WORKERS", 0)
+PROCESS_POOL_MIN_ROWS = _env_int("PROCESS_POOL_MIN_ROWS", 10000)
+
+# --- Metrics (Backend/utils/metrics.py, GET /metrics) ---
+# Per-route request counts and latency histograms per stage, in the Prometheus text format.
+# METRICS_ENABLED=0 removes the timing middleware (stage timers then do nothing).
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") not in ("0", "false", "False")
+
+# --- Bulk streaming scorer (Backend/routes/bulk.py) ---
+# Uploads are buffered in memory up to this size and spill to a temporary file beyond it
+BULK_SPOOL_MAX_MEMORY_BYTES = _env_int("BULK_SPOOL_MAX_MEMORY_BYTES", 8 * 1024 * 1024)
+
+# --- What-if sweeps (Backend/utils/sweep.py, POST /predict/{ev,hv}/sweep) ---
+# Largest grid (product of the axis lengths) one sweep request may score
+SWEEP_MAX_POINTS = _env_int("SWEEP_MAX_POINTS", 250000)
+
+# --- Trip simulation (Backend/utils/trip.py, POST /predict/{ev,hv}/trip) ---
+# Every pass scores all segments in one batch; passes repeat until no segment's starting
+# percentage moves by more than TRIP_TOLERANCE_PERCENT, or TRIP_MAX_PASSES is reached
+TRIP_MAX_SEGMENTS = _env_int("TRIP_MAX_SEGMENTS", 20000)
+TRIP_MAX_PASSES = _env_int("TRIP_MAX_PASSES", 10)
+TRIP_TOLERANCE_PERCENT = _env_float("TRIP_TOLERANCE_PERCENT", 0.01)
+
+# --- Charging/refuel stop planning (Backend/utils/stop_planner.py, POST /predict/{ev,hv}/stops) ---
+# Road graphs are the <name>.json files in ROAD_GRAPH_DIR. The predicted range of each edge is
+# memoized per graph for the vehicle's level rounded down to ROUTE_LEVEL_BUCKET_PERCENT, so
+# repeated plans on the same graph mostly skip the model. ROUTE_EDGE_CACHE_SIZE=0 turns that off.
+ROAD_GRAPH_DIR = os.getenv("ROAD_GRAPH_DIR", os.path.join(os.path.dirname(__file__), "data", "graphs"))
+ROUTE_LEVEL_BUCKET_PERCENT = _env_float("ROUTE_LEVEL_BUCKET_PERCENT", 5.0)
+ROUTE_EDGE_CACHE_SIZE = _env_int("ROUTE_EDGE_CACHE_SIZE", 100000)
+ROUTE_EDGE_CACHE_TTL_S = _env_float("ROUTE_EDGE_CACHE_TTL_S", 3600.0)
+# Search labels (node, time, level) one plan may create before it gives up
+ROUTE_MAX_LABELS = _env_int("ROUTE_MAX_LABELS", 200000)
@@ -1,18 +1,45 @@
 # Backend/main.py
 
+import threading
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from Backend.routes.predict_ev import router as ev_router # Explicitly import router as alias
 from Backend.routes.predict_hv import router as hv_router # Explicitly import router as alias
 from Backend.routes.suggestions import router as suggestion_router # New import for suggestions
+from Backend.routes.admin import router as admin_router
+from Backend.routes.bulk import router as bulk_router
+from Backend.routes.metrics import router as metrics_router
+from Backend.models.registry import registry
+from Backend.models.model_watcher import ModelWatcher
+from Backend.models.process_pool import shutdown_process_pool
+from Backend.utils.metrics import MetricsMiddleware
+from Backend.config import MODEL_WARM_UP, MODEL_RELOAD_POLL_S, METRICS_ENABLED
 import logging
 
 # logging setup
 logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Models load lazily; warming them up here moves the first-request cost to startup
+    if MODEL_WARM_UP == "blocking":
+        registry.warm_up(parallel=True)
+    elif MODEL_WARM_UP == "background":
+        threading.Thread(target=registry.warm_up, kwargs={"parallel": True}, name="model-warm-up", daemon=True).start()
+    # New model files are swapped in without a restart (see ModelRegistry.reload)
+    watcher = ModelWatcher(registry, MODEL_RELOAD_POLL_S) if MODEL_RELOAD_POLL_S > 0 else None
+    if watcher is not None:
+        watcher.start()
+    yield
+    if watcher is not None:
+        watcher.stop()
+    shutdown_process_pool()
+
 app = FastAPI(
     title="EV + HV Range Predictor & Suggestions", # Updated title
-    version="2.0"
+    version="2.0",
+    lifespan=lifespan
 )
 
 app.add_middleware(
@@ -23,7 +50,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Request counts and per-stage timings for GET /metrics
+if METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
 # Register routers with prefixes and tags for better organization in docs
 app.include_router(ev_router, prefix="/predict", tags=["EV Prediction"])
 app.include_router(hv_router, prefix="/predict", tags=["HV Prediction"])
-app.include_router(suggestion_router, prefix="/suggest", tags=["Suggestions"]) # New router inclusion
\ No newline at end of file
+app.include_router(bulk_router, prefix="/predict", tags=["Bulk Prediction"])
+app.include_router(suggestion_router, prefix="/suggest", tags=["Suggestions"]) # New router inclusion
+app.include_router(admin_router, prefix="/admin", tags=["Admin"])
+app.include_router(metrics_router, tags=["Metrics"])
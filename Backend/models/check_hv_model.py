@@ -1,9 +1,7 @@
-import joblib
-import os
+from Backend.models.registry import registry
 
 try:
-    model_path = os.path.join(os.path.dirname(__file__), "hv_model.joblib")
-    model = joblib.load(model_path)
-    print("HV model loaded successfully!")
+    loaded = registry.get("hv")
+    print(f"HV model loaded successfully! (version {loaded.version}, {loaded.load_seconds:.2f}s)")
 except Exception as e:
-    print(f"Error loading HV model: {e}")
\ No newline at end of file
+    print(f"Error loading HV model: {e}")
@@ -0,0 +1,84 @@
+# Backend/models/micro_batcher.py
+import asyncio
+import logging
+import time
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from Backend.utils.metrics import observe_batch
+
+
+class MicroBatcher:
+    """
+    Gathers concurrent single-row predictions into one vectorized model call.
+
+    A batch is flushed as soon as it holds 'max_batch_size' rows, or 'max_wait_ms' after its
+    first row arrived, whichever comes first. The model call runs in the default executor so the
+    event loop keeps collecting the next batch meanwhile. Each caller gets back its own row's value.
+    """
+
+    def __init__(self, predict_fn: Callable[[np.ndarray], np.ndarray], max_batch_size: int = 64, max_wait_ms: float = 2.0,
+                 name: str = "model"):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1.")
+        self.predict_fn = predict_fn
+        self.name = name # Label of the batch size and predict time metrics
+        self.max_batch_size = max_batch_size
+        self.max_wait_s = max_wait_ms / 1000.0
+
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._pending: List[Tuple[np.ndarray, asyncio.Future]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._tasks: set = set()
+
+        # Totals, e.g. for the average batch size
+        self.batches = 0
+        self.rows = 0
+
+    async def predict(self, row: np.ndarray) -> float:
+        """Queues one feature row and waits for its prediction."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # First call, or the app was restarted on a new loop: nothing pending can be served anymore
+            self._loop = loop
+            self._pending = []
+            self._timer = None
+
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_wait_s, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = self._loop.create_task(self._run(batch))
+        self._tasks.add(task) # Keep a reference until the task is done
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch: List[Tuple[np.ndarray, asyncio.Future]]):
+        rows = np.vstack([row for row, _ in batch])
+        start = time.perf_counter()
+        try:
+            predictions = await self._loop.run_in_executor(None, self.predict_fn, rows)
+        except Exception as e:
+            logging.error(f"Batched prediction of {len(batch)} rows failed: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.rows += len(batch)
+        observe_batch(self.name, "micro_batch", len(batch), time.perf_counter() - start)
+        for (_, future), prediction in zip(batch, predictions):
+            if not future.done(): # The caller may have been cancelled (client disconnect)
+                future.set_result(float(prediction))
@@ -1,11 +1,96 @@
 # Backend/models/model_loader.py
 import joblib
+import hashlib
+import json
+import logging
 import os
 
+EV_MODEL_PATH = os.path.join(os.path.dirname(__file__), "ev_model.joblib")
+HV_MODEL_PATH = os.path.join(os.path.dirname(__file__), "hv_model.joblib")
+
+# Native XGBoost boosters written by Backend/scripts/export_booster.py, each with a
+# '<name>.meta.json' sidecar describing the features it expects
+EV_BOOSTER_PATH = os.path.join(os.path.dirname(__file__), "ev_model.ubj")
+HV_BOOSTER_PATH = os.path.join(os.path.dirname(__file__), "hv_model.ubj")
+BOOSTER_SCHEMA_VERSION = 1
+
+# Flat NumPy tree arrays written by Backend/scripts/compile_trees.py
+EV_COMPILED_PATH = os.path.join(os.path.dirname(__file__), "ev_model.trees.npz")
+HV_COMPILED_PATH = os.path.join(os.path.dirname(__file__), "hv_model.trees.npz")
+
 def load_ev_model():
-    model_path = os.path.join(os.path.dirname(__file__), "ev_model.joblib")
-    return joblib.load(model_path)
+    return joblib.load(EV_MODEL_PATH)
 
 def load_hv_model(): # This function must be present exactly like this
-    model_path = os.path.join(os.path.dirname(__file__), "hv_model.joblib")
-    return joblib.load(model_path)
\ No newline at end of file
+    return joblib.load(HV_MODEL_PATH)
+
+def model_file_version(path: str) -> str:
+    """Short content hash of a model file; changes whenever the model is retrained."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:12]
+
+def booster_metadata_path(booster_path: str) -> str:
+    return os.path.splitext(booster_path)[0] + ".meta.json"
+
+def source_model_path(artifact_path: str) -> str:
+    """The joblib model an exported artifact is derived from, e.g. ev_model.trees.npz -> ev_model.joblib."""
+    directory, filename = os.path.split(artifact_path)
+    return os.path.join(directory, filename.split(".")[0] + ".joblib")
+
+
+class StaleArtifactError(ValueError):
+    """An exported booster or compiled trees file was derived from another version of its joblib model."""
+
+
+def check_source_version(artifact_path: str, source_model_version: str | None):
+    """
+    Refuses an artifact exported from another version of the joblib model next to it, e.g. after a
+    retrain that did not re-export it. Artifacts that record no source version only get a warning.
+    """
+    source_path = source_model_path(artifact_path)
+    if not os.path.exists(source_path):
+        return # Deployed without its joblib model; nothing to compare with
+    if source_model_version is None:
+        logging.warning(f"{artifact_path} does not record the joblib version it was exported from; "
+                        f"it may be stale. Re-export it to record one.")
+        return
+    current = model_file_version(source_path)
+    if source_model_version != current:
+        raise StaleArtifactError(f"{artifact_path} was exported from version {source_model_version} of {source_path}, "
+                                 f"which is now version {current}. Re-run Backend/scripts/export_booster.py and "
+                                 f"Backend/scripts/compile_trees.py (or retrain with Backend/scripts/train.py).")
+
+
+class NativeBoosterModel:
+    """
+    A bare xgboost.Booster with the predict() interface of the sklearn wrapper.
+    Predictions go through inplace_predict, which skips building a DMatrix.
+    """
+
+    def __init__(self, booster, metadata: dict):
+        self.booster = booster
+        self.metadata = metadata
+
+    def predict(self, X):
+        return self.booster.inplace_predict(X)
+
+
+def load_native_booster(path: str) -> NativeBoosterModel:
+    """Loads a booster exported by export_booster.py and checks it against its metadata sidecar."""
+    import xgboost # Deferred so that importing this module stays cheap
+
+    with open(booster_metadata_path(path)) as f:
+        metadata = json.load(f)
+    if metadata.get("schema_version") != BOOSTER_SCHEMA_VERSION:
+        raise ValueError(f"Unsupported booster metadata schema {metadata.get('schema_version')} in {path}; "
+                         f"expected {BOOSTER_SCHEMA_VERSION}. Re-run Backend/scripts/export_booster.py.")
+
+    check_source_version(path, metadata.get("source_model_version"))
+
+    booster = xgboost.Booster(model_file=path)
+    if booster.feature_names != metadata["feature_names"]:
+        raise ValueError(f"Feature names of {path} do not match its metadata sidecar.")
+    return NativeBoosterModel(booster, metadata)
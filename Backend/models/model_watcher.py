@@ -0,0 +1,68 @@
+# Backend/models/model_watcher.py
+import logging
+import os
+import threading
+from typing import Dict
+
+from Backend.models.registry import ModelRegistry, ModelReloadError
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None # Mid-replace or removed; look again on the next check
+
+
+class ModelWatcher:
+    """
+    Polls the files of the loaded models and hot-reloads one when it changes.
+
+    A changed mtime must be seen on two checks in a row before the reload, so a file that is
+    still being written (e.g. joblib.dump by the training pipeline) is not picked up half done.
+    Models not loaded yet are skipped: their first use loads the new file anyway.
+    """
+
+    def __init__(self, registry: ModelRegistry, interval_s: float):
+        self.registry = registry
+        self.interval_s = interval_s
+        self._seen: Dict[str, int | None] = {} # mtime each model was last loaded (or checked) at
+        self._pending: Dict[str, int] = {} # Changed mtimes waiting for one more check
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        for name in self.registry.names():
+            self._seen[name] = _mtime(self.registry.path(name))
+        self._thread = threading.Thread(target=self._run, name="model-watcher", daemon=True)
+        self._thread.start()
+        logging.info(f"Watching model files for changes every {self.interval_s:g}s")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            for name in self.registry.names():
+                self.check(name)
+
+    def check(self, name: str):
+        mtime = _mtime(self.registry.path(name))
+        if mtime is None or mtime == self._seen.get(name):
+            self._pending.pop(name, None)
+            return
+        if self._pending.get(name) != mtime:
+            self._pending[name] = mtime # Reload on the next check if the file has settled
+            return
+        del self._pending[name]
+        self._seen[name] = mtime
+        if not self.registry.is_loaded(name):
+            return
+        try:
+            self.registry.reload(name)
+        except ModelReloadError:
+            pass # Logged by the registry; the next change to the file is tried again
+        except Exception as e:
+            logging.error(f"Reloading model '{name}' failed: {e}")
@@ -0,0 +1,74 @@
+# Backend/models/prediction_cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Hashable
+
+
+class PredictionCache:
+    """
+    Bounded LRU cache of predictions with a time-to-live.
+
+    Keys should be built with make_key() from the model version and the encoded feature row,
+    so equivalent inputs (e.g. 'Eco' vs 'eco') share an entry and a retrained model never
+    serves stale values. max_size=0 disables caching.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl_s: float = 300.0):
+        self.max_size = max_size
+        self.ttl_s = ttl_s
+        self._entries: OrderedDict = OrderedDict() # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0 # Dropped to stay within max_size
+        self.expirations = 0 # Dropped because the TTL ran out
+
+    @staticmethod
+    def make_key(model_version: str, row) -> Hashable:
+        return (model_version, row.tobytes())
+
+    def get(self, key: Hashable) -> float | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: float):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl_s, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl_s": self.ttl_s,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -0,0 +1,172 @@
+# Backend/models/process_pool.py
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Iterable, Tuple
+
+import numpy as np
+
+# Models of this worker process, in its own registry (filled by _init_worker)
+_worker_registry = None
+
+
+class ModelVersionError(RuntimeError):
+    """A worker cannot load the model version the parent serves (the file on disk has changed)."""
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attaches to a block owned by the parent; only the parent unlinks it."""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False) # Python 3.13+
+    except TypeError:
+        # Spawned workers share the parent's resource tracker, where the block is already registered
+        return shared_memory.SharedMemory(name=name)
+
+
+def _init_worker(models):
+    # Parallelism comes from the processes; one XGBoost thread each avoids oversubscribing the cores
+    os.environ["OMP_NUM_THREADS"] = "1"
+    global _worker_registry
+    from Backend.models.registry import MODEL_LOADERS, ModelRegistry
+    # No smoke rows: the parent has already checked every version it asks the workers to score with
+    _worker_registry = ModelRegistry()
+    for name, path, model_format in models:
+        _worker_registry.register(name, path, MODEL_LOADERS[model_format])
+        _worker_registry.get(name)
+
+
+def _served_model(name: str, version: str):
+    """The worker's model at 'version', reloading its file when the parent has moved to another version."""
+    model = _worker_registry.get(name)
+    if model.version != version:
+        _worker_registry.reload(name)
+        model = _worker_registry.get(name)
+    if model.version != version:
+        # E.g. the parent rejected the new file, or has not reloaded it yet: scoring with the file on
+        # disk would answer this batch with another model than single rows get
+        raise ModelVersionError(f"Model '{name}': the parent serves version {version}, but {model.path} now holds "
+                                f"version {model.version}. Reload the model (POST /admin/models/{name}/reload) "
+                                f"or restore its file.")
+    return model
+
+
+def _score_slice(name: str, version: str, in_name: str, out_name: str, n_rows: int, n_features: int, start: int, stop: int):
+    model = _served_model(name, version)
+    in_shm, out_shm = _attach(in_name), _attach(out_name)
+    try:
+        X = np.ndarray((n_rows, n_features), dtype=np.float32, buffer=in_shm.buf)
+        out = np.ndarray((n_rows,), dtype=np.float32, buffer=out_shm.buf)
+        out[start:stop] = model.predict(X[start:stop])
+        del X, out # Release the buffer views before closing
+    finally:
+        in_shm.close()
+        out_shm.close()
+
+
+class ProcessPoolScorer:
+    """
+    Scores large feature matrices across worker processes.
+
+    Each worker loads every model once from the file the parent's registry serves, in the same
+    format, and reloads one when the parent serves another version. A worker only scores with
+    the exact version the parent serves; when its file no longer holds that version the batch
+    fails with ModelVersionError. A matrix is copied once into a shared-memory block; workers read their row range from it and write predictions
+    into a second shared block, so no DataFrame or array is pickled between processes.
+    """
+
+    def __init__(self, workers: int, names: Iterable[str] = ("ev", "hv"),
+                 models: Dict[str, Tuple[str, str]] | None = None):
+        """
+        The workers serve 'names' as the app's registry does. 'models' instead maps names to
+        explicit (path, MODEL_FORMAT) pairs, e.g. for a script scoring given files; those are
+        pinned to the version of each file when the pool starts.
+        """
+        from Backend.config import MODEL_FORMAT
+        from Backend.models.registry import registry
+        self.workers = workers
+        if models is None:
+            self._versions = None # Follow the version the registry serves
+            models = {name: (registry.path(name), MODEL_FORMAT) for name in names}
+        else:
+            from Backend.models.model_loader import model_file_version
+            self._versions = {name: model_file_version(path) for name, (path, _) in models.items()}
+        models = tuple((name, path, model_format) for name, (path, model_format) in models.items())
+        # spawn, not fork: the API process runs threads (event loop, executor) that fork would copy mid-state
+        self._pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker, initargs=(models,))
+
+    def predict(self, name: str, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=np.float32)
+        n_rows, n_features = X.shape
+        if n_rows == 0:
+            return np.empty(0, dtype=np.float32)
+
+        if self._versions is not None:
+            version = self._versions[name]
+        else:
+            from Backend.models.registry import registry
+            version = registry.version(name)
+        in_shm = shared_memory.SharedMemory(create=True, size=X.nbytes)
+        out_shm = shared_memory.SharedMemory(create=True, size=n_rows * 4)
+        try:
+            np.ndarray(X.shape, dtype=np.float32, buffer=in_shm.buf)[:] = X
+            bounds = np.linspace(0, n_rows, min(self.workers, n_rows) + 1).astype(int)
+            futures = [
+                self._pool.submit(_score_slice, name, version, in_shm.name, out_shm.name, n_rows, n_features, int(start), int(stop))
+                for start, stop in zip(bounds[:-1], bounds[1:])
+            ]
+            for future in futures:
+                future.result()
+            return np.ndarray((n_rows,), dtype=np.float32, buffer=out_shm.buf).copy()
+        finally:
+            for shm in (in_shm, out_shm):
+                shm.close()
+                shm.unlink()
+
+    def model(self, name: str) -> "PooledModel":
+        return PooledModel(self, name)
+
+    def shutdown(self):
+        self._pool.shutdown(wait=True)
+
+
+class PooledModel:
+    """predict() adapter so a pooled model can stand in for a loaded one (e.g. in evaluate_models.py)."""
+
+    def __init__(self, scorer: ProcessPoolScorer, name: str):
+        self.scorer = scorer
+        self.name = name
+
+    def predict(self, X) -> np.ndarray:
+        if hasattr(X, "columns"):
+            from Backend.utils.batch import frame_to_matrix
+            X = frame_to_matrix(X)
+        return self.scorer.predict(self.name, X)
+
+
+_shared_scorer: ProcessPoolScorer | None = None
+_shared_lock = threading.Lock()
+
+
+def get_process_pool() -> ProcessPoolScorer | None:
+    """The app-wide pool, started on first use; None when PROCESS_POOL_WORKERS is 0."""
+    global _shared_scorer
+    from Backend.config import PROCESS_POOL_WORKERS
+    if PROCESS_POOL_WORKERS <= 0:
+        return None
+    with _shared_lock:
+        if _shared_scorer is None:
+            logging.info(f"Starting inference process pool with {PROCESS_POOL_WORKERS} workers")
+            _shared_scorer = ProcessPoolScorer(PROCESS_POOL_WORKERS)
+        return _shared_scorer
+
+
+def shutdown_process_pool():
+    global _shared_scorer
+    with _shared_lock:
+        if _shared_scorer is not None:
+            _shared_scorer.shutdown()
+            _shared_scorer = None
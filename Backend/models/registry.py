@@ -0,0 +1,286 @@
+# Backend/models/registry.py
+import asyncio
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+import joblib
+import numpy as np
+
+from Backend.models.model_loader import (
+    EV_MODEL_PATH, HV_MODEL_PATH, EV_BOOSTER_PATH, HV_BOOSTER_PATH, EV_COMPILED_PATH, HV_COMPILED_PATH,
+    model_file_version, load_native_booster,
+)
+from Backend.models.tree_engine import load_compiled_trees
+from Backend.preprocess.ev_encoder import encode_ev_row
+from Backend.preprocess.hv_encoder import encode_hv_row
+from Backend.config import MODEL_FORMAT, MODEL_RELOAD_MAX_DRIFT
+
+
+def _current_rss_bytes() -> int | None:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return None # Not on Linux
+
+
+class ModelReloadError(RuntimeError):
+    """A new model file failed to load or failed its smoke test; the model being served is unchanged."""
+
+
+class LoadedModel:
+    """A deserialized model plus what it cost to load it."""
+
+    def __init__(self, name: str, path: str, version: str, model: Any, load_seconds: float, memory_bytes: int | None):
+        self.name = name
+        self.path = path
+        self.version = version
+        self.model = model
+        self.load_seconds = load_seconds
+        self.memory_bytes = memory_bytes # RSS growth during the load; approximate when loads overlap
+        self.loaded_at = time.time()
+
+    def predict(self, X):
+        return self.model.predict(X)
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "path": self.path,
+            "loaded": True,
+            "version": self.version,
+            "load_seconds": round(self.load_seconds, 4),
+            "memory_bytes": self.memory_bytes,
+            "loaded_at": self.loaded_at,
+        }
+
+
+class ModelRegistry:
+    """
+    Loads models lazily on first use and shares them across the app.
+
+    Models are registered by name with a file path and a loader. The first get() for a name
+    loads the file; concurrent callers wait for that one load instead of loading again. Loaded
+    instances are keyed on (file path, content version), so names pointing at the same file
+    share one object. Calling warm_up() before the server forks its workers lets them share
+    the loaded pages copy-on-write.
+
+    reload() swaps in a new version of a model file while the app keeps serving: the file is
+    loaded next to the current model, smoke-tested on the rows given at registration, and only
+    then replaces it. Callers that already hold the old LoadedModel finish with it.
+    """
+
+    def __init__(self):
+        self._specs: Dict[str, Tuple[str, Callable[[str], Any]]] = {}
+        self._smoke_rows: Dict[str, Callable[[], np.ndarray]] = {}
+        self._by_name: Dict[str, LoadedModel] = {}
+        self._by_file: Dict[Tuple[str, str], LoadedModel] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, path: str, loader: Callable[[str], Any] = joblib.load,
+                 smoke_rows: Callable[[], np.ndarray] | None = None):
+        """'smoke_rows' returns a feature matrix that a reloaded model must score before it is served."""
+        with self._lock:
+            self._specs[name] = (path, loader)
+            if smoke_rows is not None:
+                self._smoke_rows[name] = smoke_rows
+            self._locks.setdefault(name, threading.Lock())
+
+    def path(self, name: str) -> str:
+        return self._specs[name][0]
+
+    def version(self, name: str) -> str:
+        """Version being served, or of the file on disk if the model is not loaded yet."""
+        entry = self._by_name.get(name)
+        return entry.version if entry is not None else model_file_version(self.path(name))
+
+    def names(self) -> list:
+        return list(self._specs)
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._by_name
+
+    def get(self, name: str) -> LoadedModel:
+        """Returns the loaded model, loading it on first use."""
+        entry = self._by_name.get(name)
+        if entry is not None:
+            return entry
+        if name not in self._specs:
+            raise KeyError(f"Unknown model: {name}. Registered models: {self.names()}")
+
+        with self._locks[name]:
+            entry = self._by_name.get(name)
+            if entry is None:
+                entry = self._load(name)
+                self._by_name[name] = entry
+            return entry
+
+    async def aget(self, name: str) -> LoadedModel:
+        """Like get(), but a first-use load runs in a worker thread instead of blocking the event loop."""
+        entry = self._by_name.get(name)
+        if entry is not None:
+            return entry
+        return await asyncio.to_thread(self.get, name)
+
+    def _load(self, name: str, version: str | None = None) -> LoadedModel:
+        path, loader = self._specs[name]
+        version = version or model_file_version(path)
+        key = (os.path.realpath(path), version)
+        with self._lock:
+            shared = self._by_file.get(key)
+        if shared is not None:
+            return LoadedModel(name, path, version, shared.model, 0.0, 0)
+
+        rss_before = _current_rss_bytes()
+        start = time.perf_counter()
+        model = loader(path)
+        load_seconds = time.perf_counter() - start
+        rss_after = _current_rss_bytes()
+        memory_bytes = rss_after - rss_before if rss_before is not None and rss_after is not None else None
+
+        entry = LoadedModel(name, path, version, model, load_seconds, memory_bytes)
+        with self._lock:
+            self._by_file[key] = entry
+        logging.info(f"Loaded model '{name}' (version {version}) from {path} in {load_seconds:.3f}s")
+        return entry
+
+    def reload(self, name: str) -> dict:
+        """
+        Loads the current contents of a model's file and swaps it in if it passes the smoke test:
+        the new model must score the smoke rows with finite predictions, and its mean absolute
+        change from the served model's predictions may be at most MODEL_RELOAD_MAX_DRIFT of their
+        mean magnitude (<= 0 skips that check). Scoring the rows also warms the model up before
+        its first request. Raises ModelReloadError, keeping the served model, when a check fails.
+        """
+        if name not in self._specs:
+            raise KeyError(f"Unknown model: {name}. Registered models: {self.names()}")
+
+        with self._locks[name]: # One load per name at a time; readers of the served model never wait
+            current = self._by_name.get(name)
+            path = self._specs[name][0]
+            version = model_file_version(path)
+            if current is not None and current.version == version:
+                return {"name": name, "reloaded": False, "version": version, "reason": "unchanged"}
+
+            try:
+                candidate = self._load(name, version) # Raises e.g. StaleArtifactError
+                report = self._smoke_test(name, candidate, current)
+            except Exception as e:
+                self._drop_unused_files()
+                logging.error(f"Kept model '{name}' version {current.version if current else None}: "
+                              f"version {version} from {path} was rejected: {e}")
+                if isinstance(e, ModelReloadError):
+                    raise
+                raise ModelReloadError(f"'{name}' version {version} failed to load or to pass its smoke test: {e}") from e
+
+            self._by_name[name] = candidate # A single reference swap; in-flight requests keep the old model
+            self._drop_unused_files()
+
+        previous = current.version if current else None
+        logging.info(f"Reloaded model '{name}': version {previous} -> {version}")
+        return {"name": name, "reloaded": True, "previous_version": previous, "version": version,
+                "load_seconds": round(candidate.load_seconds, 4), "smoke_test": report}
+
+    def _smoke_test(self, name: str, candidate: LoadedModel, current: LoadedModel | None) -> dict:
+        smoke_rows = self._smoke_rows.get(name)
+        if smoke_rows is None:
+            return {"rows": 0}
+        X = smoke_rows()
+        start = time.perf_counter()
+        predictions = np.asarray(candidate.predict(X), dtype=np.float64)
+        report = {"rows": len(X), "predict_seconds": round(time.perf_counter() - start, 4)}
+        if predictions.shape != (len(X),):
+            raise ModelReloadError(f"Expected {len(X)} predictions, got shape {predictions.shape}.")
+        if not np.isfinite(predictions).all():
+            raise ModelReloadError("Non-finite predictions on the smoke rows.")
+
+        if current is not None:
+            served = np.asarray(current.predict(X), dtype=np.float64)
+            drift = float(np.mean(np.abs(predictions - served)) / max(np.mean(np.abs(served)), 1e-9))
+            report["max_abs_diff"] = round(float(np.max(np.abs(predictions - served))), 4)
+            report["relative_drift"] = round(drift, 4)
+            if MODEL_RELOAD_MAX_DRIFT > 0 and drift > MODEL_RELOAD_MAX_DRIFT:
+                raise ModelReloadError(f"Predictions moved by {drift:.1%} of their mean on the smoke rows "
+                                       f"(MODEL_RELOAD_MAX_DRIFT is {MODEL_RELOAD_MAX_DRIFT:.1%}).")
+        return report
+
+    def _drop_unused_files(self):
+        """Forgets loaded files no name serves anymore, so replaced or rejected models can be freed."""
+        with self._lock:
+            served = {(os.path.realpath(entry.path), entry.version) for entry in self._by_name.values()}
+            for key in [key for key in self._by_file if key not in served]:
+                del self._by_file[key]
+
+    def warm_up(self, names: Iterable[str] | None = None, parallel: bool = True):
+        """Loads the given models (all by default) now, in parallel threads if requested."""
+        names = list(names) if names is not None else self.names()
+        if parallel and len(names) > 1:
+            with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix="model-warm-up") as pool:
+                list(pool.map(self.get, names))
+        else:
+            for name in names:
+                self.get(name)
+
+    def stats(self) -> dict:
+        return {
+            name: self._by_name[name].info() if name in self._by_name else {"name": name, "path": path, "loaded": False}
+            for name, (path, _) in self._specs.items()
+        }
+
+
+def _encoded_rows(encode_row, base: dict, variants: List[dict]) -> np.ndarray:
+    return np.vstack([encode_row({**base, **variant}) for variant in variants])
+
+
+# Smoke-test inputs for reloads: one row per category value, plus battery/tank extremes
+_EV_SMOKE_BASE = {
+    'battery_percentage': 80.0, 'battery_age_years': 2.0, 'battery_capacity_kwh': 60.0, 'ambient_temp': 'mild',
+    'terrain_slope': 1.0, 'speed_avg_kmph': 60.0, 'acceleration_level': 0.5, 'hvac_on': True,
+    'driving_mode': 'Eco', 'drive_type': 'FWD', 'cargo_volume_liters': 300.0, 'top_speed_kmph': 180.0,
+    'total_power_kw': 100.0, 'total_torque_nm': 300.0,
+}
+_EV_SMOKE_VARIANTS = [
+    {}, {'ambient_temp': 'cold'}, {'ambient_temp': 'hot', 'hvac_on': False}, {'driving_mode': 'Sport'},
+    {'driving_mode': 'Normal', 'drive_type': 'RWD'}, {'drive_type': 'AWD'}, {'battery_percentage': 10.0},
+    {'battery_percentage': 100.0, 'battery_capacity_kwh': 100.0}, {'terrain_slope': -5.0, 'speed_avg_kmph': 120.0},
+]
+_HV_SMOKE_BASE = {
+    'hydrogen_percentage': 50.0, 'fuel_cell_age_years': 3.0, 'fuel_cell_efficiency': 55.0, 'ambient_temp': 'mild',
+    'terrain_slope': 2.0, 'speed_avg_kmph': 70.0, 'acceleration_level': 0.4, 'hvac_on': 'yes',
+    'driving_mode': 'eco', 'drive_type': 'AWD', 'cargo_volume_liters': 500.0, 'top_speed_kmph': 200.0,
+    'total_power_kw': 150.0, 'total_torque_nm': 400.0,
+}
+_HV_SMOKE_VARIANTS = [
+    {}, {'ambient_temp': 'cold'}, {'ambient_temp': 'hot', 'hvac_on': 'no'}, {'driving_mode': 'sport'},
+    {'driving_mode': 'normal', 'drive_type': 'FWD'}, {'drive_type': 'RWD'}, {'hydrogen_percentage': 10.0},
+    {'hydrogen_percentage': 100.0}, {'terrain_slope': -5.0, 'speed_avg_kmph': 120.0},
+]
+
+
+def ev_smoke_rows() -> np.ndarray:
+    return _encoded_rows(encode_ev_row, _EV_SMOKE_BASE, _EV_SMOKE_VARIANTS)
+
+
+def hv_smoke_rows() -> np.ndarray:
+    return _encoded_rows(encode_hv_row, _HV_SMOKE_BASE, _HV_SMOKE_VARIANTS)
+
+
+# Loader and (ev, hv) model paths per MODEL_FORMAT
+MODEL_LOADERS = {"joblib": joblib.load, "native": load_native_booster, "compiled": load_compiled_trees}
+MODEL_PATHS = {
+    "joblib": {"ev": EV_MODEL_PATH, "hv": HV_MODEL_PATH},
+    "native": {"ev": EV_BOOSTER_PATH, "hv": HV_BOOSTER_PATH},
+    "compiled": {"ev": EV_COMPILED_PATH, "hv": HV_COMPILED_PATH},
+}
+if MODEL_FORMAT not in MODEL_LOADERS:
+    raise ValueError(f"Unknown MODEL_FORMAT: {MODEL_FORMAT}. Expected 'joblib', 'native' or 'compiled'.")
+
+# Shared registry used by the API routes and scripts
+registry = ModelRegistry()
+registry.register("ev", MODEL_PATHS[MODEL_FORMAT]["ev"], MODEL_LOADERS[MODEL_FORMAT], smoke_rows=ev_smoke_rows)
+registry.register("hv", MODEL_PATHS[MODEL_FORMAT]["hv"], MODEL_LOADERS[MODEL_FORMAT], smoke_rows=hv_smoke_rows)
@@ -0,0 +1,177 @@
+# Backend/models/tree_engine.py
+import json
+
+import numpy as np
+
+# Rows scored per chunk; bounds the (rows x trees) node-index matrix to a few MB
+_CHUNK_ROWS = 4096
+
+
+def _parse_base_score(value: str) -> float:
+    # XGBoost < 3.0 writes "3.42866E2"; 3.x writes a vector, "[3.42866E2]" (one entry per target)
+    value = value.strip()
+    if value.startswith("["):
+        return float(np.atleast_1d(json.loads(value))[0])
+    return float(value)
+
+
+class CompiledTreeEnsemble:
+    """
+    A trained XGBoost regressor flattened into NumPy arrays and evaluated without XGBoost.
+
+    All trees share one set of node arrays (global node ids; a tree starts at roots[t]).
+    Leaves point to themselves, so every row can be stepped 'max_depth' times in lockstep.
+    Numeric splits go left when x < threshold; categorical splits go right when the category
+    code is in the node's set (stored as a 64-bit mask); missing values follow default_left.
+    These are the decision rules of XGBoost's own CPU predictor.
+    """
+
+    def __init__(self, feature_names, roots, feature, threshold, left, right, default_left,
+                 is_categorical, category_mask, leaf_value, base_score, max_depth, source_model_version=None):
+        self.feature_names = list(feature_names)
+        self.roots = roots
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.is_categorical = is_categorical
+        self.category_mask = category_mask
+        self.leaf_value = leaf_value
+        self.base_score = float(base_score)
+        self.max_depth = int(max_depth)
+        self.source_model_version = source_model_version # Content version of the joblib model it was compiled from
+
+    @classmethod
+    def from_booster(cls, booster, source_model_version: str | None = None) -> "CompiledTreeEnsemble":
+        """Compiles an xgboost.Booster (or the sklearn wrapper's get_booster()) trained with reg:squarederror."""
+        learner = json.loads(booster.save_raw("json"))["learner"]
+        objective = learner["objective"]["name"]
+        if objective != "reg:squarederror":
+            raise ValueError(f"Only reg:squarederror models can be compiled, got {objective}.")
+        model = learner["gradient_booster"]["model"]
+        trees = model["trees"]
+        best_iteration = booster.attr("best_iteration")
+        if best_iteration is not None: # Match predict(), which stops at the best iteration
+            trees = trees[:model["iteration_indptr"][int(best_iteration) + 1]]
+
+        roots, features, thresholds, lefts, rights, default_lefts = [], [], [], [], [], []
+        categorical, masks, depths = [], [], []
+        offset = 0
+        for tree in trees:
+            n_nodes = len(tree["left_children"])
+            left = np.asarray(tree["left_children"], dtype=np.int64)
+            right = np.asarray(tree["right_children"], dtype=np.int64)
+            is_leaf = left == -1
+            own_ids = np.arange(n_nodes)
+
+            mask = np.zeros(n_nodes, dtype=np.uint64)
+            for node, start, size in zip(tree["categories_nodes"], tree["categories_segments"], tree["categories_sizes"]):
+                for category in tree["categories"][start:start + size]:
+                    if category >= 64:
+                        raise ValueError(f"Category code {category} does not fit the 64-bit category mask.")
+                    mask[node] |= np.uint64(1) << np.uint64(category)
+
+            roots.append(offset)
+            features.append(np.where(is_leaf, 0, tree["split_indices"]))
+            thresholds.append(tree["split_conditions"]) # Holds the leaf value on leaves
+            lefts.append(np.where(is_leaf, own_ids, left) + offset)
+            rights.append(np.where(is_leaf, own_ids, right) + offset)
+            default_lefts.append(tree["default_left"])
+            categorical.append(np.asarray(tree["split_type"]) == 1)
+            masks.append(mask)
+            depths.append(_tree_depth(left, right))
+            offset += n_nodes
+
+        threshold = np.concatenate(thresholds).astype(np.float32)
+        is_leaf_all = np.concatenate(lefts) == np.arange(offset)
+        return cls(
+            feature_names=learner["feature_names"],
+            roots=np.asarray(roots, dtype=np.int64),
+            feature=np.concatenate(features).astype(np.int64),
+            threshold=threshold,
+            left=np.concatenate(lefts).astype(np.int64),
+            right=np.concatenate(rights).astype(np.int64),
+            default_left=np.concatenate(default_lefts).astype(bool),
+            is_categorical=np.concatenate(categorical),
+            category_mask=np.concatenate(masks),
+            leaf_value=np.where(is_leaf_all, threshold, np.float32(0)).astype(np.float32),
+            base_score=_parse_base_score(learner["learner_model_param"]["base_score"]),
+            max_depth=max(depths, default=0),
+            source_model_version=source_model_version,
+        )
+
+    def save(self, path: str):
+        np.savez(path, roots=self.roots, feature=self.feature, threshold=self.threshold, left=self.left,
+                 right=self.right, default_left=self.default_left, is_categorical=self.is_categorical,
+                 category_mask=self.category_mask, leaf_value=self.leaf_value,
+                 feature_names=np.asarray(self.feature_names), base_score=self.base_score, max_depth=self.max_depth,
+                 **({"source_model_version": self.source_model_version} if self.source_model_version else {}))
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledTreeEnsemble":
+        with np.load(path) as data:
+            arrays = {name: data[name] for name in data.files}
+        arrays["feature_names"] = arrays["feature_names"].tolist()
+        arrays["base_score"] = arrays["base_score"].item()
+        arrays["max_depth"] = arrays["max_depth"].item()
+        if "source_model_version" in arrays: # Not in files compiled before it was recorded
+            arrays["source_model_version"] = arrays["source_model_version"].item()
+        return cls(**arrays)
+
+    def predict(self, X) -> np.ndarray:
+        """Scores a 1-D row or a 2-D (rows x features) matrix; preprocessed DataFrames are accepted too."""
+        if hasattr(X, "columns"):
+            from Backend.utils.batch import frame_to_matrix
+            X = frame_to_matrix(X)
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            return self.predict(X[None, :])
+        out = np.empty(len(X), dtype=np.float32)
+        for start in range(0, len(X), _CHUNK_ROWS):
+            out[start:start + _CHUNK_ROWS] = self._predict_chunk(X[start:start + _CHUNK_ROWS])
+        return out
+
+    def _predict_chunk(self, X: np.ndarray) -> np.ndarray:
+        # One flat (row, tree) lane per entry; take() on 1-D arrays is the fastest NumPy gather
+        n_rows, n_features = X.shape
+        flat_X = np.ascontiguousarray(X).ravel()
+        row_offsets = np.repeat(np.arange(n_rows, dtype=np.int64) * n_features, len(self.roots))
+        nodes = np.tile(self.roots, n_rows)
+        for _ in range(self.max_depth):
+            values = flat_X.take(row_offsets + self.feature.take(nodes))
+            go_left = values < self.threshold.take(nodes)
+
+            lanes = np.flatnonzero(self.is_categorical.take(nodes))
+            if len(lanes):
+                cat_values = values[lanes]
+                valid = (cat_values >= 0) & (cat_values < 64) # False for NaN too
+                codes = np.where(valid, cat_values, 0).astype(np.uint64)
+                in_set = (self.category_mask.take(nodes[lanes]) >> codes) & np.uint64(1)
+                # Categories in the set go right; out-of-range categories go left, like XGBoost
+                go_left[lanes] = ~(valid & (in_set == 1))
+
+            missing = np.isnan(values)
+            if missing.any():
+                go_left[missing] = self.default_left.take(nodes[missing])
+            nodes = np.where(go_left, self.left.take(nodes), self.right.take(nodes))
+
+        margins = self.leaf_value.take(nodes).reshape(n_rows, -1).sum(axis=1, dtype=np.float64)
+        return (margins + self.base_score).astype(np.float32)
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth, level = 0, [0]
+    while True:
+        children = [child for node in level for child in (left[node], right[node]) if child != -1]
+        if not children:
+            return depth
+        depth += 1
+        level = children
+
+
+def load_compiled_trees(path: str) -> CompiledTreeEnsemble:
+    from Backend.models.model_loader import check_source_version
+    compiled = CompiledTreeEnsemble.load(path)
+    check_source_version(path, compiled.source_model_version)
+    return compiled
@@ -0,0 +1,165 @@
+# Backend/preprocess/ev_encoder.py
+import math
+import logging
+from typing import List
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from Backend.utils.ev_feature_reference import TRAINED_FEATURES
+from Backend.preprocess.ev_preprocess import AMBIENT_TEMP_MAP
+from Backend.preprocess.frame_encoding import lookup, numeric, fill_nan, set_one_hot, iter_blocks
+
+# Single-row fast path for preprocess_ev_input: maps an EVInput dict straight to a float32 row
+# ordered by TRAINED_FEATURES. It reproduces the pandas path value for value (one-hot columns
+# become their category codes 0/1), so model.predict returns identical results.
+# encode_ev_frame does the same for a whole DataFrame, writing one preallocated matrix.
+
+N_FEATURES = len(TRAINED_FEATURES)
+_INDEX = {name: i for i, name in enumerate(TRAINED_FEATURES)}
+
+# Raw inputs copied as-is (the pandas path does not coerce them)
+_PASSTHROUGH = [(name, _INDEX[name]) for name in (
+    'battery_age_years', 'terrain_slope', 'speed_avg_kmph', 'acceleration_level',
+    'cargo_volume_liters', 'top_speed_kmph', 'total_torque_nm',
+)]
+_DRIVING_MODE_SLOTS = {mode: _INDEX[f'driving_mode_{mode}'] for mode in ('Normal', 'Sport', 'Eco')}
+_DRIVE_TYPE_SLOTS = {drive: _INDEX[f'drive_type_{drive}'] for drive in ('FWD', 'RWD')}
+_HVAC_MAP = {'yes': 1.0, 'no': 0.0}
+
+# One-hot columns, which XGBoost treats as categorical ('c' feature type)
+CATEGORICAL_FEATURES = [f'driving_mode_{mode}' for mode in _DRIVING_MODE_SLOTS] + [f'drive_type_{drive}' for drive in _DRIVE_TYPE_SLOTS]
+
+_AMBIENT_TEMP = _INDEX['ambient_temp']
+_HVAC_ON = _INDEX['hvac_on']
+_ECO_MODE_FLAG = _INDEX['eco_mode_flag']
+_BATTERY_PERCENTAGE = _INDEX['battery_percentage']
+_BATTERY_CAPACITY = _INDEX['battery_capacity_kwh']
+_TOTAL_POWER = _INDEX['total_power_kw']
+_BATTERY_PER_KWH = _INDEX['battery_per_kWh']
+_BATTERY_REMAINING = _INDEX['battery_remaining_kWh']
+
+
+def _to_float(value) -> float:
+    # Same as pd.to_numeric(errors='coerce').fillna(0)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(value) else value
+
+
+def _raw_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def check_one_hot_values(input_data: dict) -> List[str]:
+    """
+    Errors for a driving_mode or drive_type without a one-hot column. Both encoders (and the
+    pandas path) leave all of that field's columns at 0 for it, a row the model never saw.
+    """
+    errors = []
+    if str(input_data.get('driving_mode')).capitalize() not in _DRIVING_MODE_SLOTS:
+        errors.append(f"Invalid driving_mode: {input_data.get('driving_mode')}. Expected one of {list(_DRIVING_MODE_SLOTS)}.")
+    if str(input_data.get('drive_type')).upper() not in _DRIVE_TYPE_SLOTS:
+        errors.append(f"Invalid drive_type: {input_data.get('drive_type')}. Expected one of {list(_DRIVE_TYPE_SLOTS)}.")
+    return errors
+
+
+def encode_ev_row(input_data: dict, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Encodes a single EV input dict into a float32 feature row (length N_FEATURES).
+    Pass a preallocated 'out' row to avoid the allocation. Raises HTTPException(400)
+    for an unknown ambient_temp, like preprocess_ev_input.
+    """
+    row = np.zeros(N_FEATURES, dtype=np.float32) if out is None else out
+    if out is not None:
+        row.fill(0.0)
+
+    ambient_temp = str(input_data.get('ambient_temp')).lower()
+    if ambient_temp not in AMBIENT_TEMP_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid ambient_temp: {ambient_temp}. Expected 'cold', 'mild', or 'hot'.")
+    row[_AMBIENT_TEMP] = AMBIENT_TEMP_MAP[ambient_temp]
+
+    hvac_on = input_data.get('hvac_on', 0)
+    if isinstance(hvac_on, (bool, np.bool_)):
+        row[_HVAC_ON] = float(hvac_on)
+    else:
+        row[_HVAC_ON] = _HVAC_MAP.get(str(hvac_on).lower(), 0.0)
+
+    driving_mode = str(input_data.get('driving_mode')).capitalize()
+    row[_ECO_MODE_FLAG] = 1.0 if driving_mode == 'Eco' else 0.0
+    slot = _DRIVING_MODE_SLOTS.get(driving_mode)
+    if slot is not None:
+        row[slot] = 1.0
+    slot = _DRIVE_TYPE_SLOTS.get(str(input_data.get('drive_type')).upper())
+    if slot is not None:
+        row[slot] = 1.0
+
+    for name, i in _PASSTHROUGH:
+        if name in input_data:
+            row[i] = _raw_float(input_data[name])
+
+    battery_percentage = _to_float(input_data.get('battery_percentage'))
+    battery_capacity_kwh = _to_float(input_data.get('battery_capacity_kwh'))
+    row[_BATTERY_PERCENTAGE] = battery_percentage
+    row[_BATTERY_CAPACITY] = battery_capacity_kwh
+    row[_TOTAL_POWER] = _to_float(input_data.get('total_power_kw'))
+
+    # Derived features, computed in float64 before the float32 store like the pandas path
+    row[_BATTERY_PER_KWH] = battery_percentage / battery_capacity_kwh if battery_capacity_kwh != 0 else 0.0
+    row[_BATTERY_REMAINING] = battery_capacity_kwh * battery_percentage / 100
+    return row
+
+
+def encode_ev_frame(df: pd.DataFrame, is_training_data: bool = False) -> np.ndarray:
+    """
+    Encodes a DataFrame of EV inputs into a float32 feature matrix (len(df) x N_FEATURES),
+    identical to frame_to_matrix(preprocess_ev_input(df, is_training_data)). Categorical columns
+    are mapped through lookup tables once; the matrix is then filled block by block, so besides
+    the output only the small per-row codes (and copies of non-float64 numeric columns) are allocated.
+    """
+    X = np.zeros((len(df), N_FEATURES), dtype=np.float32)
+
+    ambient_temp, invalid = lookup(df['ambient_temp'], str.lower, AMBIENT_TEMP_MAP, 0)
+    if invalid and is_training_data:
+        logging.warning(f"Invalid ambient_temp values found: {invalid}. These will be mapped to 0.")
+    columns = {
+        'ambient_temp': ambient_temp,
+        'driving_mode': lookup(df['driving_mode'], str.capitalize, _DRIVING_MODE_SLOTS, -1)[0],
+        'drive_type': lookup(df['drive_type'], str.upper, _DRIVE_TYPE_SLOTS, -1)[0],
+    }
+    if 'hvac_on' in df.columns:
+        if pd.api.types.is_bool_dtype(df['hvac_on']):
+            columns['hvac_on'] = df['hvac_on'].astype(int).to_numpy()
+        else:
+            columns['hvac_on'] = lookup(df['hvac_on'], str.lower, _HVAC_MAP, 0)[0]
+    for name, _ in _PASSTHROUGH:
+        if name in df.columns:
+            columns[name] = numeric(df[name], coerce=False)
+    for name in ('battery_percentage', 'battery_capacity_kwh', 'total_power_kw'):
+        if name in df.columns:
+            columns[name] = numeric(df[name])
+
+    for out, block in iter_blocks(X, columns):
+        out[:, _AMBIENT_TEMP] = block['ambient_temp']
+        if 'hvac_on' in block:
+            out[:, _HVAC_ON] = block['hvac_on']
+        set_one_hot(out, block['driving_mode'])
+        out[:, _ECO_MODE_FLAG] = block['driving_mode'] == _DRIVING_MODE_SLOTS['Eco']
+        set_one_hot(out, block['drive_type'])
+        for name, i in _PASSTHROUGH:
+            if name in block:
+                out[:, i] = block[name]
+
+        battery_percentage = fill_nan(block['battery_percentage']) if 'battery_percentage' in block else 0.0
+        battery_capacity_kwh = fill_nan(block['battery_capacity_kwh']) if 'battery_capacity_kwh' in block else 0.0
+        out[:, _BATTERY_PERCENTAGE] = battery_percentage
+        out[:, _BATTERY_CAPACITY] = battery_capacity_kwh
+        if 'total_power_kw' in block:
+            out[:, _TOTAL_POWER] = fill_nan(block['total_power_kw'])
+
+        # Derived features in float64, like the pandas path
+        with np.errstate(divide='ignore', invalid='ignore'):
+            out[:, _BATTERY_PER_KWH] = fill_nan(battery_percentage / np.where(battery_capacity_kwh == 0, np.nan, battery_capacity_kwh))
+            out[:, _BATTERY_REMAINING] = fill_nan(np.multiply(battery_capacity_kwh, battery_percentage) / 100)
+    return X
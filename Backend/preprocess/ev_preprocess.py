@@ -9,6 +9,12 @@ from Backend.utils.ev_feature_reference import TRAINED_FEATURES
 if not logging.getLogger().handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+AMBIENT_TEMP_MAP = {'cold': 0, 'mild': 1, 'hot': 2}
+
+# One-hot columns are categorical features in the trained model. The categories must be
+# fixed so that a row encodes the same way alone or inside a batch (codes: False=0, True=1).
+DUMMY_DTYPE = pd.CategoricalDtype(categories=[False, True])
+
 
 # --- REVISED: Added 'is_training_data' to function signature ---
 def preprocess_ev_input(input_data: dict | pd.DataFrame, is_training_data: bool = False) -> pd.DataFrame:
@@ -27,7 +33,7 @@ def preprocess_ev_input(input_data: dict | pd.DataFrame, is_training_data: bool
 
 
     # 1. Handle 'ambient_temp' ordinal encoding
-    ambient_map = {'cold': 0, 'mild': 1, 'hot': 2}
+    ambient_map = AMBIENT_TEMP_MAP
     df['ambient_temp'] = df['ambient_temp'].astype(str).str.lower()
     
     if single_row_mode:
@@ -80,10 +86,9 @@ def preprocess_ev_input(input_data: dict | pd.DataFrame, is_training_data: bool
     for col in ['driving_mode_Normal', 'driving_mode_Sport', 'driving_mode_Eco', 
                 'drive_type_FWD', 'drive_type_RWD']:
         if col in df.columns:
-            df[col] = df[col].astype('category')
+            df[col] = df[col].astype(bool).astype(DUMMY_DTYPE)
         else:
-            df[col] = 0
-            df[col] = df[col].astype('category')
+            df[col] = pd.Series(False, index=df.index, dtype=DUMMY_DTYPE)
 
     # 7. Align with TRAINED_FEATURES
     df = df.reindex(columns=TRAINED_FEATURES, fill_value=0)
@@ -0,0 +1,64 @@
+# Backend/preprocess/frame_encoding.py
+# Column helpers for the vectorized frame encoders (encode_ev_frame / encode_hv_frame). A string
+# column is factorized once, only its few distinct values are normalized (the pandas path runs
+# '.astype(str).str.lower()' and friends on every row) and looked up, and the per-row result is a
+# single take through the resulting table. The feature matrix is then filled BLOCK_ROWS rows at a
+# time, so each block of the row-major output is written while it is in cache.
+from typing import Callable, Dict, Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+BLOCK_ROWS = 8192 # 8192 rows x 24 float32 features = 768 KB, about one L2 cache
+
+
+def lookup(series: pd.Series, normalize: Callable[[str], str], table: Dict[str, float],
+           default: float, dtype=np.int8) -> Tuple[np.ndarray, List[str]]:
+    """
+    Maps every value of 'series' to table[normalize(str(value))], or 'default' when the key is
+    missing. Returns the mapped array and the normalized values that were not in the table.
+    Missing values (None / NaN) stringify to 'None' / 'nan', which no table contains, so they
+    get the default and are reported as 'nan'.
+    """
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    values = np.empty(len(uniques) + 1, dtype=dtype) # The last slot serves code -1 (missing)
+    unknown = []
+    for i, value in enumerate(uniques):
+        key = normalize(str(value))
+        if key in table:
+            values[i] = table[key]
+        else:
+            values[i] = default
+            unknown.append(key)
+    values[-1] = default
+    if (codes < 0).any():
+        unknown.append('nan')
+    return values[codes], unknown
+
+
+def numeric(series: pd.Series, coerce: bool = True) -> np.ndarray:
+    """
+    float64 values of a numeric input column, without a copy when it already is float64.
+    coerce=True parses it like pd.to_numeric(errors='coerce'); NaN is left for fill_nan.
+    """
+    if coerce:
+        series = pd.to_numeric(series, errors='coerce')
+    return series.to_numpy(dtype=np.float64, na_value=np.nan)
+
+
+def fill_nan(values: np.ndarray) -> np.ndarray:
+    """New array with NaN replaced by 0 (like .fillna(0); infinities are kept)."""
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def set_one_hot(out: np.ndarray, slots: np.ndarray):
+    """Sets out[row, slots[row]] = 1 for every row whose slot is not -1 (unknown category: all zeros)."""
+    rows = np.flatnonzero(slots >= 0)
+    out[rows, slots[rows]] = 1.0
+
+
+def iter_blocks(X: np.ndarray, columns: Dict[str, np.ndarray]) -> Iterator[Tuple[np.ndarray, Dict[str, np.ndarray]]]:
+    """Yields (rows of X, the same rows of every column) for consecutive blocks of BLOCK_ROWS rows."""
+    for start in range(0, len(X), BLOCK_ROWS):
+        rows = slice(start, start + BLOCK_ROWS)
+        yield X[rows], {name: values[rows] for name, values in columns.items()}
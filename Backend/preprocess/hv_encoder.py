@@ -0,0 +1,167 @@
+# Backend/preprocess/hv_encoder.py
+import math
+import logging
+from typing import List
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+from Backend.utils.hv_feature_reference import TRAINED_FEATURES
+from Backend.preprocess.hv_preprocess import AMBIENT_TEMP_MAP, HVAC_MAP
+from Backend.preprocess.frame_encoding import lookup, numeric, fill_nan, set_one_hot, iter_blocks
+
+# Single-row fast path for preprocess_hv_input: maps an HVInput dict straight to a float32 row
+# ordered by TRAINED_FEATURES. It reproduces the pandas path value for value (one-hot columns
+# become their category codes 0/1), so model.predict returns identical results.
+# encode_hv_frame does the same for a whole DataFrame, writing one preallocated matrix.
+
+N_FEATURES = len(TRAINED_FEATURES)
+_INDEX = {name: i for i, name in enumerate(TRAINED_FEATURES)}
+
+# Inputs coerced with pd.to_numeric(errors='coerce').fillna(0) in the pandas path
+_NUMERIC = [(name, _INDEX[name]) for name in (
+    'hydrogen_percentage', 'fuel_cell_age_years', 'fuel_cell_efficiency', 'speed_avg_kmph', 'terrain_slope',
+    'cargo_volume_liters', 'top_speed_kmph', 'total_power_kw', 'total_torque_nm', 'acceleration_level',
+)]
+_DRIVING_MODE_SLOTS = {mode: _INDEX[f'driving_mode_{mode}'] for mode in ('normal', 'sport', 'eco')}
+_DRIVE_TYPE_SLOTS = {drive: _INDEX[f'drive_type_{drive}'] for drive in ('FWD', 'RWD', 'AWD')}
+
+# One-hot columns, which XGBoost treats as categorical ('c' feature type)
+CATEGORICAL_FEATURES = [f'driving_mode_{mode}' for mode in _DRIVING_MODE_SLOTS] + [f'drive_type_{drive}' for drive in _DRIVE_TYPE_SLOTS]
+
+_AMBIENT_TEMP = _INDEX['ambient_temp']
+_HVAC_ON = _INDEX['hvac_on']
+_SPEED_SQ = _INDEX['speed_sq']
+_ABS_SLOPE = _INDEX['abs_slope']
+_HYDROGEN_PER_YEAR = _INDEX['hydrogen_per_year']
+_AGE_SQUARED = _INDEX['age_squared']
+_H2_X_EFFICIENCY = _INDEX['h2_x_efficiency']
+_H2_X_AGE = _INDEX['h2_x_age']
+
+
+def _to_float(value) -> float:
+    # Same as pd.to_numeric(errors='coerce').fillna(0)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return 0.0
+    return 0.0 if math.isnan(value) else value
+
+
+def _raw_float(value) -> float:
+    return math.nan if value is None else float(value)
+
+
+def check_one_hot_values(input_data: dict) -> List[str]:
+    """
+    Errors for a driving_mode or drive_type without a one-hot column. Both encoders (and the
+    pandas path) leave all of that field's columns at 0 for it, a row the model never saw.
+    """
+    errors = []
+    if str(input_data.get('driving_mode')).lower() not in _DRIVING_MODE_SLOTS:
+        errors.append(f"Invalid driving_mode: {input_data.get('driving_mode')}. Expected one of {list(_DRIVING_MODE_SLOTS)}.")
+    if str(input_data.get('drive_type')).upper() not in _DRIVE_TYPE_SLOTS:
+        errors.append(f"Invalid drive_type: {input_data.get('drive_type')}. Expected one of {list(_DRIVE_TYPE_SLOTS)}.")
+    return errors
+
+
+def encode_hv_row(input_data: dict, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Encodes a single HV input dict into a float32 feature row (length N_FEATURES).
+    Pass a preallocated 'out' row to avoid the allocation. Raises HTTPException(400)
+    for an unknown ambient_temp or hvac_on value, like preprocess_hv_input.
+    """
+    row = np.zeros(N_FEATURES, dtype=np.float32) if out is None else out
+    if out is not None:
+        row.fill(0.0)
+
+    ambient_temp = str(input_data.get('ambient_temp')).lower()
+    if ambient_temp not in AMBIENT_TEMP_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid ambient_temp: {ambient_temp}. Expected 'cold', 'mild', or 'hot'.")
+    row[_AMBIENT_TEMP] = AMBIENT_TEMP_MAP[ambient_temp]
+
+    hvac_on = str(input_data.get('hvac_on')).lower()
+    if hvac_on not in HVAC_MAP:
+        raise HTTPException(status_code=400, detail=f"Invalid hvac_on value: {hvac_on}. Expected 'yes' or 'no'.")
+    row[_HVAC_ON] = HVAC_MAP[hvac_on]
+
+    values = {}
+    for name, i in _NUMERIC:
+        values[name] = row[i] = _to_float(input_data.get(name))
+
+    # Derived features, computed in float64 before the float32 store like the pandas path.
+    # Like preprocess_hv_input, a derived column already present in the input is used as-is.
+    hydrogen_percentage = values['hydrogen_percentage']
+    fuel_cell_age_years = values['fuel_cell_age_years']
+    row[_SPEED_SQ] = values['speed_avg_kmph'] ** 2
+    row[_ABS_SLOPE] = abs(values['terrain_slope'])
+    row[_HYDROGEN_PER_YEAR] = _raw_float(input_data['hydrogen_per_year']) if 'hydrogen_per_year' in input_data else 0.0
+    row[_AGE_SQUARED] = (_raw_float(input_data['age_squared']) if 'age_squared' in input_data
+                         else fuel_cell_age_years ** 2)
+    row[_H2_X_EFFICIENCY] = (_raw_float(input_data['h2_x_efficiency']) if 'h2_x_efficiency' in input_data
+                             else hydrogen_percentage * values['fuel_cell_efficiency'])
+    row[_H2_X_AGE] = (_raw_float(input_data['h2_x_age']) if 'h2_x_age' in input_data
+                      else hydrogen_percentage * fuel_cell_age_years)
+
+    slot = _DRIVING_MODE_SLOTS.get(str(input_data.get('driving_mode')).lower())
+    if slot is not None:
+        row[slot] = 1.0
+    slot = _DRIVE_TYPE_SLOTS.get(str(input_data.get('drive_type')).upper())
+    if slot is not None:
+        row[slot] = 1.0
+    return row
+
+
+def encode_hv_frame(df: pd.DataFrame, is_training_data: bool = False) -> np.ndarray:
+    """
+    Encodes a DataFrame of HV inputs into a float32 feature matrix (len(df) x N_FEATURES),
+    identical to frame_to_matrix(preprocess_hv_input(df, is_training_data)). Categorical columns
+    are mapped through lookup tables once; the matrix is then filled block by block, so besides
+    the output only the small per-row codes (and copies of non-float64 numeric columns) are allocated.
+    """
+    X = np.zeros((len(df), N_FEATURES), dtype=np.float32)
+
+    ambient_temp, invalid = lookup(df['ambient_temp'], str.lower, AMBIENT_TEMP_MAP, 0)
+    if invalid and is_training_data:
+        logging.warning(f"Invalid categorical ambient_temp values found: {invalid}. These will be mapped to 0.")
+    hvac_on, invalid = lookup(df['hvac_on'], str.lower, HVAC_MAP, 0)
+    if invalid and is_training_data:
+        logging.warning(f"Invalid hvac_on values found: {invalid}. These will be mapped to 0.")
+    columns = {
+        'ambient_temp': ambient_temp,
+        'hvac_on': hvac_on,
+        'driving_mode': lookup(df['driving_mode'], str.lower, _DRIVING_MODE_SLOTS, -1)[0],
+        'drive_type': lookup(df['drive_type'], str.upper, _DRIVE_TYPE_SLOTS, -1)[0],
+    }
+    for name, _ in _NUMERIC:
+        if name in df.columns:
+            columns[name] = numeric(df[name])
+    # Like preprocess_hv_input, a derived column already present in the input is used as-is
+    for name in ('hydrogen_per_year', 'age_squared', 'h2_x_efficiency', 'h2_x_age'):
+        if name in df.columns:
+            columns[name] = numeric(df[name], coerce=False)
+
+    for out, block in iter_blocks(X, columns):
+        out[:, _AMBIENT_TEMP] = block['ambient_temp']
+        out[:, _HVAC_ON] = block['hvac_on']
+        set_one_hot(out, block['driving_mode'])
+        set_one_hot(out, block['drive_type'])
+
+        values = {}
+        for name, i in _NUMERIC:
+            values[name] = fill_nan(block[name]) if name in block else 0.0
+            out[:, i] = values[name]
+
+        # Derived features in float64, like the pandas path
+        hydrogen_percentage = values['hydrogen_percentage']
+        fuel_cell_age_years = values['fuel_cell_age_years']
+        out[:, _SPEED_SQ] = np.square(values['speed_avg_kmph'])
+        out[:, _ABS_SLOPE] = np.abs(values['terrain_slope'])
+        if 'hydrogen_per_year' in block:
+            out[:, _HYDROGEN_PER_YEAR] = block['hydrogen_per_year']
+        out[:, _AGE_SQUARED] = block['age_squared'] if 'age_squared' in block else np.square(fuel_cell_age_years)
+        with np.errstate(invalid='ignore'):
+            out[:, _H2_X_EFFICIENCY] = (block['h2_x_efficiency'] if 'h2_x_efficiency' in block
+                                        else fill_nan(np.multiply(hydrogen_percentage, values['fuel_cell_efficiency'])))
+            out[:, _H2_X_AGE] = (block['h2_x_age'] if 'h2_x_age' in block
+                                 else fill_nan(np.multiply(hydrogen_percentage, fuel_cell_age_years)))
+    return X
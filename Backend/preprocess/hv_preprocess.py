@@ -9,6 +9,13 @@ from Backend.utils.hv_feature_reference import TRAINED_FEATURES
 if not logging.getLogger().handlers:
     logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
 
+AMBIENT_TEMP_MAP = {'cold': 0, 'mild': 1, 'hot': 2}
+HVAC_MAP = {'yes': 1, 'no': 0}
+
+# One-hot columns are categorical features in the trained model. The categories must be
+# fixed so that a row encodes the same way alone or inside a batch (codes: False=0, True=1).
+DUMMY_DTYPE = pd.CategoricalDtype(categories=[False, True])
+
 
 # --- Function to map numerical ambient_temp to categorical strings ---
 # This function assumes the input temp_value is already a number.
@@ -44,7 +51,7 @@ def preprocess_hv_input(input_data: dict | pd.DataFrame, is_training_data: bool
     # Ensure it's treated as string initially, then apply the map to get numeric categories.
     df['ambient_temp'] = df['ambient_temp'].astype(str).str.lower()
     
-    ambient_map = {'cold': 0, 'mild': 1, 'hot': 2}
+    ambient_map = AMBIENT_TEMP_MAP
 
     if single_row_mode:
         if df['ambient_temp'].iloc[0] not in ambient_map:
@@ -60,7 +67,7 @@ def preprocess_hv_input(input_data: dict | pd.DataFrame, is_training_data: bool
     # 2. Handle 'hvac_on' mapping from 'yes'/'no' to binary (1/0)
     df['hvac_on'] = df['hvac_on'].astype(str).str.lower()
     
-    hvac_map = {'yes': 1, 'no': 0}
+    hvac_map = HVAC_MAP
     if single_row_mode:
         if df['hvac_on'].iloc[0] not in hvac_map:
             raise HTTPException(status_code=400, detail=f"Invalid hvac_on value: {df['hvac_on'].iloc[0]}. Expected 'yes' or 'no'.")
@@ -106,10 +113,9 @@ def preprocess_hv_input(input_data: dict | pd.DataFrame, is_training_data: bool
     for col in ['driving_mode_normal', 'driving_mode_sport', 'driving_mode_eco', 
                 'drive_type_FWD', 'drive_type_RWD', 'drive_type_AWD']:
         if col in df.columns:
-            df[col] = df[col].astype('category')
+            df[col] = df[col].astype(bool).astype(DUMMY_DTYPE)
         else:
-            df[col] = 0
-            df[col] = df[col].astype('category')
+            df[col] = pd.Series(False, index=df.index, dtype=DUMMY_DTYPE)
 
 
     # 5. Align with TRAINED_FEATURES
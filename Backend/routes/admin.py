@@ -0,0 +1,57 @@
+# Backend/routes/admin.py
+
+from fastapi import APIRouter, HTTPException
+from Backend.routes import predict_ev, predict_hv
+from Backend.models.registry import registry, ModelReloadError
+from Backend.utils.road_graph import graph_names, loaded_graphs
+
+router = APIRouter()
+
+@router.get("/models")
+def get_model_stats():
+    """
+    Load state, version, load time and memory of each registered model.
+    """
+    return registry.stats()
+
+@router.post("/models/{name}/reload")
+def reload_model(name: str):
+    """
+    Loads the model's file again and, if it passes the smoke test, swaps it in without a restart.
+    Requests already being served finish on the previous model. 409 when the new file is rejected.
+    """
+    try:
+        return registry.reload(name)
+    except KeyError as e:
+        raise HTTPException(status_code=404, detail=str(e.args[0]))
+    except ModelReloadError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+@router.get("/cache")
+def get_cache_stats():
+    """
+    Hit/miss/eviction counters of the EV and HV prediction caches.
+    """
+    return {
+        "ev": predict_ev.cache.stats(),
+        "hv": predict_hv.cache.stats(),
+    }
+
+@router.delete("/cache")
+def clear_caches():
+    """
+    Drops every cached prediction (counters are kept).
+    """
+    predict_ev.cache.clear()
+    predict_hv.cache.clear()
+    return {"cleared": True}
+
+@router.get("/graphs")
+def get_graph_stats():
+    """
+    Road graphs available for stop planning, and the size and edge-range memo of the loaded ones.
+    """
+    return {
+        "available": graph_names(),
+        "loaded": [graph.info() for graph in loaded_graphs()],
+    }
@@ -0,0 +1,53 @@
+# Backend/routes/bulk.py
+
+import io
+import tempfile
+from typing import Literal
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from Backend.utils.stream_scoring import (
+    open_input, stream_chunk_scores, INPUT_FORMATS, OUTPUT_FORMATS, MEDIA_TYPES, DEFAULT_CHUNK_ROWS,
+)
+from Backend.config import BULK_SPOOL_MAX_MEMORY_BYTES
+
+router = APIRouter()
+
+@router.post("/{vehicle}/stream")
+async def stream_bulk_predictions(vehicle: Literal["ev", "hv"], request: Request,
+                                  input_format: str = "csv", output_format: str = "ndjson",
+                                  chunk_rows: int = DEFAULT_CHUNK_ROWS):
+    """
+    Scores an uploaded trip log (CSV with header or NDJSON, in the ev_data.csv / hv.csv layout)
+    and streams back one prediction per input row as NDJSON or CSV.
+
+    The upload is read chunk by chunk into a spool that moves to a temporary file past
+    BULK_SPOOL_MAX_MEMORY_BYTES, then scored 'chunk_rows' rows at a time while the response
+    streams, so memory stays flat for any file size.
+    """
+    if input_format not in INPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid input_format: {input_format}. Expected one of {INPUT_FORMATS}.")
+    if output_format not in OUTPUT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Invalid output_format: {output_format}. Expected one of {OUTPUT_FORMATS}.")
+    if chunk_rows < 1:
+        raise HTTPException(status_code=400, detail="chunk_rows must be at least 1.")
+
+    spool = tempfile.SpooledTemporaryFile(max_size=BULK_SPOOL_MAX_MEMORY_BYTES)
+    async for chunk in request.stream():
+        await run_in_threadpool(spool.write, chunk) # Disk I/O once the spool has rolled over
+    spool.seek(0)
+
+    source = io.TextIOWrapper(spool, encoding="utf-8")
+    # The first chunk is parsed and checked before the response starts, so a bad file gets a 400
+    # instead of a 200 with an empty body
+    try:
+        chunks = await run_in_threadpool(open_input, vehicle, source, input_format, chunk_rows)
+    except ValueError as e: # Also parse and decode errors
+        source.close()
+        raise HTTPException(status_code=400, detail=f"Could not read the upload: {e}")
+    return StreamingResponse(
+        stream_chunk_scores(vehicle, chunks, output_format), # Sync generator, run in the threadpool
+        media_type=MEDIA_TYPES[output_format],
+        background=BackgroundTask(source.close),
+    )
@@ -0,0 +1,33 @@
+# Backend/routes/metrics.py
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from Backend.routes import predict_ev, predict_hv
+from Backend.utils.metrics import metrics, CONTENT_TYPE
+
+router = APIRouter()
+
+def _cache_and_batcher_metrics():
+    # Read from the caches and micro-batchers at scrape time, so the hot path records nothing extra
+    caches = {"ev": predict_ev.cache.stats(), "hv": predict_hv.cache.stats()}
+    batchers = {"ev": predict_ev.batcher, "hv": predict_hv.batcher}
+    for field, help in (("hits", "Prediction cache hits."), ("misses", "Prediction cache misses."),
+                        ("evictions", "Entries dropped to stay within PREDICTION_CACHE_SIZE."),
+                        ("expirations", "Entries dropped because PREDICTION_CACHE_TTL_S ran out.")):
+        yield (f"greenmiles_prediction_cache_{field}_total", "counter", help,
+               [({"model": model}, stats[field]) for model, stats in caches.items()])
+    yield ("greenmiles_prediction_cache_entries", "gauge", "Predictions currently cached.",
+           [({"model": model}, stats["size"]) for model, stats in caches.items()])
+    yield ("greenmiles_micro_batches_total", "counter", "Model calls made by the micro-batcher.",
+           [({"model": model}, batcher.batches) for model, batcher in batchers.items()])
+    yield ("greenmiles_micro_batch_rows_total", "counter", "Single-row requests scored through the micro-batcher.",
+           [({"model": model}, batcher.rows) for model, batcher in batchers.items()])
+
+metrics.add_collector(_cache_and_batcher_metrics)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    Request counts, per-stage latency histograms, batch sizes and cache counters in the Prometheus text format.
+    """
+    return PlainTextResponse(metrics.render(), media_type=CONTENT_TYPE)
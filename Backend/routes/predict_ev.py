@@ -1,24 +1,205 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Body, HTTPException
 import joblib
+import logging
 import os
-from Backend.schemas.ev_schema import EVInput
-from Backend.models.model_loader import load_ev_model
-from Backend.preprocess.ev_preprocess import preprocess_ev_input
+import math
+import pandas as pd
+from typing import Any, List
+from Backend.schemas.ev_schema import EVInput, EVTripInput
+from Backend.schemas.batch_schema import BatchPredictionResponse
+from Backend.schemas.suggestion_schema import RangeSuggestionResponse
+from Backend.schemas.sweep_schema import EVSweepRequest, SweepResponse
+from Backend.schemas.trip_schema import EVTripSimulationRequest, TripSimulationResponse
+from Backend.schemas.plan_schema import EVStopPlanRequest, StopPlanResponse
+from Backend.agents.suggestion_agent import get_ev_suggestions
+from Backend.models.registry import registry
+from Backend.models.prediction_cache import PredictionCache
+from Backend.preprocess.ev_preprocess import AMBIENT_TEMP_MAP
+from Backend.preprocess.ev_encoder import encode_ev_row, encode_ev_frame, check_one_hot_values
+from Backend.models.micro_batcher import MicroBatcher
+from Backend.utils.batch import validate_rows, assemble_results, predict_frame
+from Backend.utils.sweep import SweepError, resolve_axes, build_sweep_frame, sweep_response
+from Backend.utils.trip import LEVEL_COLUMNS, TripError, build_trip_frame, simulate_trip
+from Backend.utils.road_graph import get_graph
+from Backend.utils.stop_planner import EdgeRanges, PlanError, plan_stops
+from Backend.utils.metrics import track_stage, mark_validated, count_error, observe_batch
+from Backend.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S
 
 router = APIRouter()
 
-# Load model
-model = load_ev_model()
+# The model is loaded on first use (or by the startup warm-up) through the shared registry
+def _predict_batch(rows):
+    return registry.get("ev").predict(rows)
+
+# Concurrent single-row requests share one model.predict call
+batcher = MicroBatcher(_predict_batch, max_batch_size=MICRO_BATCH_MAX_SIZE, max_wait_ms=MICRO_BATCH_MAX_WAIT_MS, name="ev")
+
+# Repeated polls with the same vehicle state skip the model entirely
+cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_s=PREDICTION_CACHE_TTL_S)
+
+async def _predict_row(row) -> float:
+    loaded = await registry.aget("ev")
+    key = cache.make_key(loaded.version, row)
+    prediction = cache.get(key)
+    if prediction is None:
+        prediction = await batcher.predict(row)
+        if math.isfinite(prediction): # Never serve a bad prediction from the cache
+            cache.put(key, prediction)
+    return prediction
 
 @router.post("/ev")
-def predict_range(input_data: EVInput):
+async def predict_range(input_data: EVInput):
+    mark_validated()
     input_dict = input_data.dict()
     print("Incoming data:", input_dict)
 
     try:
-        df = preprocess_ev_input(input_dict)
-        prediction = model.predict(df)[0]
+        with track_stage("preprocess"):
+            row = encode_ev_row(input_dict) # NumPy fast path, identical to preprocess_ev_input
+        with track_stage("predict"): # Includes the cache lookup and the micro-batch wait
+            prediction = await _predict_row(row)
         return {"predicted_range_km": round(float(prediction), 2)}
     except Exception as e:
         print("❌ Error during prediction:", e)
-        return {"detail": "Internal Server Error"}
\ No newline at end of file
+        count_error()
+        return {"detail": "Internal Server Error"}
+
+@router.post("/ev/with-suggestions", response_model=RangeSuggestionResponse)
+async def predict_range_with_suggestions(input_data: EVTripInput):
+    """
+    Predicted range and suggestions for one EV input in a single call, instead of /predict/ev
+    followed by /suggest/ev/suggestions: the input is validated and converted once, and the
+    suggestions see the prediction (e.g. a range short of distance_to_next_charger_km).
+    """
+    mark_validated()
+    input_dict = input_data.dict()
+    with track_stage("preprocess"):
+        row = encode_ev_row(input_dict) # HTTPException(400) for an unknown ambient_temp
+
+    try:
+        with track_stage("predict"):
+            prediction = float(await _predict_row(row))
+        if not math.isfinite(prediction):
+            raise ValueError(f"Model returned invalid prediction: {prediction}")
+    except Exception as e:
+        logging.exception("Prediction with suggestions failed")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}")
+
+    input_dict["predicted_range_km"] = predicted_range_km = round(prediction, 2)
+    with track_stage("rules"):
+        suggestions = get_ev_suggestions(input_dict)
+    return {"predicted_range_km": predicted_range_km, "suggestions": suggestions}
+
+def _check_ev_categoricals(row: dict) -> List[str]:
+    # Batch preprocessing silently maps unknown categories to 0, so reject them per row here
+    if str(row['ambient_temp']).lower() not in AMBIENT_TEMP_MAP:
+        return [f"Invalid ambient_temp: {row['ambient_temp']}. Expected 'cold', 'mild', or 'hot'."]
+    return []
+
+def _check_ev_scenario(row: dict) -> List[str]:
+    # Sweeps, trips and stop plans score rows built from the request, never sent one by one; an
+    # unknown driving_mode / drive_type would be scored as all-zero one-hot columns, so reject it
+    return _check_ev_categoricals(row) + check_one_hot_values(row)
+
+@router.post("/ev/batch", response_model=BatchPredictionResponse)
+def predict_range_batch(rows: List[Any] = Body(...)):
+    """
+    Predicts the range for a list of EV inputs with one vectorized model call.
+    Results come back in input order; invalid rows carry their errors instead of a prediction.
+    """
+    mark_validated()
+    with track_stage("validation"):
+        valid_indices, valid_dicts, errors = validate_rows(rows, EVInput, _check_ev_categoricals)
+
+    predictions = []
+    if valid_dicts:
+        with track_stage("preprocess"):
+            X = encode_ev_frame(pd.DataFrame(valid_dicts)) # Same matrix as preprocess_ev_input
+        with track_stage("predict") as stage:
+            predictions = predict_frame("ev", X) # Large batches go to the process pool when enabled
+        observe_batch("ev", "request", len(X), stage.seconds)
+
+    return {"results": assemble_results(len(rows), valid_indices, predictions, errors)}
+
+@router.post("/ev/sweep", response_model=SweepResponse)
+def predict_range_sweep(request: EVSweepRequest):
+    """
+    What-if sweep: the predicted range over a grid of one or two input fields, all other fields
+    taken from 'base'. The whole grid is encoded as one frame and scored with one model call.
+    """
+    mark_validated()
+    base = request.base.dict()
+    with track_stage("validation"):
+        try:
+            axes = resolve_axes(base, request.axes, EVInput, _check_ev_scenario)
+        except SweepError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    with track_stage("preprocess"):
+        X = encode_ev_frame(build_sweep_frame(base, axes))
+    with track_stage("predict") as stage:
+        predictions = predict_frame("ev", X)
+    observe_batch("ev", "sweep", len(X), stage.seconds)
+    return sweep_response(axes, predictions)
+
+def _score_ev_frame(df: pd.DataFrame):
+    with track_stage("preprocess"):
+        X = encode_ev_frame(df)
+    with track_stage("predict") as stage:
+        predictions = predict_frame("ev", X)
+    observe_batch("ev", "trip", len(X), stage.seconds)
+    return predictions
+
+@router.post("/ev/trip", response_model=TripSimulationResponse)
+def simulate_ev_trip(request: EVTripSimulationRequest):
+    """
+    Simulates a trip of segments with their own driving conditions: the battery level left after
+    each segment and whether the trip can be completed above reserve_percentage. All segments
+    are scored together in each of a few batched passes (see Backend/utils/trip.py).
+    """
+    mark_validated()
+    vehicle = request.vehicle.dict()
+    with track_stage("validation"):
+        try:
+            frame, distances = build_trip_frame(vehicle, request.segments, _check_ev_scenario)
+        except TripError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return simulate_trip(frame, distances, LEVEL_COLUMNS["ev"], _score_ev_frame, request.reserve_percentage)
+    except ValueError as e:
+        logging.exception("Trip simulation failed")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}")
+
+@router.post("/ev/stops", response_model=StopPlanResponse)
+def plan_ev_stops(request: EVStopPlanRequest):
+    """
+    Fastest route between two nodes of a road graph with the charging stops ('charger'
+    nodes) needed to stay above reserve_percentage. Edge ranges are predicted by the model and
+    memoized on the graph (see Backend/utils/stop_planner.py).
+    """
+    mark_validated()
+    vehicle = request.vehicle.dict()
+    with track_stage("validation"):
+        try:
+            graph = get_graph(request.graph)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        except ValueError as e: # GraphError or invalid JSON in the graph file
+            logging.error(f"Could not load graph '{request.graph}': {e}")
+            raise HTTPException(status_code=500, detail=f"Graph '{request.graph}' could not be loaded: {e}")
+        errors = _check_ev_scenario(vehicle)
+        if errors:
+            raise HTTPException(status_code=400, detail=errors[0])
+
+    level_column = LEVEL_COLUMNS["ev"]
+    edge_ranges = EdgeRanges(graph, vehicle, level_column, registry.get("ev").version, _score_ev_frame)
+    try:
+        return plan_stops(graph, edge_ranges, graph.stations["ev"], request.origin, request.destination,
+                          vehicle[level_column], request.reserve_percentage, request.fill_to_percentage,
+                          request.stop_minutes / 60.0)
+    except PlanError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        logging.exception("Stop planning failed")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}")
@@ -1,40 +1,67 @@
 # Backend/routes/predict_hv.py
 
-from fastapi import APIRouter, HTTPException
-from Backend.schemas.hv_schema import HVInput
-from Backend.models.model_loader import load_hv_model
-from Backend.preprocess.hv_preprocess import preprocess_hv_input
+from fastapi import APIRouter, HTTPException, Body
+from typing import Any, List
+import logging
+import pandas as pd
+from Backend.schemas.hv_schema import HVInput, HVTripInput
+from Backend.schemas.batch_schema import BatchPredictionResponse
+from Backend.schemas.suggestion_schema import RangeSuggestionResponse
+from Backend.schemas.sweep_schema import HVSweepRequest, SweepResponse
+from Backend.schemas.trip_schema import HVTripSimulationRequest, TripSimulationResponse
+from Backend.schemas.plan_schema import HVStopPlanRequest, StopPlanResponse
+from Backend.agents.suggestion_agent import get_hv_suggestions
+from Backend.models.registry import registry
+from Backend.models.prediction_cache import PredictionCache
+from Backend.preprocess.hv_preprocess import AMBIENT_TEMP_MAP, HVAC_MAP
+from Backend.preprocess.hv_encoder import encode_hv_row, encode_hv_frame, check_one_hot_values
+from Backend.models.micro_batcher import MicroBatcher
+from Backend.utils.batch import validate_rows, assemble_results, predict_frame
+from Backend.utils.sweep import SweepError, resolve_axes, build_sweep_frame, sweep_response
+from Backend.utils.trip import LEVEL_COLUMNS, TripError, build_trip_frame, simulate_trip
+from Backend.utils.road_graph import get_graph
+from Backend.utils.stop_planner import EdgeRanges, PlanError, plan_stops
+from Backend.utils.metrics import track_stage, mark_validated, observe_batch
+from Backend.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS, PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL_S
 import math # Import math for isnan
 
 router = APIRouter()
 
-# Load model once when the application starts
-model = load_hv_model()
+# The model is loaded on first use (or by the startup warm-up) through the shared registry
+def _predict_batch(rows):
+    return registry.get("hv").predict(rows)
+
+# Concurrent single-row requests share one model.predict call
+batcher = MicroBatcher(_predict_batch, max_batch_size=MICRO_BATCH_MAX_SIZE, max_wait_ms=MICRO_BATCH_MAX_WAIT_MS, name="hv")
+
+# Repeated polls with the same vehicle state skip the model entirely
+cache = PredictionCache(max_size=PREDICTION_CACHE_SIZE, ttl_s=PREDICTION_CACHE_TTL_S)
+
+async def _predict_row(row) -> float:
+    loaded = await registry.aget("hv")
+    key = cache.make_key(loaded.version, row)
+    prediction = cache.get(key)
+    if prediction is None:
+        prediction = await batcher.predict(row)
+        if math.isfinite(prediction): # Never serve a bad prediction from the cache
+            cache.put(key, prediction)
+    return prediction
 
 @router.post("/hv")
-def predict_hv_range(data: HVInput):
+async def predict_hv_range(data: HVInput):
     """
     Predicts the range of a Hydrogen Vehicle based on input data.
     """
+    mark_validated()
     input_dict = data.dict()
     print("--- HV DEBUG: Endpoint hit! Received data:", input_dict)
 
     try:
-        df = preprocess_hv_input(input_dict)
-
-        # Ensure the DataFrame is not empty or malformed after preprocessing
-        if df.empty:
-            raise ValueError("Preprocessing resulted in an empty DataFrame.")
-        if not all(col in df.columns for col in df.columns): # Basic check for column integrity
-             raise ValueError("Preprocessing resulted in missing columns required for prediction.")
-
-        prediction = model.predict(df)
-        
-        # Check if prediction is valid before returning
-        if prediction is None or len(prediction) == 0:
-            raise ValueError("Model returned no prediction.")
+        with track_stage("preprocess"):
+            row = encode_hv_row(input_dict) # NumPy fast path, identical to preprocess_hv_input
 
-        predicted_value = float(prediction[0])
+        with track_stage("predict"): # Includes the cache lookup and the micro-batch wait
+            predicted_value = await _predict_row(row)
 
         if math.isnan(predicted_value) or not math.isfinite(predicted_value):
             # This catches NaN or infinite values from the model
@@ -45,4 +72,149 @@ def predict_hv_range(data: HVInput):
     except Exception as e:
         print("❌ Error during HV prediction:", e)
         # Return a 500 Internal Server Error for unhandled exceptions or prediction errors
-        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}. Check backend logs for details.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}. Check backend logs for details.")
+
+
+@router.post("/hv/with-suggestions", response_model=RangeSuggestionResponse)
+async def predict_hv_range_with_suggestions(data: HVTripInput):
+    """
+    Predicted range and suggestions for one HV input in a single call, instead of /predict/hv
+    followed by /suggest/hv/suggestions: the input is validated and converted once, and the
+    suggestions see the prediction (e.g. a range short of distance_to_next_station_km).
+    """
+    mark_validated()
+    input_dict = data.dict()
+    with track_stage("preprocess"):
+        row = encode_hv_row(input_dict) # HTTPException(400) for an unknown ambient_temp or hvac_on
+
+    try:
+        with track_stage("predict"):
+            predicted_value = float(await _predict_row(row))
+        if not math.isfinite(predicted_value):
+            raise ValueError(f"Model returned invalid prediction: {predicted_value}")
+    except Exception as e:
+        logging.exception("HV prediction with suggestions failed")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}. Check backend logs for details.")
+
+    input_dict["predicted_range_km"] = predicted_range_km = round(predicted_value, 2)
+    with track_stage("rules"):
+        suggestions = get_hv_suggestions(input_dict)
+    return {"predicted_range_km": predicted_range_km, "suggestions": suggestions}
+
+
+def _check_hv_categoricals(row: dict) -> List[str]:
+    # Batch preprocessing silently maps unknown categories to 0, so reject them per row here
+    errors = []
+    if str(row['ambient_temp']).lower() not in AMBIENT_TEMP_MAP:
+        errors.append(f"Invalid ambient_temp: {row['ambient_temp']}. Expected 'cold', 'mild', or 'hot'.")
+    if str(row['hvac_on']).lower() not in HVAC_MAP:
+        errors.append(f"Invalid hvac_on value: {row['hvac_on']}. Expected 'yes' or 'no'.")
+    return errors
+
+def _check_hv_scenario(row: dict) -> List[str]:
+    # Sweeps, trips and stop plans score rows built from the request, never sent one by one; an
+    # unknown driving_mode / drive_type would be scored as all-zero one-hot columns, so reject it
+    return _check_hv_categoricals(row) + check_one_hot_values(row)
+
+@router.post("/hv/batch", response_model=BatchPredictionResponse)
+def predict_hv_range_batch(rows: List[Any] = Body(...)):
+    """
+    Predicts the range for a list of HV inputs with one vectorized model call.
+    Results come back in input order; invalid rows carry their errors instead of a prediction.
+    """
+    mark_validated()
+    with track_stage("validation"):
+        valid_indices, valid_dicts, errors = validate_rows(rows, HVInput, _check_hv_categoricals)
+
+    predictions = []
+    if valid_dicts:
+        with track_stage("preprocess"):
+            X = encode_hv_frame(pd.DataFrame(valid_dicts)) # Same matrix as preprocess_hv_input
+        with track_stage("predict") as stage:
+            predictions = predict_frame("hv", X) # Large batches go to the process pool when enabled
+        observe_batch("hv", "request", len(X), stage.seconds)
+
+    return {"results": assemble_results(len(rows), valid_indices, predictions, errors)}
+
+@router.post("/hv/sweep", response_model=SweepResponse)
+def predict_range_sweep(request: HVSweepRequest):
+    """
+    What-if sweep: the predicted range over a grid of one or two input fields, all other fields
+    taken from 'base'. The whole grid is encoded as one frame and scored with one model call.
+    """
+    mark_validated()
+    base = request.base.dict()
+    with track_stage("validation"):
+        try:
+            axes = resolve_axes(base, request.axes, HVInput, _check_hv_scenario)
+        except SweepError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    with track_stage("preprocess"):
+        X = encode_hv_frame(build_sweep_frame(base, axes))
+    with track_stage("predict") as stage:
+        predictions = predict_frame("hv", X)
+    observe_batch("hv", "sweep", len(X), stage.seconds)
+    return sweep_response(axes, predictions)
+
+def _score_hv_frame(df: pd.DataFrame):
+    with track_stage("preprocess"):
+        X = encode_hv_frame(df)
+    with track_stage("predict") as stage:
+        predictions = predict_frame("hv", X)
+    observe_batch("hv", "trip", len(X), stage.seconds)
+    return predictions
+
+@router.post("/hv/trip", response_model=TripSimulationResponse)
+def simulate_hv_trip(request: HVTripSimulationRequest):
+    """
+    Simulates a trip of segments with their own driving conditions: the hydrogen level left after
+    each segment and whether the trip can be completed above reserve_percentage. All segments
+    are scored together in each of a few batched passes (see Backend/utils/trip.py).
+    """
+    mark_validated()
+    vehicle = request.vehicle.dict()
+    with track_stage("validation"):
+        try:
+            frame, distances = build_trip_frame(vehicle, request.segments, _check_hv_scenario)
+        except TripError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        return simulate_trip(frame, distances, LEVEL_COLUMNS["hv"], _score_hv_frame, request.reserve_percentage)
+    except ValueError as e:
+        logging.exception("Trip simulation failed")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}")
+
+@router.post("/hv/stops", response_model=StopPlanResponse)
+def plan_hv_stops(request: HVStopPlanRequest):
+    """
+    Fastest route between two nodes of a road graph with the hydrogen refuelling stops ('h2_station'
+    nodes) needed to stay above reserve_percentage. Edge ranges are predicted by the model and
+    memoized on the graph (see Backend/utils/stop_planner.py).
+    """
+    mark_validated()
+    vehicle = request.vehicle.dict()
+    with track_stage("validation"):
+        try:
+            graph = get_graph(request.graph)
+        except KeyError as e:
+            raise HTTPException(status_code=404, detail=str(e.args[0]))
+        except ValueError as e: # GraphError or invalid JSON in the graph file
+            logging.error(f"Could not load graph '{request.graph}': {e}")
+            raise HTTPException(status_code=500, detail=f"Graph '{request.graph}' could not be loaded: {e}")
+        errors = _check_hv_scenario(vehicle)
+        if errors:
+            raise HTTPException(status_code=400, detail=errors[0])
+
+    level_column = LEVEL_COLUMNS["hv"]
+    edge_ranges = EdgeRanges(graph, vehicle, level_column, registry.get("hv").version, _score_hv_frame)
+    try:
+        return plan_stops(graph, edge_ranges, graph.stations["hv"], request.origin, request.destination,
+                          vehicle[level_column], request.reserve_percentage, request.fill_to_percentage,
+                          request.stop_minutes / 60.0)
+    except PlanError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ValueError as e:
+        logging.exception("Stop planning failed")
+        raise HTTPException(status_code=500, detail=f"Internal Server Error during prediction: {e}")
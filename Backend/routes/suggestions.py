@@ -1,10 +1,16 @@
 # Backend/routes/suggestions.py
 
-from fastapi import APIRouter
+import pandas as pd
+from typing import Any, Dict, List
+from fastapi import APIRouter, Body
 from Backend.schemas.ev_schema import EVInput
 from Backend.schemas.hv_schema import HVInput # FIX: Corrected import from HVInputData to HVInput
-from Backend.schemas.suggestion_schema import SuggestionResponse
-from Backend.agents.suggestion_agent import get_ev_suggestions, get_hv_suggestions
+from Backend.schemas.suggestion_schema import SuggestionResponse, BatchSuggestionResponse
+from Backend.agents.suggestion_agent import (
+    get_ev_suggestions, get_hv_suggestions, get_ev_suggestions_batch, get_hv_suggestions_batch,
+)
+from Backend.utils.batch import validate_rows, assemble_results
+from Backend.utils.metrics import track_stage, mark_validated
 
 router = APIRouter()
 
@@ -13,7 +19,9 @@ def get_ev_predictive_suggestions(input_data: EVInput):
     """
     Provides rule-based suggestions for Electric Vehicle optimization based on input.
     """
-    suggestions = get_ev_suggestions(input_data.dict())
+    mark_validated()
+    with track_stage("rules"):
+        suggestions = get_ev_suggestions(input_data.dict())
     return {"suggestions": suggestions}
 
 @router.post("/hv/suggestions", response_model=SuggestionResponse)
@@ -21,5 +29,34 @@ def get_hv_predictive_suggestions(input_data: HVInput): # FIX: Corrected type hi
     """
     Provides rule-based suggestions for Hydrogen Vehicle optimization based on input.
     """
-    suggestions = get_hv_suggestions(input_data.dict())
-    return {"suggestions": suggestions}
\ No newline at end of file
+    mark_validated()
+    with track_stage("rules"):
+        suggestions = get_hv_suggestions(input_data.dict())
+    return {"suggestions": suggestions}
+
+def _suggest_batch(rows: List[Any], schema, suggest_batch) -> Dict[str, Any]:
+    mark_validated()
+    with track_stage("validation"):
+        valid_indices, valid_dicts, errors = validate_rows(rows, schema)
+
+    suggestions = []
+    if valid_dicts:
+        with track_stage("rules"):
+            suggestions = suggest_batch(pd.DataFrame(valid_dicts))
+    return {"results": assemble_results(len(rows), valid_indices, suggestions, errors, key="suggestions", convert=list)}
+
+@router.post("/ev/batch", response_model=BatchSuggestionResponse)
+def get_ev_suggestions_for_batch(rows: List[Any] = Body(...)):
+    """
+    Rule-based suggestions for a list of EV inputs, with every rule evaluated once over the whole batch.
+    Results come back in input order; invalid rows carry their errors instead of suggestions.
+    """
+    return _suggest_batch(rows, EVInput, get_ev_suggestions_batch)
+
+@router.post("/hv/batch", response_model=BatchSuggestionResponse)
+def get_hv_suggestions_for_batch(rows: List[Any] = Body(...)):
+    """
+    Rule-based suggestions for a list of HV inputs, with every rule evaluated once over the whole batch.
+    Results come back in input order; invalid rows carry their errors instead of suggestions.
+    """
+    return _suggest_batch(rows, HVInput, get_hv_suggestions_batch)
@@ -0,0 +1,11 @@
+# Backend/schemas/batch_schema.py
+from pydantic import BaseModel
+from typing import List, Optional
+
+class BatchPredictionItem(BaseModel):
+    index: int # Position of the row in the request body
+    predicted_range_km: Optional[float] = None
+    errors: Optional[List[str]] = None # Set instead of predicted_range_km when the row is invalid
+
+class BatchPredictionResponse(BaseModel):
+    results: List[BatchPredictionItem]
@@ -1,5 +1,6 @@
 # Backend/schemas/ev_schema.py
 from pydantic import BaseModel
+from typing import Optional
 
 class EVInput(BaseModel):
     # Raw inputs directly from ev_data.csv structure
@@ -17,4 +18,10 @@ class EVInput(BaseModel):
     top_speed_kmph: float
     total_power_kw: float
     total_torque_nm: float
-    # Note: 'battery_per_kWh' and 'battery_remaining_kWh' are derived *after* input in preprocessing
\ No newline at end of file
+    # Note: 'battery_per_kWh' and 'battery_remaining_kWh' are derived *after* input in preprocessing
+
+
+class EVTripInput(EVInput):
+    # Input of /predict/ev/with-suggestions; with the distance set, the suggestions warn when the
+    # predicted range falls short of it
+    distance_to_next_charger_km: Optional[float] = None
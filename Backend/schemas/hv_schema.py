@@ -1,5 +1,6 @@
 # Backend/schemas/hv_schema.py
 from pydantic import BaseModel
+from typing import Optional
 
 class HVInput(BaseModel):
     # Raw inputs directly from hv.csv structure
@@ -16,4 +17,10 @@ class HVInput(BaseModel):
     cargo_volume_liters: float
     top_speed_kmph: float
     total_power_kw: float
-    total_torque_nm: float
\ No newline at end of file
+    total_torque_nm: float
+
+
+class HVTripInput(HVInput):
+    # Input of /predict/hv/with-suggestions; with the distance set, the suggestions warn when the
+    # predicted range falls short of it
+    distance_to_next_station_km: Optional[float] = None
@@ -0,0 +1,36 @@
+# Backend/schemas/plan_schema.py
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from Backend.schemas.ev_schema import EVInput
+from Backend.schemas.hv_schema import HVInput
+
+class StopPlanRequest(BaseModel):
+    graph: str # Name of a graph file in ROAD_GRAPH_DIR, e.g. 'sample_region'
+    origin: str # Node ids
+    destination: str
+    reserve_percentage: float = Field(10.0, ge=0, le=100) # The level never drops below this between stops
+    fill_to_percentage: float = Field(80.0, ge=0, le=100) # Level after a stop; plan_stops rejects it unless above the reserve
+    stop_minutes: float = Field(30.0, ge=0) # Time one stop adds; never negative, or A* loses its lower bound
+
+class EVStopPlanRequest(StopPlanRequest):
+    vehicle: EVInput # battery_percentage is the level at the origin
+
+class HVStopPlanRequest(StopPlanRequest):
+    vehicle: HVInput # hydrogen_percentage is the level at the origin
+
+class PlannedStop(BaseModel):
+    node: str
+    arrival_percentage: float
+    departure_percentage: float
+
+class StopPlanResponse(BaseModel):
+    feasible: bool
+    route: List[str] = [] # Nodes in driving order, origin and destination included
+    stops: List[PlannedStop] = []
+    distance_km: Optional[float] = None
+    driving_hours: Optional[float] = None
+    total_hours: Optional[float] = None # Driving plus stops
+    arrival_percentage: Optional[float] = None
+    labels_expanded: int
+    edge_predictions: int # Edge ranges scored by the model for this plan
+    edge_cache_hits: int # Edge ranges reused from earlier plans on the graph
@@ -1,6 +1,18 @@
 # Backend/schemas/suggestion_schema.py
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class SuggestionResponse(BaseModel):
-    suggestions: List[str]
\ No newline at end of file
+    suggestions: List[str]
+
+class BatchSuggestionItem(BaseModel):
+    index: int # Position of the row in the request body
+    suggestions: Optional[List[str]] = None
+    errors: Optional[List[str]] = None # Set instead of suggestions when the row is invalid
+
+class BatchSuggestionResponse(BaseModel):
+    results: List[BatchSuggestionItem]
+
+class RangeSuggestionResponse(BaseModel):
+    predicted_range_km: float
+    suggestions: List[str]
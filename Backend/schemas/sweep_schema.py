@@ -0,0 +1,30 @@
+# Backend/schemas/sweep_schema.py
+from pydantic import BaseModel, Field
+from typing import Any, List, Optional
+from Backend.schemas.ev_schema import EVInput
+from Backend.schemas.hv_schema import HVInput
+
+class SweepAxis(BaseModel):
+    field: str # An input field, e.g. 'speed_avg_kmph' or 'driving_mode'
+    values: Optional[List[Any]] = None # Explicit grid, or a numeric one from start/stop/num:
+    start: Optional[float] = None
+    stop: Optional[float] = None
+    num: Optional[int] = Field(None, ge=1) # Evenly spaced points from start to stop, both included
+
+class EVSweepRequest(BaseModel):
+    base: EVInput # Values of the fields no axis varies
+    axes: List[SweepAxis] # One or two
+
+class HVSweepRequest(BaseModel):
+    base: HVInput
+    axes: List[SweepAxis]
+
+class SweepAxisValues(BaseModel):
+    field: str
+    values: List[Any]
+
+class SweepResponse(BaseModel):
+    axes: List[SweepAxisValues]
+    points: int
+    # Nested by axis: predicted_range_km[i] for one axis, predicted_range_km[i][j] for two
+    predicted_range_km: List[Any]
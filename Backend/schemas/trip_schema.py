@@ -0,0 +1,48 @@
+# Backend/schemas/trip_schema.py
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from Backend.schemas.ev_schema import EVInput
+from Backend.schemas.hv_schema import HVInput
+
+class TripSegment(BaseModel):
+    distance_km: float
+    # Driving conditions of this segment; a field left out keeps the value from 'vehicle'
+    speed_avg_kmph: Optional[float] = None
+    terrain_slope: Optional[float] = None
+    acceleration_level: Optional[float] = None
+    ambient_temp: Optional[str] = None
+    driving_mode: Optional[str] = None
+
+class EVTripSegment(TripSegment):
+    hvac_on: Optional[bool] = None
+
+class HVTripSegment(TripSegment):
+    hvac_on: Optional[str] = None
+
+class EVTripSimulationRequest(BaseModel):
+    vehicle: EVInput # battery_percentage is the state of charge at the start of the trip
+    segments: List[EVTripSegment] # In driving order
+    reserve_percentage: float = Field(0.0, ge=0, le=100) # The trip is feasible if the battery never drops below this
+
+class HVTripSimulationRequest(BaseModel):
+    vehicle: HVInput # hydrogen_percentage is the tank level at the start of the trip
+    segments: List[HVTripSegment]
+    reserve_percentage: float = Field(0.0, ge=0, le=100)
+
+class TripSegmentResult(BaseModel):
+    index: int
+    start_percentage: float
+    predicted_range_km: float # At the start of the segment, under its conditions
+    used_percentage: float
+    remaining_percentage: float
+    reachable: bool # Completed without dropping below the reserve
+
+class TripSimulationResponse(BaseModel):
+    feasible: bool
+    total_distance_km: float
+    reachable_distance_km: float # Where the reserve is reached, or the whole trip
+    first_unreachable_segment: Optional[int] = None
+    remaining_percentage: float # At the end of the trip
+    passes: int # Batched predict calls used
+    converged: bool
+    segments: List[TripSegmentResult]
@@ -0,0 +1,187 @@
+# Backend/scripts/benchmark_api.py
+# Load test of the API: drives /predict/ev, /predict/hv, the /suggest routes and the combined
+# /predict/*/with-suggestions routes with payloads sampled from Backend/data/*.csv at one or more
+# concurrency levels, and writes p50/p95/p99 latency and throughput per route as JSON. The app
+# runs in process (httpx ASGITransport), under a uvicorn server started for the run, or is an
+# already running server (--url).
+# Run from the repository root, e.g.:
+#   python -m Backend.scripts.benchmark_api --concurrency 1 8 32
+#   python -m Backend.scripts.benchmark_api --mode uvicorn --workers 2 --baseline outputs/benchmark_api.json
+# With --baseline the run is compared to an earlier results file; the exit code is 1 when a
+# latency percentile or the throughput got worse by more than --max-regression.
+import os
+import sys
+import json
+import time
+import asyncio
+import logging
+import argparse
+import contextlib
+import subprocess
+from typing import Any, Dict, List
+
+import httpx
+
+from Backend.config import MICRO_BATCH_MAX_SIZE, MICRO_BATCH_MAX_WAIT_MS, PREDICTION_CACHE_SIZE, MODEL_FORMAT
+from Backend.utils.bench import (DEFAULT_MAX_REGRESSION, compare_to_baseline, environment_info, latency_summary,
+                                 sample_inputs, write_results)
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+logging.getLogger("httpx").setLevel(logging.WARNING) # One INFO line per request otherwise
+
+# name -> (path, vehicle whose payloads it takes)
+ROUTES = {
+    "predict_ev": ("/predict/ev", "ev"),
+    "predict_hv": ("/predict/hv", "hv"),
+    "suggest_ev": ("/suggest/ev/suggestions", "ev"),
+    "suggest_hv": ("/suggest/hv/suggestions", "hv"),
+    "predict_suggest_ev": ("/predict/ev/with-suggestions", "ev"),
+    "predict_suggest_hv": ("/predict/hv/with-suggestions", "hv"),
+}
+
+
+def load_payloads(vehicle: str, n: int, seed: int) -> List[Dict[str, Any]]:
+    """'n' request bodies sampled from the vehicle's CSV."""
+    return json.loads(sample_inputs(vehicle, n, seed).to_json(orient="records")) # Plain JSON types, as a client would send
+
+
+async def run_load(client: httpx.AsyncClient, path: str, payloads: List[dict], n_requests: int, concurrency: int) -> Dict[str, Any]:
+    """Sends n_requests POSTs from 'concurrency' concurrent clients; each sends its next request when the last one returns."""
+    latencies, errors = [], 0
+    request_ids = iter(range(n_requests)) # Shared by the clients, so the total is exact
+
+    async def client_loop():
+        nonlocal errors
+        for i in request_ids:
+            start = time.perf_counter()
+            response = await client.post(path, json=payloads[i % len(payloads)])
+            latencies.append(time.perf_counter() - start)
+            # /predict/ev answers a failed prediction with 200 and a "detail" body
+            if response.status_code != 200 or "detail" in response.json():
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+    wall_s = time.perf_counter() - start
+    return {"requests": n_requests, "concurrency": concurrency, "errors": errors, "wall_s": round(wall_s, 4),
+            "throughput_rps": round(n_requests / wall_s, 2), **latency_summary(latencies)}
+
+
+async def run_benchmark(client: httpx.AsyncClient, routes: List[str], concurrency_levels: List[int], n_requests: int,
+                        n_payloads: int, warmup: int, seed: int, keep_cache: bool) -> Dict[str, Dict[str, Any]]:
+    payloads = {vehicle: load_payloads(vehicle, n_payloads, seed) for vehicle in {ROUTES[name][1] for name in routes}}
+    results = {}
+    for name in routes:
+        path, vehicle = ROUTES[name]
+        await run_load(client, path, payloads[vehicle][:max(warmup, 1)], warmup, 1) # Loads the model, warms the pools
+        for concurrency in concurrency_levels:
+            if not keep_cache: # Otherwise repeated payloads only measure the prediction cache
+                await client.delete("/admin/cache")
+            result = await run_load(client, path, payloads[vehicle], n_requests, concurrency)
+            results[f"{name}@c{concurrency}"] = {"route": path, **result}
+            logging.info(f"{path} x{concurrency}: p50 {result['p50_ms']:.2f} ms, p95 {result['p95_ms']:.2f} ms, "
+                         f"p99 {result['p99_ms']:.2f} ms, {result['throughput_rps']:.0f} req/s, {result['errors']} errors")
+    return results
+
+
+@contextlib.asynccontextmanager
+async def in_process_client(max_connections: int):
+    from Backend.main import app
+    async with app.router.lifespan_context(app): # Startup warm-up and shutdown, as under uvicorn
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+            yield client
+
+
+@contextlib.asynccontextmanager
+async def http_client(url: str, max_connections: int):
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60.0) as client:
+        yield client
+
+
+@contextlib.contextmanager
+def uvicorn_server(host: str, port: int, workers: int, startup_timeout_s: float = 60.0):
+    """Starts 'uvicorn Backend.main:app' for the run and waits until it answers."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "Backend.main:app", "--host", host, "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning", "--no-access-log"],
+        stdout=subprocess.DEVNULL, # The routes print every request
+    )
+    url = f"http://{host}:{port}"
+    try:
+        deadline = time.monotonic() + startup_timeout_s
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"uvicorn exited with code {process.returncode} during startup.")
+            try:
+                if httpx.get(f"{url}/openapi.json", timeout=1.0).status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"uvicorn did not answer on {url} within {startup_timeout_s:.0f}s.")
+            time.sleep(0.2)
+        logging.info(f"uvicorn serving Backend.main:app on {url} with {workers} worker(s)")
+        yield url
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Load test of the range prediction API.")
+    parser.add_argument("--mode", choices=["inprocess", "uvicorn"], default="inprocess",
+                        help="Serve the app in this process or under a uvicorn server started for the run.")
+    parser.add_argument("--url", default=None, help="Benchmark an already running server instead (e.g. http://localhost:8000).")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (--mode uvicorn).")
+    parser.add_argument("--routes", nargs="+", choices=sorted(ROUTES), default=list(ROUTES))
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32], help="Concurrent clients; one run per level.")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per route and concurrency level.")
+    parser.add_argument("--payloads", type=int, default=1000, help="Distinct payloads sampled per vehicle.")
+    parser.add_argument("--warmup", type=int, default=50, help="Unmeasured requests per route first.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the payload sample.")
+    parser.add_argument("--keep-cache", action="store_true", help="Do not clear the prediction cache before each run.")
+    parser.add_argument("--output", default=os.path.join("outputs", "benchmark_api.json"))
+    parser.add_argument("--baseline", default=None, help="Earlier results file to compare with.")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Relative slowdown that fails the comparison, e.g. 0.1 for 10%%.")
+    args = parser.parse_args(argv)
+
+    async def run(url: str | None):
+        client = in_process_client(max(args.concurrency)) if url is None else http_client(url, max(args.concurrency))
+        async with client as c:
+            return await run_benchmark(c, args.routes, args.concurrency, args.requests, args.payloads,
+                                       args.warmup, args.seed, args.keep_cache)
+
+    mode = "url" if args.url else args.mode
+    if args.url:
+        results = asyncio.run(run(args.url))
+    elif args.mode == "uvicorn":
+        with uvicorn_server(args.host, args.port, args.workers) as url:
+            results = asyncio.run(run(url))
+    else:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull): # The routes print every request
+            results = asyncio.run(run(None))
+
+    settings = {"mode": mode, "workers": args.workers if mode == "uvicorn" else None, "requests": args.requests,
+                "payloads": args.payloads, "warmup": args.warmup, "seed": args.seed, "keep_cache": args.keep_cache,
+                # Server settings, as seen by this process (the same for a server started here)
+                "MICRO_BATCH_MAX_SIZE": MICRO_BATCH_MAX_SIZE, "MICRO_BATCH_MAX_WAIT_MS": MICRO_BATCH_MAX_WAIT_MS,
+                "PREDICTION_CACHE_SIZE": PREDICTION_CACHE_SIZE, "MODEL_FORMAT": MODEL_FORMAT}
+    report = {"benchmark": "api", "environment": environment_info(settings), "results": results}
+    if args.baseline:
+        report["comparison"] = compare_to_baseline(results, args.baseline, ["p50_ms", "p95_ms", "p99_ms", "throughput_rps"],
+                                                   args.max_regression, higher_is_better=["throughput_rps"], settings=settings)
+    write_results(args.output, report)
+    return 1 if any(entry["regression"] for entry in report.get("comparison", [])) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+# Backend/scripts/benchmark_batch_encoder.py
+# Time and peak memory of batch preprocessing on large frames: the pandas path
+# (frame_to_matrix(preprocess_*_input(df))) against the vectorized encode_*_frame, which both
+# return the same float32 feature matrix. Inputs come from the synthetic generators, with the
+# categorical columns as Python strings like a CSV read or a JSON batch produces. Each path runs
+# once untraced for the wall time and once under tracemalloc for its peak allocation above the
+# input frame; the two matrices are compared bit for bit.
+#   python -m Backend.scripts.benchmark_batch_encoder                  # 10M rows, EV and HV
+#   python -m Backend.scripts.benchmark_batch_encoder --rows 1000000 --vehicles ev
+# The pandas path needs several GB at 10M rows; --skip-pandas measures the encoder alone.
+import os
+import gc
+import sys
+import time
+import logging
+import argparse
+import warnings
+import tracemalloc
+from typing import Any, Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Backend.preprocess.ev_encoder import encode_ev_frame
+from Backend.preprocess.ev_preprocess import preprocess_ev_input
+from Backend.preprocess.hv_encoder import encode_hv_frame
+from Backend.preprocess.hv_preprocess import preprocess_hv_input
+from Backend.scripts.generate_ev import generate_ev_chunk
+from Backend.scripts.generate_hv import generate_hv_chunk
+from Backend.utils.batch import frame_to_matrix
+from Backend.utils.bench import environment_info, write_results
+from Backend.utils.dataset import CATEGORICAL_COLUMNS, INPUT_COLUMNS
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+DEFAULT_OUTPUT = os.path.join("outputs", "benchmarks", "batch_encoder.json")
+DEFAULT_ROWS = 10_000_000
+
+# vehicle -> (chunk generator, pandas preprocess, frame encoder)
+PIPELINES = {
+    "ev": (generate_ev_chunk, preprocess_ev_input, encode_ev_frame),
+    "hv": (generate_hv_chunk, preprocess_hv_input, encode_hv_frame),
+}
+
+
+def make_inputs(vehicle: str, rows: int, seed: int) -> pd.DataFrame:
+    """'rows' raw model inputs (no target, no derived columns); categoricals as object strings."""
+    generate_chunk = PIPELINES[vehicle][0]
+    df = generate_chunk(np.random.default_rng(seed), rows)
+    df = df[[col for col in INPUT_COLUMNS[vehicle] if col in df.columns]]
+    for col in CATEGORICAL_COLUMNS:
+        df[col] = df[col].astype(object)
+    return df
+
+
+def measure(func: Callable[[], np.ndarray]) -> Tuple[Dict[str, Any], np.ndarray]:
+    """Wall time of one untraced call, then the peak traced allocation of a second call."""
+    gc.collect()
+    start = time.perf_counter()
+    result = func()
+    seconds = time.perf_counter() - start
+    del result
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        result = func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": round(seconds, 3), "peak_mb": round(peak / 2**20, 1), "output_mb": round(result.nbytes / 2**20, 1)}, result
+
+
+def benchmark_vehicle(vehicle: str, rows: int, seed: int, skip_pandas: bool) -> Dict[str, Dict[str, Any]]:
+    _, preprocess_func, encode_func = PIPELINES[vehicle]
+    df = make_inputs(vehicle, rows, seed)
+    logging.info(f"{vehicle.upper()}: {rows} input rows, {df.memory_usage(deep=False).sum() / 2**20:.0f} MB frame")
+    results = {}
+
+    results[f"{vehicle}/encoder"], encoded = measure(lambda: encode_func(df))
+    logging.info(f"{vehicle}/encoder: {results[f'{vehicle}/encoder']}")
+    if not skip_pandas:
+        results[f"{vehicle}/pandas"], expected = measure(lambda: frame_to_matrix(preprocess_func(df)))
+        logging.info(f"{vehicle}/pandas: {results[f'{vehicle}/pandas']}")
+        identical = bool(np.array_equal(expected.view(np.uint32), encoded.view(np.uint32)))
+        del expected
+        results[f"{vehicle}/encoder"]["identical"] = identical
+        results[f"{vehicle}/encoder"]["speedup"] = round(results[f"{vehicle}/pandas"]["seconds"] / results[f"{vehicle}/encoder"]["seconds"], 1)
+        results[f"{vehicle}/encoder"]["memory_ratio"] = round(results[f"{vehicle}/pandas"]["peak_mb"] / results[f"{vehicle}/encoder"]["peak_mb"], 1)
+        log = logging.info if identical else logging.error
+        log(f"{vehicle}: matrices identical: {identical}")
+    return results
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Time and peak memory of batch preprocessing: pandas path vs frame encoder.")
+    parser.add_argument("--vehicles", nargs="+", choices=sorted(PIPELINES), default=sorted(PIPELINES))
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--skip-pandas", action="store_true", help="Only run the encoder (no parity check).")
+    parser.add_argument("--output", default=DEFAULT_OUTPUT)
+    args = parser.parse_args(argv)
+
+    warnings.simplefilter("ignore", UserWarning)
+    results = {}
+    for vehicle in args.vehicles:
+        results.update(benchmark_vehicle(vehicle, args.rows, args.seed, args.skip_pandas))
+
+    settings = {"rows": args.rows, "seed": args.seed}
+    write_results(args.output, {"benchmark": "batch_encoder", "environment": environment_info(settings), "results": results})
+    return 0 if all(result.get("identical", True) for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,178 @@
+# Backend/scripts/benchmark_hot_paths.py
+# Micro-benchmarks of the per-request hot paths, timeit-style: preprocess_ev_input /
+# preprocess_hv_input on a single dict and on DataFrames of 1, 1k and 1M rows, the NumPy row
+# encoders, model.predict at growing batch sizes, and the suggestion agents (per dict and batched). Each case is run
+# in a calibrated loop (timeit autorange) several times; the median time per call is reported
+# with the per-row cost, so the scaling curves can be read straight off the results. Comparisons
+# use the fastest run by default, which background load on the machine disturbs least.
+# Every run is stored under outputs/benchmarks/ and can be compared with an earlier one:
+#   python -m Backend.scripts.benchmark_hot_paths
+#   python -m Backend.scripts.benchmark_hot_paths --baseline latest --max-regression 0.15
+#   python -m Backend.scripts.benchmark_hot_paths --only predict --predict-sizes 1 64 4096
+# The exit code is 1 when a case got slower than the baseline by more than --max-regression.
+import os
+import sys
+import glob
+import time
+import timeit
+import logging
+import argparse
+import warnings
+import statistics
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from Backend.agents.suggestion_agent import (
+    get_ev_suggestions, get_hv_suggestions, get_ev_suggestions_batch, get_hv_suggestions_batch,
+)
+from Backend.config import MODEL_FORMAT
+from Backend.models.registry import registry
+from Backend.preprocess.ev_encoder import encode_ev_row
+from Backend.preprocess.ev_preprocess import preprocess_ev_input
+from Backend.preprocess.hv_encoder import encode_hv_row
+from Backend.preprocess.hv_preprocess import preprocess_hv_input
+from Backend.schemas.ev_schema import EVInput
+from Backend.schemas.hv_schema import HVInput
+from Backend.utils.batch import frame_to_matrix
+from Backend.utils.bench import DEFAULT_MAX_REGRESSION, compare_to_baseline, environment_info, sample_inputs, write_results
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+RESULTS_DIR = os.path.join("outputs", "benchmarks")
+GROUPS = ("preprocess", "encode", "predict", "suggestions")
+DEFAULT_FRAME_SIZES = [1, 1000, 1_000_000]
+DEFAULT_PREDICT_SIZES = [1, 16, 256, 4096, 65536, 1_000_000]
+SUGGESTION_ROWS = 1000
+
+# vehicle -> (schema, preprocess, row encoder, suggestion agent, batch suggestion agent)
+PIPELINES = {
+    "ev": (EVInput, preprocess_ev_input, encode_ev_row, get_ev_suggestions, get_ev_suggestions_batch),
+    "hv": (HVInput, preprocess_hv_input, encode_hv_row, get_hv_suggestions, get_hv_suggestions_batch),
+}
+
+
+def measure(func: Callable[[], Any], repeats: int, rows: int = 1) -> Dict[str, Any]:
+    """Median/min seconds per call over 'repeats' runs of a loop sized by timeit's autorange (>= 0.2 s)."""
+    timer = timeit.Timer(func)
+    loops, _ = timer.autorange()
+    per_call = [total / loops for total in timer.repeat(repeat=repeats, number=loops)]
+    median = statistics.median(per_call)
+    return {
+        "rows": rows,
+        "median_s": median,
+        "min_s": min(per_call),
+        "stdev_s": statistics.stdev(per_call) if len(per_call) > 1 else 0.0,
+        "per_row_us": round(median / rows * 1e6, 4),
+        "rows_per_s": round(rows / median, 1),
+        "loops": loops,
+        "repeats": repeats,
+    }
+
+
+def api_inputs(vehicle: str, n: int, seed: int) -> List[dict]:
+    """Validated request dicts, as the routes hand them to the preprocessors and agents."""
+    schema = PIPELINES[vehicle][0]
+    unique = sample_inputs(vehicle, min(n, 5000), seed).to_dict(orient="records")
+    validated = [schema(**record).dict() for record in unique]
+    return [validated[i % len(validated)] for i in range(n)]
+
+
+def benchmark_vehicle(vehicle: str, groups: List[str], frame_sizes: List[int], predict_sizes: List[int],
+                      repeats: int, seed: int) -> Dict[str, Dict[str, Any]]:
+    _, preprocess_func, encode_row, suggest, suggest_batch = PIPELINES[vehicle]
+    results = {}
+
+    def run(group: str, variant: str, func: Callable[[], Any], rows: int = 1):
+        case = f"{group}_{vehicle}/{variant}" # e.g. preprocess_ev/frame_1000
+        start = time.perf_counter()
+        results[case] = result = measure(func, repeats, rows)
+        logging.info(f"{case}: {result['median_s'] * 1e3:.4f} ms/call, {result['per_row_us']:.3f} us/row "
+                     f"({time.perf_counter() - start:.1f}s)")
+
+    inputs = api_inputs(vehicle, 5000, seed)
+    one = inputs[0]
+
+    if "preprocess" in groups:
+        run("preprocess", "dict", lambda: preprocess_func(one))
+        for n in frame_sizes:
+            frame = pd.DataFrame([inputs[i % len(inputs)] for i in range(min(n, len(inputs)))])
+            if n > len(frame):
+                frame = pd.concat([frame] * -(-n // len(frame)), ignore_index=True).iloc[:n]
+            run("preprocess", f"frame_{n}", lambda: preprocess_func(frame), rows=n)
+            del frame
+
+    if "encode" in groups:
+        run("encode_row", "dict", lambda: encode_row(one))
+        out = np.zeros_like(encode_row(one))
+        run("encode_row", "dict_preallocated", lambda: encode_row(one, out))
+
+    if "predict" in groups:
+        model = registry.get(vehicle)
+        base = frame_to_matrix(preprocess_func(pd.DataFrame(inputs)))
+        for n in predict_sizes:
+            X = np.ascontiguousarray(np.resize(base, (n, base.shape[1])))
+            run("predict", f"rows_{n}", lambda: model.predict(X), rows=n)
+            del X
+
+    if "suggestions" in groups:
+        rows = inputs[:SUGGESTION_ROWS]
+        run("suggestions", "dict", lambda: suggest(one))
+        run("suggestions", f"loop_{SUGGESTION_ROWS}", lambda: [suggest(row) for row in rows], rows=SUGGESTION_ROWS)
+        frame = pd.DataFrame(rows)
+        run("suggestions", f"batch_{SUGGESTION_ROWS}", lambda: suggest_batch(frame), rows=SUGGESTION_ROWS)
+    return results
+
+
+def resolve_baseline(baseline: str | None, output: str) -> str | None:
+    """'latest' is the newest earlier run in the output's directory."""
+    if baseline != "latest":
+        return baseline
+    runs = sorted(path for path in glob.glob(os.path.join(os.path.dirname(output) or ".", "hot_paths_*.json"))
+                  if os.path.abspath(path) != os.path.abspath(output))
+    if not runs:
+        logging.warning("No earlier run to compare with.")
+        return None
+    return runs[-1]
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks of preprocessing, predict and suggestion hot paths.")
+    parser.add_argument("--vehicles", nargs="+", choices=sorted(PIPELINES), default=sorted(PIPELINES))
+    parser.add_argument("--only", nargs="+", choices=GROUPS, default=list(GROUPS), help="Case groups to run.")
+    parser.add_argument("--frame-sizes", type=int, nargs="+", default=DEFAULT_FRAME_SIZES)
+    parser.add_argument("--predict-sizes", type=int, nargs="+", default=DEFAULT_PREDICT_SIZES)
+    parser.add_argument("--repeats", type=int, default=5, help="Timed runs per case (the median is reported).")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=None,
+                        help=f"Results file (default: {RESULTS_DIR}/hot_paths_<timestamp>.json).")
+    parser.add_argument("--baseline", default=None, help="Results file to compare with, or 'latest'.")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help="Relative slowdown that fails the comparison, e.g. 0.1 for 10%%.")
+    parser.add_argument("--metric", choices=["min_s", "median_s"], default="min_s",
+                        help="Time compared with the baseline; the minimum is the least sensitive to background load.")
+    args = parser.parse_args(argv)
+    output = args.output or os.path.join(RESULTS_DIR, f"hot_paths_{time.strftime('%Y%m%d-%H%M%S')}.json")
+
+    # Pickled-model version and pydantic .dict() deprecation warnings would flood the output
+    warnings.simplefilter("ignore", UserWarning)
+    warnings.simplefilter("ignore", DeprecationWarning)
+    results = {}
+    for vehicle in args.vehicles:
+        results.update(benchmark_vehicle(vehicle, args.only, args.frame_sizes, args.predict_sizes, args.repeats, args.seed))
+
+    settings = {"repeats": args.repeats, "seed": args.seed, "MODEL_FORMAT": MODEL_FORMAT,
+                "OMP_NUM_THREADS": os.getenv("OMP_NUM_THREADS")}
+    report = {"benchmark": "hot_paths", "environment": environment_info(settings), "results": results}
+    baseline = resolve_baseline(args.baseline, output)
+    if baseline:
+        report["baseline"] = baseline
+        report["comparison"] = compare_to_baseline(results, baseline, [args.metric], args.max_regression, settings=settings)
+    write_results(output, report)
+    return 1 if any(entry["regression"] for entry in report.get("comparison", [])) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
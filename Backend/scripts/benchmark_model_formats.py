@@ -0,0 +1,74 @@
+# Backend/scripts/benchmark_model_formats.py
+# Compares the joblib (sklearn XGBRegressor) and native (xgboost.Booster) model formats:
+# import + load time, resident memory after loading, and per-call predict latency.
+# Each format is measured in a fresh interpreter so earlier imports do not skew the numbers.
+# Run from the repository root: python -m Backend.scripts.benchmark_model_formats
+import json
+import subprocess
+import sys
+
+FORMATS = ["joblib", "native"]
+VEHICLES = ["ev", "hv"]
+
+# Executed in the child interpreter; prints one JSON line
+_CHILD = r"""
+import json, sys, time, statistics, warnings
+warnings.simplefilter("ignore")
+fmt, vehicle = sys.argv[1], sys.argv[2]
+
+def rss_bytes():
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+
+rss_start = rss_bytes()
+start = time.perf_counter()
+if fmt == "joblib":
+    import joblib
+    from Backend.models import model_loader
+    model = joblib.load(getattr(model_loader, f"{vehicle.upper()}_MODEL_PATH"))
+else:
+    from Backend.models import model_loader
+    model = model_loader.load_native_booster(getattr(model_loader, f"{vehicle.upper()}_BOOSTER_PATH"))
+load_s = time.perf_counter() - start
+rss_loaded = rss_bytes()
+
+import numpy as np
+n_features = len(model.get_booster().feature_names) if fmt == "joblib" else len(model.booster.feature_names)
+rng = np.random.default_rng(0)
+X = rng.integers(0, 2, size=(1000, n_features)).astype(np.float32)
+for _ in range(50): # Warm-up
+    model.predict(X[:1])
+
+def median_us(rows, repeats):
+    samples = []
+    for i in range(repeats):
+        t = time.perf_counter()
+        model.predict(rows)
+        samples.append(time.perf_counter() - t)
+    return statistics.median(samples) * 1e6
+
+print(json.dumps({
+    "format": fmt,
+    "vehicle": vehicle,
+    "import_and_load_s": round(load_s, 4),
+    "rss_after_load_mb": round(rss_loaded / 2**20, 1),
+    "rss_growth_mb": round((rss_loaded - rss_start) / 2**20, 1),
+    "predict_1_row_us": round(median_us(X[:1], 2000), 1),
+    "predict_1000_rows_us": round(median_us(X, 200), 1),
+}))
+"""
+
+
+def measure(fmt: str, vehicle: str) -> dict:
+    out = subprocess.run([sys.executable, "-c", _CHILD, fmt, vehicle], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+if __name__ == "__main__":
+    results = [measure(fmt, vehicle) for vehicle in VEHICLES for fmt in FORMATS]
+    columns = list(results[0])
+    print(" | ".join(columns))
+    for row in results:
+        print(" | ".join(str(row[col]) for col in columns))
@@ -0,0 +1,73 @@
+# Backend/scripts/compile_trees.py
+# Compiles the trained joblib models into flat NumPy tree arrays (ev_model.trees.npz,
+# hv_model.trees.npz) served with MODEL_FORMAT=compiled, and checks that the NumPy evaluator
+# matches model.predict on the full ev_data.csv / hv.csv datasets.
+# Run from the repository root after training: python -m Backend.scripts.compile_trees
+# --check only verifies the existing .npz files against the joblib models and writes nothing;
+# Backend/tests/test_compiled_trees.py runs the same check in the test suite.
+import sys
+import argparse
+import time
+import logging
+import joblib
+import numpy as np
+import pandas as pd
+
+from Backend.models.model_loader import (
+    EV_MODEL_PATH, HV_MODEL_PATH, EV_COMPILED_PATH, HV_COMPILED_PATH, model_file_version,
+)
+from Backend.models.tree_engine import CompiledTreeEnsemble
+from Backend.preprocess.ev_preprocess import preprocess_ev_input
+from Backend.preprocess.hv_preprocess import preprocess_hv_input
+from Backend.utils.batch import frame_to_matrix
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+EV_DATA_PATH = "Backend/data/ev_data.csv"
+HV_DATA_PATH = "Backend/data/hv.csv"
+
+# Predictions are float32 sums of a few hundred leaves; allow for summation-order rounding
+TOLERANCE_KM = 1e-3
+
+
+def compile_and_check(name, model_path, compiled_path, data_path, target_col, preprocess_func, write=True) -> bool:
+    model = joblib.load(model_path)
+    if write:
+        compiled = CompiledTreeEnsemble.from_booster(model.get_booster(), source_model_version=model_file_version(model_path))
+        compiled.save(compiled_path)
+        logging.info(f"{name}: compiled {len(compiled.roots)} trees ({len(compiled.feature)} nodes, "
+                     f"depth {compiled.max_depth}) to {compiled_path}")
+    else:
+        compiled = CompiledTreeEnsemble.load(compiled_path)
+        logging.info(f"{name}: checking {compiled_path} ({len(compiled.roots)} trees)")
+
+    features = preprocess_func(pd.read_csv(data_path).drop(columns=[target_col]), is_training_data=True)
+    X = frame_to_matrix(features)
+    expected = model.predict(X) # The matrix the API serves; XGBoost 3.x rejects the frame's bool categories
+    actual = CompiledTreeEnsemble.load(compiled_path).predict(X)
+    max_diff = float(np.max(np.abs(expected - actual)))
+    single_row_ok = np.allclose(compiled.predict(X[0]), expected[:1], atol=TOLERANCE_KM)
+    ok = max_diff <= TOLERANCE_KM and single_row_ok
+    logging.info(f"{name}: {len(X)} rows, max |xgboost - numpy| = {max_diff:.2e} km -> {'OK' if ok else 'MISMATCH'}")
+
+    for label, rows in (("1 row", X[:1]), ("1000 rows", X[:1000])):
+        timings = {}
+        for engine, predict in (("xgboost", model.predict), ("numpy", compiled.predict)):
+            predict(rows)
+            start = time.perf_counter()
+            for _ in range(200):
+                predict(rows)
+            timings[engine] = (time.perf_counter() - start) / 200 * 1e6
+        logging.info(f"{name}: predict {label}: xgboost {timings['xgboost']:.0f} us, numpy {timings['numpy']:.0f} us")
+    return ok
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compile the joblib models to NumPy tree arrays and check parity.")
+    parser.add_argument("--check", action="store_true", help="Check the existing .npz files without rewriting them.")
+    args = parser.parse_args()
+    write = not args.check
+    ok = compile_and_check("EV", EV_MODEL_PATH, EV_COMPILED_PATH, EV_DATA_PATH, "electric_range_km", preprocess_ev_input, write)
+    ok &= compile_and_check("HV", HV_MODEL_PATH, HV_COMPILED_PATH, HV_DATA_PATH, "range_in_km", preprocess_hv_input, write)
+    sys.exit(0 if ok else 1)
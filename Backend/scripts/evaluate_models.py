@@ -1,9 +1,12 @@
-import pandas as pd
 import joblib
 import os
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 import numpy as np
 import logging
+import argparse
+
+from Backend.utils.dataset import read_dataset
+from Backend.utils.feature_cache import load_features
 
 # Setup basic logging if not already configured by main script
 if not logging.getLogger().handlers:
@@ -29,19 +32,26 @@ except Exception as e:
     logging.error(f"An unexpected error occurred during EV import check: {e}. EV model evaluation will be skipped.")
     
 
-def evaluate_model(model, preprocess_func, test_data_path, actual_range_col, trained_features_list):
+def evaluate_model(model, preprocess_func, test_data_path, actual_range_col, trained_features_list, vehicle=None, use_feature_cache=True):
     """
     Evaluates a given model using a test dataset and calculates regression metrics.
+    With 'vehicle' ("ev"/"hv") the preprocessed features come from the feature cache, so
+    preprocessing only reruns when the data, the preprocessing code or TRAINED_FEATURES change.
     """
     logging.info(f"\n--- Evaluating Model: {os.path.basename(test_data_path).replace('.csv', '')} ---")
     try:
-        # Load test data
-        test_df = pd.read_csv(test_data_path)
-        actual_ranges = test_df[actual_range_col]
-        input_features_df = test_df.drop(columns=[actual_range_col])
+        if vehicle is not None:
+            features = load_features(test_data_path, vehicle, use_cache=use_feature_cache)
+            preprocessed_test_df = features.to_frame()
+            actual_ranges = features.target_series(actual_range_col)
+        else:
+            # Load test data (memory-mapped typed Parquet copy, converted from the CSV on first use)
+            test_df = read_dataset(test_data_path)
+            actual_ranges = test_df[actual_range_col]
+            input_features_df = test_df.drop(columns=[actual_range_col])
 
-        # Preprocess test data using the flexible preprocess function
-        preprocessed_test_df = preprocess_func(input_features_df, is_training_data=True)
+            # Preprocess test data using the flexible preprocess function
+            preprocessed_test_df = preprocess_func(input_features_df, is_training_data=True)
 
 
         # Make predictions
@@ -64,6 +74,13 @@ def evaluate_model(model, preprocess_func, test_data_path, actual_range_col, tra
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Evaluate the trained EV and HV models.")
+    parser.add_argument("--workers", type=int, default=0,
+                        help="Score across this many worker processes (0 = score in this process).")
+    parser.add_argument("--no-feature-cache", action="store_true",
+                        help="Rerun preprocessing instead of reusing cached features.")
+    args = parser.parse_args()
+
     # --- Paths to your models and test data ---
     EV_MODEL_PATH = os.path.join("Backend", "models", "ev_model.joblib")
     HV_MODEL_PATH = os.path.join("Backend", "models", "hv_model.joblib")
@@ -97,16 +114,32 @@ if __name__ == "__main__":
         hv_model = None # Ensure hv_model is None if loading fails
 
 
+    # --- Optionally score through the process pool (each worker loads the models once) ---
+    scorer = None
+    if args.workers > 0:
+        from Backend.models.process_pool import ProcessPoolScorer
+        # Only the models loaded above, from the same files, so the workers score what the in-process run would
+        pooled = {name: (path, "joblib") for name, path, model in
+                  (("ev", EV_MODEL_PATH, ev_model), ("hv", HV_MODEL_PATH, hv_model)) if model is not None}
+        scorer = ProcessPoolScorer(args.workers, models=pooled) if pooled else None
+        if scorer is not None:
+            logging.info(f"Scoring with {args.workers} worker processes")
+            ev_model = scorer.model("ev") if ev_model else None
+            hv_model = scorer.model("hv") if hv_model else None
+
     # --- Evaluate EV Model ---
     if ev_model and ev_imports_available: # Ensure model loaded AND imports available
         evaluate_model(ev_model, preprocess_ev_input, EV_TEST_DATA_PATH,
-                       actual_range_col='electric_range_km', trained_features_list=EV_TRAINED_FEATURES)
+                       actual_range_col='electric_range_km', trained_features_list=EV_TRAINED_FEATURES, vehicle="ev", use_feature_cache=not args.no_feature_cache)
     else:
         logging.info("Skipping EV model evaluation (files not present or model not loaded).")
 
     # --- Evaluate HV Model ---
     if hv_model: # Evaluate HV if its model loaded
         evaluate_model(hv_model, preprocess_hv_input, HV_TEST_DATA_PATH,
-                       actual_range_col='range_in_km', trained_features_list=HV_TRAINED_FEATURES)
+                       actual_range_col='range_in_km', trained_features_list=HV_TRAINED_FEATURES, vehicle="hv", use_feature_cache=not args.no_feature_cache)
     else:
-        logging.info("Skipping HV model evaluation (model not loaded).")
\ No newline at end of file
+        logging.info("Skipping HV model evaluation (model not loaded).")
+
+    if scorer is not None:
+        scorer.shutdown()
@@ -0,0 +1,45 @@
+# Backend/scripts/export_booster.py
+# Exports the trained joblib models to native XGBoost boosters (UBJSON) plus a metadata
+# sidecar, so the API can serve them with a bare xgboost.Booster (MODEL_FORMAT=native).
+# Run from the repository root after training: python -m Backend.scripts.export_booster
+import json
+import logging
+import joblib
+import xgboost
+
+from Backend.models.model_loader import (
+    EV_MODEL_PATH, HV_MODEL_PATH, EV_BOOSTER_PATH, HV_BOOSTER_PATH, BOOSTER_SCHEMA_VERSION,
+    booster_metadata_path, model_file_version,
+)
+from Backend.utils.ev_feature_reference import TRAINED_FEATURES as EV_TRAINED_FEATURES
+from Backend.utils.hv_feature_reference import TRAINED_FEATURES as HV_TRAINED_FEATURES
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+
+def export_booster(model_path: str, booster_path: str, vehicle: str, trained_features: list) -> dict:
+    model = joblib.load(model_path)
+    booster = model.get_booster()
+    if booster.feature_names != trained_features:
+        raise ValueError(f"{model_path} was trained on {booster.feature_names}, expected TRAINED_FEATURES {trained_features}.")
+
+    booster.save_model(booster_path)
+    metadata = {
+        "schema_version": BOOSTER_SCHEMA_VERSION,
+        "vehicle": vehicle,
+        "feature_names": booster.feature_names,
+        "feature_types": booster.feature_types,
+        "categorical_features": [name for name, kind in zip(booster.feature_names, booster.feature_types) if kind == "c"],
+        "source_model_version": model_file_version(model_path),
+        "xgboost_version": xgboost.__version__,
+    }
+    with open(booster_metadata_path(booster_path), "w") as f:
+        json.dump(metadata, f, indent=2)
+    logging.info(f"Exported {model_path} to {booster_path} ({len(metadata['categorical_features'])} categorical features)")
+    return metadata
+
+
+if __name__ == "__main__":
+    export_booster(EV_MODEL_PATH, EV_BOOSTER_PATH, "ev", EV_TRAINED_FEATURES)
+    export_booster(HV_MODEL_PATH, HV_BOOSTER_PATH, "hv", HV_TRAINED_FEATURES)
@@ -1,99 +1,108 @@
-import random
-import csv
-import os
-
-def generate_and_save_ev_data(num_samples=5000, filename="Backend/data/ev_data.csv"):
+import argparse
+import numpy as np
+import pandas as pd
+
+from Backend.utils.synthetic import DEFAULT_CHUNK_ROWS, choice, write_synthetic_dataset
+
+HEADERS = [
+    'battery_percentage', 'battery_age_years', 'ambient_temp',
+    'terrain_slope', 'speed_avg_kmph', 'acceleration_level', 'hvac_on',
+    'driving_mode', 'drive_type', 'top_speed_kmph', 'total_power_kw',
+    'total_torque_nm', 'battery_capacity_kwh',
+    # Derived features that your model expects
+    'battery_per_kWh', # Derived: battery_percentage / battery_capacity_kwh
+    'battery_remaining_kWh', # Derived: battery_capacity_kwh * battery_percentage / 100
+    'electric_range_km' # Target variable
+]
+
+AMBIENT_TEMPS = ['cold', 'mild', 'hot']
+HVAC_OPTIONS = ['yes', 'no']
+DRIVING_MODES = ['Normal', 'Sport', 'Eco']
+DRIVE_TYPES = ['FWD', 'RWD']
+
+
+def generate_ev_chunk(rng: np.random.Generator, n: int) -> pd.DataFrame:
+    """Generates 'n' EV rows at once; same distributions and range formula as the original per-row loop."""
+    def uniform(low, high):
+        return np.round(rng.uniform(low, high, n), 2)
+
+    # Generate base input features
+    battery_percentage = uniform(10.0, 100.0)
+    battery_age_years = uniform(0.0, 10.0)
+    ambient_temp = choice(rng, AMBIENT_TEMPS, n)
+    terrain_slope = uniform(-5.0, 5.0)
+    speed_avg_kmph = uniform(20.0, 130.0)
+    acceleration_level = uniform(0.0, 1.0)
+    hvac_on = choice(rng, HVAC_OPTIONS, n)
+    driving_mode = choice(rng, DRIVING_MODES, n)
+    drive_type = choice(rng, DRIVE_TYPES, n)
+    top_speed_kmph = uniform(120.0, 250.0)
+    total_power_kw = uniform(50.0, 200.0)
+    total_torque_nm = uniform(100.0, 600.0)
+    battery_capacity_kwh = uniform(30.0, 100.0)
+
+    # Calculate derived features (ensuring consistency with train_ev.py and ev_preprocess.py)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        battery_per_kWh = np.round(np.where(battery_capacity_kwh != 0, battery_percentage / battery_capacity_kwh, 0.0), 2)
+    battery_remaining_kWh = np.round(battery_capacity_kwh * battery_percentage / 100.0, 2)
+
+    # Simulate electric_range_km based on plausible relationships
+    base_range = 300.0
+
+    range_km = np.full(n, base_range)
+    range_km += (battery_percentage / 100.0) * battery_capacity_kwh * 4.0
+    range_km -= battery_age_years * 5.0
+
+    range_km -= np.select([ambient_temp == 'cold', ambient_temp == 'hot'], [40.0, 20.0], 0.0)
+
+    range_km -= np.select([speed_avg_kmph > 90, speed_avg_kmph < 50],
+                          [(speed_avg_kmph - 90) * 0.8, (50 - speed_avg_kmph) * 0.5], 0.0)
+
+    range_km -= np.abs(terrain_slope) * 3.0
+    range_km -= acceleration_level * 40.0
+
+    range_km -= np.where(hvac_on == 'yes', 25.0, 0.0)
+
+    range_km += np.select([driving_mode == 'Sport', driving_mode == 'Eco'], [-15.0, 10.0], 0.0)
+
+    range_km -= (total_power_kw / 100) * 5.0
+
+    range_km += rng.uniform(-15.0, 15.0, n)
+
+    electric_range_km = np.maximum(0.0, np.round(range_km, 2))
+
+    return pd.DataFrame(dict(zip(HEADERS, [
+        battery_percentage, battery_age_years, ambient_temp,
+        terrain_slope, speed_avg_kmph, acceleration_level, hvac_on,
+        driving_mode, drive_type, top_speed_kmph, total_power_kw,
+        total_torque_nm, battery_capacity_kwh,
+        battery_per_kWh, battery_remaining_kWh, electric_range_km
+    ])))
+
+
+def generate_and_save_ev_data(num_samples=5000, filename="Backend/data/ev_data.csv", seed=None,
+                              chunk_rows=DEFAULT_CHUNK_ROWS, workers=1, output_format=None):
     """
     Generates synthetic data for Electric Vehicle (EV) range prediction
-    and saves it to a CSV file.
+    and saves it to a CSV (or Parquet) file, 'chunk_rows' rows at a time.
+    A fixed 'seed' gives the same file for any number of 'workers'.
     """
-    headers = [
-        'battery_percentage', 'battery_age_years', 'ambient_temp',
-        'terrain_slope', 'speed_avg_kmph', 'acceleration_level', 'hvac_on',
-        'driving_mode', 'drive_type', 'top_speed_kmph', 'total_power_kw',
-        'total_torque_nm', 'battery_capacity_kwh',
-        # Derived features that your model expects
-        'battery_per_kWh', # Derived: battery_percentage / battery_capacity_kwh
-        'battery_remaining_kWh', # Derived: battery_capacity_kwh * battery_percentage / 100
-        'electric_range_km' # Target variable
-    ]
-
-    ambient_temps = ['cold', 'mild', 'hot']
-    hvac_options = ['yes', 'no']
-    driving_modes = ['Normal', 'Sport', 'Eco']
-    drive_types = ['FWD', 'RWD']
-
-    data = []
-    for _ in range(num_samples):
-        # Generate base input features
-        battery_percentage = round(random.uniform(10.0, 100.0), 2)
-        battery_age_years = round(random.uniform(0.0, 10.0), 2)
-        ambient_temp = random.choice(ambient_temps)
-        terrain_slope = round(random.uniform(-5.0, 5.0), 2)
-        speed_avg_kmph = round(random.uniform(20.0, 130.0), 2)
-        acceleration_level = round(random.uniform(0.0, 1.0), 2)
-        hvac_on = random.choice(hvac_options)
-        driving_mode = random.choice(driving_modes)
-        drive_type = random.choice(drive_types)
-        top_speed_kmph = round(random.uniform(120.0, 250.0), 2)
-        total_power_kw = round(random.uniform(50.0, 200.0), 2)
-        total_torque_nm = round(random.uniform(100.0, 600.0), 2)
-        battery_capacity_kwh = round(random.uniform(30.0, 100.0), 2)
-
-        # Calculate derived features (ensuring consistency with train_ev.py and ev_preprocess.py)
-        battery_per_kWh = round(battery_percentage / battery_capacity_kwh if battery_capacity_kwh != 0 else 0.0, 2)
-        battery_remaining_kWh = round(battery_capacity_kwh * battery_percentage / 100.0, 2)
-
-        # Simulate electric_range_km based on plausible relationships
-        base_range = 300.0
-
-        range_km = base_range
-        range_km += (battery_percentage / 100.0) * battery_capacity_kwh * 4.0
-        range_km -= battery_age_years * 5.0
-
-        if ambient_temp == 'cold':
-            range_km -= 40.0
-        elif ambient_temp == 'hot':
-            range_km -= 20.0
-
-        if speed_avg_kmph > 90:
-            range_km -= (speed_avg_kmph - 90) * 0.8
-        elif speed_avg_kmph < 50:
-            range_km -= (50 - speed_avg_kmph) * 0.5
-
-        range_km -= abs(terrain_slope) * 3.0
-        range_km -= acceleration_level * 40.0
-
-        if hvac_on == 'yes':
-            range_km -= 25.0
-
-        if driving_mode == 'Sport':
-            range_km -= 15.0
-        elif driving_mode == 'Eco':
-            range_km += 10.0
-            
-        range_km -= (total_power_kw / 100) * 5.0 
-
-        range_km += random.uniform(-15.0, 15.0)
-
-        electric_range_km = max(0.0, round(range_km, 2))
-
-        data.append([
-            battery_percentage, battery_age_years, ambient_temp,
-            terrain_slope, speed_avg_kmph, acceleration_level, hvac_on,
-            driving_mode, drive_type, top_speed_kmph, total_power_kw,
-            total_torque_nm, battery_capacity_kwh,
-            battery_per_kWh, battery_remaining_kWh, electric_range_km
-        ])
-
     try:
-        with open(filename, 'w', newline='') as csvfile:
-            writer = csv.writer(csvfile)
-            writer.writerow(headers)
-            writer.writerows(data)
+        write_synthetic_dataset(generate_ev_chunk, num_samples, filename, seed=seed, chunk_rows=chunk_rows,
+                                workers=workers, output_format=output_format)
         print(f"Successfully generated and saved {num_samples} samples to '{filename}'")
     except IOError as e:
         print(f"Error saving file '{filename}': {e}")
 
+
 if __name__ == "__main__":
-    generate_and_save_ev_data(num_samples=5000, filename="Backend/data/ev_data.csv")
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Generate synthetic EV range data.")
+    parser.add_argument("--num-samples", type=int, default=5000)
+    parser.add_argument("--output", default="Backend/data/ev_data.csv", help="A .parquet extension selects Parquet output")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS)
+    parser.add_argument("--workers", type=int, default=1, help="Processes generating chunks in parallel")
+    parser.add_argument("--format", choices=["csv", "parquet"], default=None, dest="output_format")
+    args = parser.parse_args()
+    generate_and_save_ev_data(num_samples=args.num_samples, filename=args.output, seed=args.seed,
+                              chunk_rows=args.chunk_rows, workers=args.workers, output_format=args.output_format)
@@ -0,0 +1,42 @@
+# Backend/scripts/stream_score.py
+# Scores a trip log of any size in fixed-size chunks and writes one prediction per row.
+# Example, from the repository root:
+#   python -m Backend.scripts.stream_score --vehicle ev --input trips.csv --output predictions.ndjson
+# Use '-' for stdin/stdout.
+import argparse
+import logging
+import sys
+import time
+
+from Backend.utils.stream_scoring import stream_scores, INPUT_FORMATS, OUTPUT_FORMATS, DEFAULT_CHUNK_ROWS
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream range predictions for a CSV/NDJSON trip log.")
+    parser.add_argument("--vehicle", choices=["ev", "hv"], required=True)
+    parser.add_argument("--input", required=True, help="Input file path, or '-' for stdin.")
+    parser.add_argument("--output", default="-", help="Output file path, or '-' for stdout (default).")
+    parser.add_argument("--input-format", choices=INPUT_FORMATS, default="csv")
+    parser.add_argument("--output-format", choices=OUTPUT_FORMATS, default="ndjson")
+    parser.add_argument("--chunk-rows", type=int, default=DEFAULT_CHUNK_ROWS, help="Rows scored per chunk.")
+    args = parser.parse_args(argv)
+
+    source = sys.stdin if args.input == "-" else open(args.input, newline="")
+    sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    start = time.perf_counter()
+    try:
+        for text in stream_scores(args.vehicle, source, args.input_format, args.output_format, args.chunk_rows):
+            sink.write(text)
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+    logging.info(f"Scored {args.input} in {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
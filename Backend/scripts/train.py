@@ -0,0 +1,60 @@
+# Backend/scripts/train.py
+# Trains the EV or HV range model. Run from the repository root, e.g.:
+#   python -m Backend.scripts.train --vehicle ev
+#   python -m Backend.scripts.train --vehicle hv --search halving --nthread 8 --max-bin 128
+#   python -m Backend.scripts.train --vehicle ev --data big.parquet --data-mode external --search none
+# Metrics, plots, search logs and <vehicle>_train_profile.csv go to --output-dir.
+import os
+import sys
+import json
+import logging
+import argparse
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from Backend.training.pipeline import (DATA_MODES, DEFAULT_BATCH_ROWS, DEFAULT_MAX_BIN, SEARCH_MODES, VEHICLES,
+                                       train_model)
+
+
+def setup_logging(log_dir: str, vehicle: str):
+    os.makedirs(log_dir, exist_ok=True)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(message)s",
+        handlers=[
+            logging.FileHandler(os.path.join(log_dir, f"train_{vehicle}.log")),
+            logging.StreamHandler()
+        ]
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Train the EV or HV range model.")
+    parser.add_argument("--vehicle", choices=sorted(VEHICLES), required=True)
+    parser.add_argument("--data", default=None, help="Training CSV or Parquet file (default: ev_data.csv / hv.csv).")
+    parser.add_argument("--model-out", default=None, help="Model path (default: Backend/models/<vehicle>_model.joblib).")
+    parser.add_argument("--output-dir", default="outputs", help="Directory for metrics, plots and profiles.")
+    parser.add_argument("--log-dir", default=os.path.join("server", "logs"))
+    parser.add_argument("--search", choices=SEARCH_MODES, default="grid",
+                        help="grid: exhaustive 5-fold GridSearchCV; halving: successive halving with early stopping; "
+                             "none: train once with --params")
+    parser.add_argument("--params", type=json.loads, default=None,
+                        help='Hyperparameters for --search none, as JSON, e.g. \'{"n_estimators": 300, "max_depth": 5}\'.')
+    parser.add_argument("--data-mode", choices=DATA_MODES, default="memory",
+                        help="memory: cached feature matrix; stream: Parquet batches into QuantileDMatrix; "
+                             "external: external-memory DMatrix paged to disk")
+    parser.add_argument("--batch-rows", type=int, default=DEFAULT_BATCH_ROWS, help="Rows per batch for stream/external.")
+    parser.add_argument("--nthread", type=int, default=0, help="XGBoost threads (0 = all cores).")
+    parser.add_argument("--max-bin", type=int, default=DEFAULT_MAX_BIN, help="Histogram bins per feature.")
+    parser.add_argument("--no-feature-cache", action="store_true", help="Rerun preprocessing instead of using cached features.")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    setup_logging(args.log_dir, args.vehicle)
+    train_model(args.vehicle, data_path=args.data, model_path=args.model_out, output_dir=args.output_dir,
+                search=args.search, data_mode=args.data_mode, nthread=args.nthread, max_bin=args.max_bin,
+                batch_rows=args.batch_rows, params=args.params, use_feature_cache=not args.no_feature_cache,
+                plot=not args.no_plot)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+# Backend/scripts/update_model.py
+# Adds boosting rounds to a trained model from a file of new labeled trips, instead of a full retrain.
+# Run from the repository root, e.g.:
+#   python -m Backend.scripts.update_model --vehicle ev --new-data new_trips.csv --reference ev_data.csv
+#   python -m Backend.scripts.update_model --vehicle ev --new-data new_trips.csv --promote
+# Accepted updates are written to Backend/models/versions/; --promote also replaces the served
+# model (and re-exports its native booster and compiled trees). Exits with 1 when rejected.
+# A running API picks up a promoted model via POST /admin/models/<vehicle>/reload, or on its own
+# when MODEL_RELOAD_POLL_S is set.
+import sys
+import json
+import logging
+import argparse
+
+from Backend.training.artifacts import install_staged, stage_served_artifacts
+from Backend.training.incremental import (DEFAULT_EARLY_STOPPING_ROUNDS, DEFAULT_HOLDOUT_SIZE, DEFAULT_ROUNDS,
+                                          promote_version, update_model)
+from Backend.training.pipeline import VEHICLES
+
+if not logging.getLogger().handlers:
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(message)s")
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Warm-start update of a trained range model from new trip data.")
+    parser.add_argument("--vehicle", choices=sorted(VEHICLES), required=True)
+    parser.add_argument("--new-data", required=True, help="CSV or Parquet file of new labeled trips.")
+    parser.add_argument("--model", default=None, help="Model to update (default: Backend/models/<vehicle>_model.joblib).")
+    parser.add_argument("--rounds", type=int, default=DEFAULT_ROUNDS, help="Maximum boosting rounds to add.")
+    parser.add_argument("--early-stopping-rounds", type=int, default=DEFAULT_EARLY_STOPPING_ROUNDS)
+    parser.add_argument("--holdout-size", type=float, default=DEFAULT_HOLDOUT_SIZE,
+                        help="Share of the new rows held out for early stopping and the regression check.")
+    parser.add_argument("--reference", default=None,
+                        help="Dataset whose pipeline test split must not regress either (e.g. the original training file).")
+    parser.add_argument("--tolerance", type=float, default=0.0, help="Allowed relative RMSE increase, e.g. 0.01 for 1%%.")
+    parser.add_argument("--nthread", type=int, default=0, help="XGBoost threads (0 = all cores).")
+    parser.add_argument("--promote", action="store_true", help="Replace the served model with an accepted update.")
+    args = parser.parse_args(argv)
+
+    report = update_model(args.vehicle, args.new_data, model_path=args.model, rounds=args.rounds,
+                          early_stopping_rounds=args.early_stopping_rounds, holdout_size=args.holdout_size,
+                          reference_path=args.reference, tolerance=args.tolerance, nthread=args.nthread)
+    if report["accepted"] and args.promote:
+        model_path = report["base_model_path"]
+        # Derived artifacts are built first, so a failed export does not leave the new model
+        # served next to a stale booster / compiled trees
+        staged = stage_served_artifacts(args.vehicle, model_path, report["version_path"])
+        promote_version(report["version_path"], model_path)
+        install_staged(staged)
+        if staged:
+            logging.info(f"Re-exported {', '.join(path for _, path in staged)}")
+    print(json.dumps(report, indent=2))
+    return 0 if report["accepted"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
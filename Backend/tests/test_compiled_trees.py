@@ -0,0 +1,83 @@
+# Backend/tests/test_compiled_trees.py
+# The committed .trees.npz files must match model.predict of the joblib models they were compiled
+# from, for single rows and whole batches. Run from the repository root: python -m pytest
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+import xgboost
+
+from Backend.models.model_loader import EV_MODEL_PATH, HV_MODEL_PATH, EV_COMPILED_PATH, HV_COMPILED_PATH
+from Backend.models.tree_engine import CompiledTreeEnsemble, _parse_base_score, load_compiled_trees
+from Backend.preprocess.ev_encoder import encode_ev_frame
+from Backend.preprocess.hv_encoder import encode_hv_frame
+from Backend.scripts.compile_trees import TOLERANCE_KM
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+MODELS = {
+    "ev": (EV_MODEL_PATH, EV_COMPILED_PATH, "ev_data.csv", "electric_range_km", encode_ev_frame),
+    "hv": (HV_MODEL_PATH, HV_COMPILED_PATH, "hv.csv", "range_in_km", encode_hv_frame),
+}
+
+
+@pytest.fixture(scope="module", params=sorted(MODELS))
+def scored(request):
+    model_path, compiled_path, data_file, target_col, encode_frame = MODELS[request.param]
+    X = encode_frame(pd.read_csv(os.path.join(DATA_DIR, data_file)).drop(columns=[target_col]), is_training_data=True)
+    return X, joblib.load(model_path).predict(X), load_compiled_trees(compiled_path)
+
+
+def test_batch_matches_xgboost(scored):
+    X, expected, compiled = scored
+    assert np.max(np.abs(compiled.predict(X) - expected)) < TOLERANCE_KM
+
+
+def test_single_rows_match_xgboost(scored):
+    X, expected, compiled = scored
+    for i in np.random.default_rng(0).choice(len(X), 50, replace=False):
+        assert compiled.predict(X[i]).shape == (1,)
+        assert abs(float(compiled.predict(X[i])[0]) - float(expected[i])) < TOLERANCE_KM
+
+
+def test_chunked_batches_match_one_pass(scored, monkeypatch):
+    X, _, compiled = scored
+    whole = compiled.predict(X)
+    monkeypatch.setattr("Backend.models.tree_engine._CHUNK_ROWS", 7)
+    assert np.array_equal(compiled.predict(X[:100]), whole[:100])
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("3.42866E2", 342.866), # XGBoost < 3.0
+    ("[3.42866E2]", 342.866), # XGBoost 3.x: one entry per target
+    (" [5E-1] ", 0.5),
+    ("0.5", 0.5),
+])
+def test_parse_base_score(value, expected):
+    assert _parse_base_score(value) == pytest.approx(expected)
+
+
+def test_from_booster_matches_installed_xgboost():
+    # A fresh booster is saved in the installed XGBoost's own base_score format
+    rng = np.random.default_rng(0)
+    X = rng.normal(size=(500, 4)).astype(np.float32)
+    y = 300.0 + 40.0 * X[:, 0] - 25.0 * X[:, 1] * (X[:, 2] > 0)
+    X[rng.random(X.shape) < 0.05] = np.nan # Missing values follow default_left
+    booster = xgboost.train({"objective": "reg:squarederror", "max_depth": 4, "seed": 0},
+                            xgboost.DMatrix(X, label=y), num_boost_round=20)
+    compiled = CompiledTreeEnsemble.from_booster(booster)
+    expected = booster.inplace_predict(X)
+    assert compiled.base_score == pytest.approx(float(expected.mean()), rel=0.5) # Not left at 0
+    assert np.max(np.abs(compiled.predict(X) - expected)) < TOLERANCE_KM
+
+
+def test_saved_file_round_trips(tmp_path):
+    compiled = load_compiled_trees(EV_COMPILED_PATH)
+    path = str(tmp_path / "model.trees.npz")
+    compiled.save(path)
+    loaded = CompiledTreeEnsemble.load(path)
+    assert loaded.source_model_version == compiled.source_model_version
+    X = np.random.default_rng(0).normal(size=(20, len(compiled.feature_names))).astype(np.float32)
+    assert np.array_equal(loaded.predict(X), compiled.predict(X))
@@ -0,0 +1,73 @@
+# Backend/tests/test_encoder_parity.py
+# The NumPy row and frame encoders must produce bit-identical features, and so identical
+# predictions, to the pandas preprocess_*_input path. Run from the repository root: python -m pytest
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from Backend.schemas.ev_schema import EVInput
+from Backend.schemas.hv_schema import HVInput
+from Backend.preprocess.ev_preprocess import preprocess_ev_input
+from Backend.preprocess.hv_preprocess import preprocess_hv_input
+from Backend.preprocess.ev_encoder import encode_ev_row, encode_ev_frame
+from Backend.preprocess.hv_encoder import encode_hv_row, encode_hv_frame
+from Backend.models.model_loader import load_ev_model, load_hv_model
+from Backend.utils.batch import frame_to_matrix
+from Backend.scripts.check_encoder_parity import EV_DEFAULTS, EV_EDGE_CASES, HV_EDGE_CASES
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+# The pandas path takes tens of ms per row; a seeded sample keeps the single-row check quick
+SAMPLE_ROWS = 300
+
+VEHICLES = {
+    "ev": (EVInput, "ev_data.csv", "electric_range_km", EV_DEFAULTS, EV_EDGE_CASES,
+           preprocess_ev_input, encode_ev_row, encode_ev_frame, load_ev_model),
+    "hv": (HVInput, "hv.csv", "range_in_km", {}, HV_EDGE_CASES,
+           preprocess_hv_input, encode_hv_row, encode_hv_frame, load_hv_model),
+}
+
+
+def bits(X: np.ndarray) -> np.ndarray:
+    return np.ascontiguousarray(X, dtype=np.float32).view(np.uint32)
+
+
+@pytest.fixture(scope="module", params=sorted(VEHICLES))
+def vehicle(request):
+    schema, data_file, target_col, defaults, edge_cases, preprocess, encode_row, encode_frame, load_model = VEHICLES[request.param]
+    records = pd.read_csv(os.path.join(DATA_DIR, data_file)).drop(columns=[target_col]).to_dict(orient="records")
+    inputs = [schema(**{**defaults, **record}).dict() for record in records]
+    rng = np.random.default_rng(0)
+    sample = [inputs[i] for i in sorted(rng.choice(len(inputs), SAMPLE_ROWS, replace=False))]
+    sample += [dict(inputs[0], **case) for case in edge_cases]
+    return {"inputs": inputs, "sample": sample, "preprocess": preprocess, "encode_row": encode_row,
+            "encode_frame": encode_frame, "model": load_model()}
+
+
+def test_row_encoder_matches_pandas_bits(vehicle):
+    expected = np.vstack([frame_to_matrix(vehicle["preprocess"](row)) for row in vehicle["sample"]])
+    encoded = np.vstack([vehicle["encode_row"](row) for row in vehicle["sample"]])
+    assert np.array_equal(bits(encoded), bits(expected))
+
+    model = vehicle["model"]
+    assert np.array_equal(model.predict(encoded), model.predict(expected))
+
+
+def test_row_encoder_reuses_out_row(vehicle):
+    out = np.full(len(vehicle["encode_row"](vehicle["sample"][0])), np.nan, dtype=np.float32)
+    for row in vehicle["sample"][-3:]:
+        assert np.array_equal(bits(vehicle["encode_row"](row, out=out)), bits(vehicle["encode_row"](row)))
+
+
+@pytest.mark.parametrize("is_training_data", [False, True])
+def test_frame_encoder_matches_pandas_bits(vehicle, is_training_data):
+    # The whole dataset plus the edge cases, which only the sample carries
+    frame = pd.DataFrame(vehicle["inputs"] + vehicle["sample"][-3:])
+    expected = frame_to_matrix(vehicle["preprocess"](frame, is_training_data=is_training_data))
+    encoded = vehicle["encode_frame"](frame, is_training_data=is_training_data)
+    assert np.array_equal(bits(encoded), bits(expected))
+
+    model = vehicle["model"]
+    assert np.array_equal(model.predict(encoded), model.predict(expected))
@@ -0,0 +1,271 @@
+# Backend/tests/test_stop_planner.py
+# Stop planning on the sample_region fixture with a stub range model, so every edge's energy is
+# known exactly, checked against a plain Dijkstra over (node, level) states. Also covers the edge
+# memo, graph validation and the HTTP errors of the /stops routes. Run from the repository root: python -m pytest
+import heapq
+import json
+import os
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+
+from Backend.main import app
+from Backend.utils import road_graph
+from Backend.utils.road_graph import GraphError, load_graph
+from Backend.utils.stop_planner import EdgeRanges, PlanError, fastest_hours_to, plan_stops
+
+GRAPH_PATH = os.path.join(os.path.dirname(__file__), "..", "data", "graphs", "sample_region.json")
+
+# Edge lengths are multiples of 0.1 km, so with a 1000 km range every edge uses a whole number
+# of 0.01 percentage points and the reference search can track levels exactly
+RANGE_KM = 1000.0
+VEHICLE = {"battery_percentage": 50.0, "driving_mode": "Eco", "speed_avg_kmph": 0.0, "terrain_slope": 0.0}
+
+
+class StubModel:
+    """Predicts the same range for every row and records the frames it is asked to score."""
+
+    def __init__(self, range_km: float = RANGE_KM):
+        self.range_km = range_km
+        self.frames = []
+
+    def __call__(self, frame):
+        self.frames.append(frame)
+        return np.full(len(frame), self.range_km)
+
+    @property
+    def rows(self) -> int:
+        return sum(len(frame) for frame in self.frames)
+
+
+@pytest.fixture
+def graph():
+    return load_graph(GRAPH_PATH) # A fresh graph, so each test starts with an empty edge memo
+
+
+def plan(graph, model, origin, destination, start, reserve=10.0, fill_to=80.0, stop_hours=0.5,
+         vehicle="ev", version="v1", fields=None):
+    edge_ranges = EdgeRanges(graph, {**VEHICLE, **(fields or {}), "battery_percentage": start},
+                             "battery_percentage", version, model)
+    return plan_stops(graph, edge_ranges, graph.stations[vehicle], origin, destination,
+                      start, reserve, fill_to, stop_hours)
+
+
+def reference_plan(graph, stations, origin, destination, start, reserve, fill_to, stop_hours):
+    """Fastest plan by Dijkstra over every (node, level) state, with levels in 0.01% units."""
+    used = np.rint(graph.length_km * 1e4 / RANGE_KM).astype(int)
+    assert np.allclose(used * RANGE_KM / 1e4, graph.length_km)
+    reserve, fill_to = round(reserve * 100), round(fill_to * 100)
+    source, goal = (graph.index[origin], round(start * 100)), graph.index[destination]
+    best, parent = {source: 0.0}, {source: None}
+    heap = [(0.0, source)]
+    while heap:
+        hours, state = heapq.heappop(heap)
+        if hours > best[state]:
+            continue
+        node, level = state
+        if node == goal:
+            steps = []
+            while state is not None:
+                steps.append(state)
+                state = parent[state]
+            steps.reverse()
+            route = [graph.nodes[steps[0][0]]] + [graph.nodes[b] for (a, _), (b, _) in zip(steps, steps[1:]) if a != b]
+            stops = [graph.nodes[b] for (a, _), (b, _) in zip(steps, steps[1:]) if a == b]
+            return {"total_hours": hours, "route": route, "stops": stops}
+        moves = [((int(graph.target[e]), level - used[e]), graph.hours[e])
+                 for e in graph.out_edges[node] if level - used[e] >= reserve]
+        if stations[node] and level < fill_to:
+            moves.append(((node, fill_to), stop_hours))
+        for next_state, cost in moves:
+            if hours + cost < best.get(next_state, np.inf):
+                best[next_state], parent[next_state] = hours + cost, state
+                heapq.heappush(heap, (hours + cost, next_state))
+    return None
+
+
+def replay(graph, stations, result, start, reserve, fill_to, stop_hours):
+    """Drives the returned plan: every leg is an edge, stops are at stations, the level stays above the reserve."""
+    level, hours, stops = start, 0.0, list(result["stops"])
+    route = result["route"]
+    for i, node in enumerate(route):
+        if stops and stops[0]["node"] == node:
+            stop = stops.pop(0)
+            assert stations[graph.index[node]]
+            assert stop["arrival_percentage"] == pytest.approx(level, abs=0.01)
+            assert stop["departure_percentage"] == fill_to
+            level, hours = fill_to, hours + stop_hours
+        if i + 1 < len(route):
+            a, b = graph.index[node], graph.index[route[i + 1]]
+            edge = next(e for e in graph.out_edges[a] if graph.target[e] == b)
+            level -= 100.0 * graph.length_km[edge] / RANGE_KM
+            hours += graph.hours[edge]
+            assert level >= reserve - 1e-9
+    assert not stops # Every stop lies on the route, in route order
+    assert result["arrival_percentage"] == pytest.approx(level, abs=0.01)
+    assert result["total_hours"] == pytest.approx(hours, abs=0.01)
+
+
+def test_plan_without_stops_is_the_fastest_route(graph):
+    result = plan(graph, StubModel(range_km=1e6), "A1", "H3", start=90.0)
+    assert result["feasible"] and result["stops"] == []
+    assert result["total_hours"] == pytest.approx(fastest_hours_to(graph, graph.index["H3"])[graph.index["A1"]], abs=0.01)
+    assert result["total_hours"] == result["driving_hours"]
+
+
+@pytest.mark.parametrize("vehicle, origin, destination, start, reserve, fill_to", [
+    ("ev", "A1", "H3", 50.0, 10.0, 80.0),
+    ("ev", "A1", "H3", 20.0, 10.0, 30.0),
+    ("ev", "H1", "A3", 25.0, 5.0, 40.0),
+    ("ev", "C2", "F3", 12.0, 10.0, 25.0),
+    ("hv", "A3", "H1", 50.0, 30.0, 90.0),
+    ("hv", "H3", "A1", 45.0, 20.0, 55.0),
+])
+def test_plan_matches_reference(graph, vehicle, origin, destination, start, reserve, fill_to):
+    stations = graph.stations[vehicle]
+    result = plan(graph, StubModel(), origin, destination, start, reserve, fill_to, vehicle=vehicle)
+    expected = reference_plan(graph, stations, origin, destination, start, reserve, fill_to, 0.5)
+    assert expected is not None and result["feasible"]
+    assert result["stops"] # These cases all need at least one stop
+    assert result["total_hours"] == pytest.approx(expected["total_hours"], abs=0.01)
+    assert result["route"] == expected["route"]
+    # Where to fill up can tie (any charger on the route with enough reach), the number of stops cannot
+    assert len(result["stops"]) == len(expected["stops"])
+    replay(graph, stations, result, start, reserve, fill_to, 0.5)
+
+
+def test_infeasible_plan(graph):
+    # A1 is no charger, and both of its roads (41.4 and 83 km) drop a 12% battery below 10%
+    result = plan(graph, StubModel(), "A1", "H3", start=12.0)
+    assert result["feasible"] is False and "route" not in result
+    assert reference_plan(graph, graph.stations["ev"], "A1", "H3", 12.0, 10.0, 80.0, 0.5) is None
+    # 15% reaches the charger at A2 with 10.86% left
+    assert plan(graph, StubModel(), "A1", "H3", start=15.0)["feasible"]
+
+
+def test_window_shorter_than_every_road_is_infeasible(graph):
+    # With a 300 km range, the 10% between reserve and fill level covers 30 km; the shortest road is 41.4 km
+    result = plan(graph, StubModel(range_km=300.0), "A2", "H3", start=20.0, reserve=10.0, fill_to=20.0)
+    assert result["feasible"] is False and result["labels_expanded"] == 1
+
+
+def test_repeated_plan_is_served_from_the_memo(graph):
+    model = StubModel()
+    first = plan(graph, model, "A1", "H3", start=50.0)
+    scored = model.rows
+    assert first["edge_predictions"] == scored > 0
+    second = plan(graph, model, "A1", "H3", start=50.0)
+    assert model.rows == scored # No model call at all
+    assert second["edge_predictions"] == 0 and second["edge_cache_hits"] > 0
+    assert second["route"] == first["route"] and second["stops"] == first["stops"]
+
+
+def test_memo_ignores_the_fields_each_edge_sets(graph):
+    model = StubModel()
+    plan(graph, model, "A1", "H3", start=50.0)
+    scored = model.rows
+    again = plan(graph, model, "A1", "H3", start=50.0, fields={"speed_avg_kmph": 30.0, "terrain_slope": -4.0})
+    assert model.rows == scored and again["edge_predictions"] == 0
+
+
+def test_memo_is_keyed_on_model_version_and_vehicle(graph):
+    model = StubModel()
+    plan(graph, model, "A1", "H3", start=50.0)
+    scored = model.rows
+    assert plan(graph, model, "A1", "H3", start=50.0, version="v2")["edge_predictions"] > 0
+    assert plan(graph, model, "A1", "H3", start=50.0, fields={"driving_mode": "Sport"})["edge_predictions"] > 0
+    assert model.rows > scored
+
+
+def test_edges_are_scored_at_the_level_bucket(graph):
+    model = StubModel()
+    plan(graph, model, "A1", "H3", start=53.7)
+    levels = np.concatenate([frame["battery_percentage"].to_numpy() for frame in model.frames])
+    assert np.all(levels % 5.0 == 0) and 50.0 in levels
+    # One batch per expanded label: a node's outgoing edges are scored together
+    for frame in model.frames:
+        assert frame["battery_percentage"].nunique() == 1
+
+
+def test_plan_errors(graph):
+    with pytest.raises(PlanError, match="above reserve"):
+        plan(graph, StubModel(), "A1", "H3", start=50.0, reserve=40.0, fill_to=40.0)
+    with pytest.raises(PlanError, match="Unknown node"):
+        plan(graph, StubModel(), "A1", "Z9", start=50.0)
+    edge_ranges = EdgeRanges(graph, VEHICLE, "battery_percentage", "v1", StubModel())
+    with pytest.raises(PlanError, match="search labels"):
+        plan_stops(graph, edge_ranges, graph.stations["ev"], "A1", "H3", 50.0, 10.0, 80.0, 0.5, max_labels=5)
+
+
+@pytest.mark.parametrize("content, error, message", [
+    ('{"nodes": [{"id": "a"}], ', json.JSONDecodeError, "Expecting"),
+    ('{"nodes": [{"name": "a"}]}', GraphError, "needs an 'id'"),
+    ('{"nodes": [{"id": "a"}, {"id": "a"}]}', GraphError, "duplicate node ids"),
+    ('{"nodes": [{"id": "a"}], "edges": [{"from": "a", "to": "b", "length_km": 1, "speed_kmph": 50}]}', GraphError, "unknown node"),
+    ('{"nodes": [{"id": "a"}, {"id": "b"}], "edges": [{"from": "a", "to": "b", "speed_kmph": 50}]}', GraphError, "length_km"),
+    ('{"nodes": [{"id": "a"}, {"id": "b"}], "edges": [{"from": "a", "to": "b", "length_km": -1, "speed_kmph": 50}]}', GraphError, "positive"),
+    ('{"nodes": [{"id": "a"}, {"id": "b"}], "edges": [{"from": "a", "to": "b", "length_km": "far", "speed_kmph": 50}]}', GraphError, "far"),
+])
+def test_malformed_graph_files(tmp_path, content, error, message):
+    path = tmp_path / "broken.json"
+    path.write_text(content)
+    with pytest.raises(error, match=message):
+        load_graph(str(path))
+
+
+def test_oneway_edges_and_reverse_slope(tmp_path):
+    path = tmp_path / "tiny.json"
+    path.write_text(json.dumps({"nodes": [{"id": "a"}, {"id": "b", "charger": True}, {"id": "c"}], "edges": [
+        {"from": "a", "to": "b", "length_km": 10, "slope": 2.0, "speed_kmph": 50},
+        {"from": "b", "to": "c", "length_km": 20, "speed_kmph": 100, "oneway": True},
+    ]}))
+    graph = load_graph(str(path))
+    assert graph.name == "tiny" and len(graph.source) == 3
+    assert graph.slope.tolist() == [2.0, -2.0, 0.0]
+    assert graph.stations["ev"].tolist() == [False, True, False]
+    # No road leads back from c: the search ends before expanding anything
+    assert plan(graph, StubModel(), "c", "a", start=50.0) == {"feasible": False, "labels_expanded": 0,
+                                                              "edge_predictions": 0, "edge_cache_hits": 0}
+
+
+# --- The /stops routes ---
+
+EV_VEHICLE = {
+    "battery_percentage": 50.0, "battery_age_years": 2.0, "battery_capacity_kwh": 60.0, "ambient_temp": "mild",
+    "terrain_slope": 0.0, "speed_avg_kmph": 80.0, "acceleration_level": 0.5, "hvac_on": True,
+    "driving_mode": "Eco", "drive_type": "FWD", "cargo_volume_liters": 300.0, "top_speed_kmph": 180.0,
+    "total_power_kw": 100.0, "total_torque_nm": 300.0,
+}
+
+
+@pytest.fixture
+def client():
+    return TestClient(app)
+
+
+def test_route_rejects_fill_to_not_above_reserve(client):
+    response = client.post("/predict/ev/stops", json={"vehicle": EV_VEHICLE, "graph": "sample_region", "origin": "A1",
+                                                      "destination": "H3", "reserve_percentage": 50,
+                                                      "fill_to_percentage": 50})
+    assert response.status_code == 400
+    assert "above reserve" in response.json()["detail"]
+
+
+@pytest.mark.parametrize("field, value", [("fill_to_percentage", 500), ("reserve_percentage", -1), ("stop_minutes", -5)])
+def test_route_validates_plan_inputs(client, field, value):
+    response = client.post("/predict/ev/stops", json={"vehicle": EV_VEHICLE, "graph": "sample_region", "origin": "A1",
+                                                      "destination": "H3", field: value})
+    assert response.status_code == 422
+
+
+def test_route_reports_malformed_graph_files(client, tmp_path, monkeypatch):
+    monkeypatch.setattr(road_graph, "ROAD_GRAPH_DIR", str(tmp_path))
+    (tmp_path / "broken.json").write_text('{"nodes": [')
+    response = client.post("/predict/ev/stops", json={"vehicle": EV_VEHICLE, "graph": "broken", "origin": "a",
+                                                      "destination": "b"})
+    assert response.status_code == 500
+    assert "Graph 'broken' could not be loaded" in response.json()["detail"]
+    response = client.post("/predict/ev/stops", json={"vehicle": EV_VEHICLE, "graph": "missing", "origin": "a",
+                                                      "destination": "b"})
+    assert response.status_code == 404
@@ -0,0 +1,184 @@
+# Backend/tests/test_trip.py
+# The batched trip simulator must carry the level through the segments like a plain loop that
+# scores one segment at a time, at the level the previous one left. Uses a stub range model whose
+# range depends on the level, so the passes have to converge. Run from the repository root: python -m pytest
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from Backend.config import TRIP_TOLERANCE_PERCENT
+from Backend.main import app
+from Backend.schemas.trip_schema import EVTripSegment
+from Backend.utils.trip import TripError, build_trip_frame, simulate_trip
+
+LEVEL = "battery_percentage"
+VEHICLE = {LEVEL: 80.0, "speed_avg_kmph": 60.0, "terrain_slope": 0.0, "ambient_temp": "mild", "driving_mode": "Eco",
+           "hvac_on": False}
+
+
+class StubModel:
+    """Range falls with the level and the speed; records the rows of every call."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, frame):
+        self.calls.append(len(frame))
+        return (150.0 + 2.0 * frame[LEVEL] - 0.5 * frame["speed_avg_kmph"] - 10.0 * frame["terrain_slope"]).to_numpy()
+
+
+def segments(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return [EVTripSegment(distance_km=float(d), speed_avg_kmph=float(s), terrain_slope=float(t))
+            for d, s, t in zip(rng.uniform(0.5, 3.0, n), rng.uniform(30, 120, n), rng.uniform(-2, 2, n))]
+
+
+def sequential(frame, distances, score, reserve=0.0):
+    """One predict call per segment, in driving order."""
+    level, rows, first = float(frame[LEVEL].iloc[0]), [], None
+    for i in range(len(frame)):
+        range_km = float(score(frame.iloc[[i]].assign(**{LEVEL: level}))[0])
+        left = level - 100.0 * distances[i] / range_km
+        if left < reserve and first is None:
+            first = i
+        rows.append((level, range_km, level - max(left, 0.0), max(left, 0.0)))
+        level = max(left, 0.0)
+    return rows, first
+
+
+def assert_matches(result, expected, first, tolerance=0.01):
+    assert len(result["segments"]) == len(expected)
+    for segment, row in zip(result["segments"], expected):
+        got = (segment["start_percentage"], segment["predicted_range_km"], segment["used_percentage"],
+               segment["remaining_percentage"])
+        assert got == pytest.approx(row, abs=tolerance)
+    assert result["first_unreachable_segment"] == first
+    assert result["feasible"] == (first is None)
+    assert [segment["reachable"] for segment in result["segments"]] == [first is None or i < first for i in range(len(expected))]
+
+
+@pytest.mark.parametrize("n, start", [(1, 80.0), (40, 80.0), (300, 90.0)])
+def test_matches_sequential_loop(n, start):
+    frame, distances = build_trip_frame({**VEHICLE, LEVEL: start}, segments(n))
+    expected, first = sequential(frame, distances, StubModel())
+    # A zero tolerance re-scores a segment until its starting level stops moving: the loop's fixed point
+    result = simulate_trip(frame, distances, LEVEL, StubModel(), max_passes=n + 1, tolerance=0.0)
+    assert result["converged"]
+    assert_matches(result, expected, first)
+    assert result["remaining_percentage"] == pytest.approx(expected[-1][3], abs=0.01)
+
+
+def test_runs_out_of_charge():
+    # Some 525 km with a range under 300 km: empty well before the end
+    frame, distances = build_trip_frame(VEHICLE, segments(300))
+    expected, first = sequential(frame, distances, StubModel(), reserve=15.0)
+    result = simulate_trip(frame, distances, LEVEL, StubModel(), reserve=15.0, max_passes=301, tolerance=0.0)
+    assert first is not None and 0 < first < 299
+    assert_matches(result, expected, first)
+    assert result["remaining_percentage"] == 0.0
+    assert result["segments"][-1]["start_percentage"] == 0.0
+    # The level falls linearly within the segment that crosses the reserve
+    start, range_km = expected[first][0], expected[first][1]
+    crossing = distances[:first].sum() + (start - 15.0) * range_km / 100.0
+    assert distances[:first].sum() <= crossing <= distances[:first + 1].sum()
+    assert result["reachable_distance_km"] == pytest.approx(crossing, abs=0.01)
+
+
+def test_default_tolerance_stays_close_to_sequential_loop():
+    frame, distances = build_trip_frame(VEHICLE, segments(200))
+    expected, first = sequential(frame, distances, StubModel(), reserve=10.0)
+    model = StubModel()
+    result = simulate_trip(frame, distances, LEVEL, model, reserve=10.0)
+    assert result["converged"] and result["passes"] == len(model.calls) < 10
+    assert_matches(result, expected, first, tolerance=0.05)
+    # Later passes only re-score the segments whose starting level moved
+    assert model.calls[0] == 200 and all(rows < 200 for rows in model.calls[1:])
+
+
+def test_pass_limit_reports_not_converged():
+    frame, distances = build_trip_frame(VEHICLE, segments(50))
+    model = StubModel()
+    result = simulate_trip(frame, distances, LEVEL, model, max_passes=2, tolerance=0.0)
+    assert result["passes"] == len(model.calls) == 2
+    assert not result["converged"]
+
+
+def test_invalid_predictions_raise():
+    frame, distances = build_trip_frame(VEHICLE, segments(5))
+    with pytest.raises(ValueError, match="invalid predictions"):
+        simulate_trip(frame, distances, LEVEL, lambda rows: np.full(len(rows), np.nan))
+
+
+def test_zero_range_uses_the_whole_level():
+    frame, distances = build_trip_frame(VEHICLE, segments(3))
+    result = simulate_trip(frame, distances, LEVEL, lambda rows: np.zeros(len(rows)))
+    assert result["first_unreachable_segment"] == 0 and result["reachable_distance_km"] == 0.0
+    assert result["remaining_percentage"] == 0.0
+
+
+def test_build_trip_frame_overrides():
+    frame, distances = build_trip_frame(VEHICLE, [
+        EVTripSegment(distance_km=10, speed_avg_kmph=100),
+        EVTripSegment(distance_km=5, driving_mode="Sport", hvac_on=True),
+    ])
+    assert distances.tolist() == [10.0, 5.0]
+    assert frame["speed_avg_kmph"].tolist() == [100.0, 60.0]
+    assert frame["driving_mode"].tolist() == ["Eco", "Sport"]
+    assert frame["hvac_on"].tolist() == [False, True]
+    assert frame[LEVEL].tolist() == [80.0, 80.0]
+    assert isinstance(frame, pd.DataFrame) and "distance_km" not in frame
+
+
+@pytest.mark.parametrize("trip, message", [
+    ([], "at least one segment"),
+    ([EVTripSegment(distance_km=-1)], "Segment 0: distance_km"),
+    ([EVTripSegment(distance_km=1), EVTripSegment(distance_km=float("inf"))], "Segment 1: distance_km"),
+    ([EVTripSegment(distance_km=1)] * 4, "at most 3"),
+])
+def test_build_trip_frame_errors(trip, message):
+    with pytest.raises(TripError, match=message):
+        build_trip_frame(VEHICLE, trip, max_segments=3)
+
+
+def test_build_trip_frame_checks_each_scenario():
+    checked = []
+
+    def check(row):
+        checked.append(row["driving_mode"])
+        return [f"Invalid driving_mode: {row['driving_mode']}."] if row["driving_mode"] == "Turbo" else []
+
+    trip = [EVTripSegment(distance_km=1, driving_mode=mode) for mode in ("Eco", "Eco", "Sport", "Eco", "Turbo")]
+    with pytest.raises(TripError, match="Segment 4: Invalid driving_mode: Turbo"):
+        build_trip_frame(VEHICLE, trip, check)
+    assert checked == ["Eco", "Sport", "Turbo"] # Once per distinct combination
+
+
+EV_VEHICLE = {
+    "battery_percentage": 80.0, "battery_age_years": 2.0, "battery_capacity_kwh": 60.0, "ambient_temp": "mild",
+    "terrain_slope": 0.0, "speed_avg_kmph": 80.0, "acceleration_level": 0.5, "hvac_on": True,
+    "driving_mode": "Eco", "drive_type": "FWD", "cargo_volume_liters": 300.0, "top_speed_kmph": 180.0,
+    "total_power_kw": 100.0, "total_torque_nm": 300.0,
+}
+
+
+def test_route_matches_sequential_loop_with_the_served_model():
+    from Backend.routes.predict_ev import _score_ev_frame
+
+    trip = segments(30)
+    response = TestClient(app).post("/predict/ev/trip", json={
+        "vehicle": EV_VEHICLE, "segments": [segment.dict(exclude_none=True) for segment in trip]})
+    assert response.status_code == 200
+    frame, distances = build_trip_frame(EV_VEHICLE, trip)
+    expected, first = sequential(frame, distances, _score_ev_frame)
+    # Segments re-scored only past the tolerance may keep a range predicted a little off their start
+    assert_matches(response.json(), expected, first, tolerance=10 * TRIP_TOLERANCE_PERCENT)
+
+
+def test_route_rejects_bad_segments():
+    client = TestClient(app)
+    response = client.post("/predict/ev/trip", json={"vehicle": EV_VEHICLE, "segments": []})
+    assert response.status_code == 400
+    response = client.post("/predict/ev/trip", json={"vehicle": EV_VEHICLE,
+                                                     "segments": [{"distance_km": 5, "driving_mode": "Turbo"}]})
+    assert response.status_code == 400 and "Segment 0" in response.json()["detail"]
@@ -0,0 +1,67 @@
+# Backend/training/artifacts.py
+# The served artifacts derived from each joblib model: the native booster with its metadata
+# sidecar (MODEL_FORMAT=native) and the compiled trees (MODEL_FORMAT=compiled). Both record the
+# content version of the joblib they came from, and are re-exported whenever a training run or a
+# promoted update replaces the served joblib, so no format keeps serving an older model.
+import os
+from typing import List, Tuple
+
+import joblib
+
+from Backend.models.model_loader import (
+    EV_MODEL_PATH, HV_MODEL_PATH, EV_BOOSTER_PATH, HV_BOOSTER_PATH, EV_COMPILED_PATH, HV_COMPILED_PATH,
+    booster_metadata_path, model_file_version,
+)
+from Backend.models.tree_engine import CompiledTreeEnsemble
+from Backend.utils.ev_feature_reference import TRAINED_FEATURES as EV_TRAINED_FEATURES
+from Backend.utils.hv_feature_reference import TRAINED_FEATURES as HV_TRAINED_FEATURES
+
+SERVED_ARTIFACTS = {
+    "ev": (EV_MODEL_PATH, EV_BOOSTER_PATH, EV_COMPILED_PATH, EV_TRAINED_FEATURES),
+    "hv": (HV_MODEL_PATH, HV_BOOSTER_PATH, HV_COMPILED_PATH, HV_TRAINED_FEATURES),
+}
+
+
+def staging_path(path: str) -> str:
+    # Keeps the extension, which selects the format of save_model / np.savez
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}.tmp{ext}"
+
+
+def stage_served_artifacts(vehicle: str, model_path: str, source_path: str) -> List[Tuple[str, str]]:
+    """
+    Exports the native booster and compiled trees of 'source_path', the model about to replace
+    'model_path', to staging files next to the served ones. Returns (staging, served) path pairs
+    for install_staged(); nothing is staged when 'model_path' is not served.
+    A failed export removes its staging files and leaves every served artifact untouched.
+    """
+    # Deferred: the script module configures logging when imported, which must not preempt train.py's setup
+    from Backend.scripts.export_booster import export_booster
+
+    served_model, booster_path, compiled_path, trained_features = SERVED_ARTIFACTS[vehicle]
+    if os.path.realpath(model_path) != os.path.realpath(served_model):
+        return []
+    staged = [(staging_path(booster_path), booster_path),
+              (booster_metadata_path(staging_path(booster_path)), booster_metadata_path(booster_path)),
+              (staging_path(compiled_path), compiled_path)]
+    try:
+        export_booster(source_path, staged[0][0], vehicle, trained_features)
+        compiled = CompiledTreeEnsemble.from_booster(joblib.load(source_path).get_booster(),
+                                                     source_model_version=model_file_version(source_path))
+        compiled.save(staged[2][0])
+    except Exception:
+        discard_staged(staged)
+        raise
+    return staged
+
+
+def install_staged(staged: List[Tuple[str, str]]):
+    """Renames staged artifacts over the served ones (each rename is atomic)."""
+    for staging, path in staged:
+        os.replace(staging, path)
+
+
+def discard_staged(staged: List[Tuple[str, str]]):
+    for staging, _ in staged:
+        if os.path.exists(staging):
+            os.remove(staging)
@@ -0,0 +1,161 @@
+# Backend/training/incremental.py
+# Warm-start updates of a trained range model from new trip data. The existing booster keeps all
+# its trees and new boosting rounds are fitted on the new rows only, early-stopped on a holdout
+# of them. The update is rejected when it does worse than the current model on that holdout (or
+# on the held-out rows of a reference dataset); an accepted update is written as a new versioned
+# artifact next to the model and only replaces the served model when promoted.
+import os
+import json
+import time
+import shutil
+import logging
+from typing import Any, Dict, Optional
+
+import joblib
+import numpy as np
+import xgboost as xgb
+from sklearn.model_selection import train_test_split
+from xgboost import XGBRegressor
+
+from Backend.models.model_loader import model_file_version
+from Backend.training.pipeline import SEED, TEST_SIZE, VEHICLES
+from Backend.utils.feature_cache import FeatureSet, load_features
+
+DEFAULT_ROUNDS = 100
+DEFAULT_EARLY_STOPPING_ROUNDS = 20
+DEFAULT_HOLDOUT_SIZE = 0.2
+
+
+def versions_dir_for(model_path: str) -> str:
+    return os.path.join(os.path.dirname(model_path) or ".", "versions")
+
+
+def _train_params(model: XGBRegressor, nthread: int) -> Dict[str, Any]:
+    """Native training parameters of a fitted XGBRegressor, so new rounds grow trees the same way."""
+    params = {key: value for key, value in model.get_xgb_params().items()
+              if value is not None and key not in ("n_jobs", "random_state")}
+    params["seed"] = model.random_state if model.random_state is not None else SEED
+    if nthread > 0:
+        params["nthread"] = nthread
+    return params
+
+
+def _rmse(booster: xgb.Booster, X: np.ndarray, y: np.ndarray) -> float:
+    err = np.asarray(y, dtype=np.float64) - booster.inplace_predict(X).astype(np.float64)
+    return float(np.sqrt(np.mean(err ** 2)))
+
+
+def _matrix(features: FeatureSet, rows: np.ndarray, ref=None) -> xgb.QuantileDMatrix:
+    return xgb.QuantileDMatrix(features.matrix[rows], label=features.target[rows], ref=ref,
+                               feature_names=features.feature_names, feature_types=features.feature_types(),
+                               enable_categorical=True)
+
+
+def update_model(vehicle: str, new_data_path: str, model_path: Optional[str] = None, rounds: int = DEFAULT_ROUNDS,
+                 early_stopping_rounds: int = DEFAULT_EARLY_STOPPING_ROUNDS, holdout_size: float = DEFAULT_HOLDOUT_SIZE,
+                 reference_path: Optional[str] = None, tolerance: float = 0.0, nthread: int = 0,
+                 versions_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Adds up to 'rounds' boosting rounds to the model at 'model_path' using 'new_data_path' only.
+
+    The update is accepted when its RMSE on every holdout is at most (1 + tolerance) times the
+    current model's. Holdouts: 'holdout_size' of the new rows, plus, with 'reference_path', the
+    test split the training pipeline holds out of that dataset (e.g. the original training file).
+    Returns a report; 'version_path' is set when an artifact was written.
+    """
+    start = time.perf_counter()
+    config = VEHICLES[vehicle]
+    model_path = model_path or config.model_path
+    versions_dir = versions_dir or versions_dir_for(model_path)
+
+    base_model = joblib.load(model_path)
+    base_booster = base_model.get_booster()
+    base_version = model_file_version(model_path)
+    base_rounds = base_booster.num_boosted_rounds()
+
+    new = load_features(new_data_path, vehicle)
+    if new.feature_names != base_booster.feature_names:
+        raise ValueError(f"{new_data_path} preprocesses to {new.feature_names}, but {model_path} "
+                         f"was trained on {base_booster.feature_names}.")
+    fit_idx, holdout_idx = train_test_split(np.arange(len(new)), test_size=holdout_size, random_state=SEED)
+    dfit = _matrix(new, fit_idx)
+    dholdout = _matrix(new, holdout_idx, ref=dfit)
+
+    # xgb_model copies the booster, so the loaded model is left untouched
+    booster = xgb.train(_train_params(base_model, nthread), dfit, num_boost_round=rounds, xgb_model=base_booster,
+                        evals=[(dholdout, "holdout")], early_stopping_rounds=early_stopping_rounds, verbose_eval=False)
+    booster = booster[:booster.best_iteration + 1] # Drop the rounds fitted after the best holdout score
+    added_rounds = booster.num_boosted_rounds() - base_rounds
+
+    holdouts = {"new_data": (new.matrix[holdout_idx], new.target[holdout_idx])}
+    if reference_path:
+        reference = load_features(reference_path, vehicle)
+        _, reference_idx = train_test_split(np.arange(len(reference)), test_size=TEST_SIZE, random_state=SEED)
+        holdouts["reference"] = (reference.matrix[reference_idx], reference.target[reference_idx])
+
+    checks, accepted = {}, added_rounds > 0
+    for name, (X, y) in holdouts.items():
+        before, after = _rmse(base_booster, X, y), _rmse(booster, X, y)
+        ok = after <= before * (1 + tolerance)
+        accepted &= ok
+        checks[name] = {"rows": len(y), "rmse_before": round(before, 4), "rmse_after": round(after, 4), "ok": ok}
+        logging.info(f"Holdout '{name}' ({len(y)} rows): RMSE {before:.3f} -> {after:.3f} km {'OK' if ok else 'REGRESSION'}")
+
+    report = {
+        "vehicle": vehicle,
+        "base_model_path": model_path,
+        "base_version": base_version,
+        "new_data_path": new_data_path,
+        "new_data_key": new.key,
+        "new_rows": len(fit_idx),
+        "base_rounds": base_rounds,
+        "added_rounds": added_rounds,
+        "holdouts": checks,
+        "accepted": bool(accepted),
+        "version_path": None,
+        "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    if not accepted:
+        reason = "no round improved the holdout" if added_rounds <= 0 else "holdout RMSE regressed"
+        logging.warning(f"Rejected {vehicle.upper()} model update: {reason}. {model_path} is unchanged.")
+    else:
+        model = XGBRegressor(**base_model.get_params())
+        model.set_params(n_estimators=booster.num_boosted_rounds())
+        model.load_model(bytearray(booster.save_raw("ubj")))
+        report["version_path"] = save_version(model, versions_dir, vehicle, report)
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def save_version(model: XGBRegressor, versions_dir: str, vehicle: str, report: Dict[str, Any]) -> str:
+    """Writes '<vehicle>_model.<timestamp>.<content hash>.joblib' plus a '.json' report beside it."""
+    os.makedirs(versions_dir, exist_ok=True)
+    tmp_path = os.path.join(versions_dir, f".{vehicle}_model.{os.getpid()}.tmp")
+    joblib.dump(model, tmp_path)
+    version = model_file_version(tmp_path)
+    path = os.path.join(versions_dir, f"{vehicle}_model.{time.strftime('%Y%m%d%H%M%S')}.{version}.joblib")
+    os.replace(tmp_path, path)
+    with open(os.path.splitext(path)[0] + ".json", "w") as f:
+        json.dump({**report, "version": version, "version_path": path}, f, indent=2)
+    logging.info(f"Wrote model version {version} ({report['added_rounds']} new rounds) to {path}")
+    return path
+
+
+def promote_version(version_path: str, model_path: str) -> str:
+    """
+    Makes a versioned artifact the served model. The current model is first kept in the versions
+    directory under its content hash, so it can be restored the same way. The swap is a rename,
+    so readers see either the old or the new file.
+    """
+    versions_dir = versions_dir_for(model_path)
+    os.makedirs(versions_dir, exist_ok=True)
+    name = os.path.splitext(os.path.basename(model_path))[0]
+    if os.path.exists(model_path):
+        backup = os.path.join(versions_dir, f"{name}.{model_file_version(model_path)}.joblib")
+        if not os.path.exists(backup):
+            shutil.copy2(model_path, backup)
+    tmp_path = f"{model_path}.{os.getpid()}.tmp"
+    shutil.copy2(version_path, tmp_path)
+    os.replace(tmp_path, model_path)
+    logging.info(f"Promoted {version_path} to {model_path}")
+    return model_path
@@ -0,0 +1,409 @@
+# Backend/training/pipeline.py
+# Training pipeline shared by the EV and HV range models (entry point: Backend/scripts/train.py).
+#
+# Features are handed to XGBoost as QuantileDMatrix inputs trained with tree_method="hist", so
+# the data is quantized once into max_bin buckets per feature instead of being kept as floats:
+#   memory   - the cached feature matrix (Backend/utils/feature_cache.py) is split and quantized;
+#   stream   - Parquet batches are preprocessed one at a time and fed to QuantileDMatrix through
+#              a DataIter, so the raw and float feature data are never fully in memory;
+#   external - the same iterator backs an external-memory DMatrix paged through a disk cache,
+#              for datasets whose quantized form does not fit in RAM either.
+# The trained booster is saved as the usual sklearn XGBRegressor joblib artifact for the API; when it
+# replaces a served model, the native booster and compiled trees are re-exported from it.
+import os
+import csv
+import time
+import shutil
+import logging
+import resource
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+import xgboost as xgb
+import matplotlib.pyplot as plt
+import seaborn as sns
+from sklearn.model_selection import train_test_split, GridSearchCV
+from xgboost import XGBRegressor
+
+from Backend.preprocess import ev_encoder, hv_encoder
+from Backend.training.artifacts import discard_staged, install_staged, stage_served_artifacts, staging_path
+from Backend.training.search import SuccessiveHalvingSearch, expand_grid, record_search_summary
+from Backend.utils import dataset
+from Backend.utils.feature_cache import FEATURE_CACHE_DIR, feature_cache_key, load_features
+
+DATA_MODES = ("memory", "stream", "external")
+SEARCH_MODES = ("grid", "halving", "none")
+
+DEFAULT_MAX_BIN = 256
+DEFAULT_BATCH_ROWS = 1_000_000
+TEST_SIZE = 0.2 # Held out for the final metrics
+VAL_SIZE = 0.2 # Share of the training rows used for validation by the halving search
+SEED = 42
+
+
+class VehicleConfig:
+    """Everything that differs between the EV and HV training runs."""
+
+    def __init__(self, vehicle: str, data_path: str, encode_func, feature_names: List[str], categorical_features: List[str],
+                 param_grid: Dict[str, List[Any]], default_params: Dict[str, Any], model_path: str):
+        self.vehicle = vehicle
+        self.label = vehicle.upper()
+        self.data_path = data_path
+        self.encode_func = encode_func # encode_*_frame: raw inputs -> float32 feature matrix
+        self.feature_names = feature_names
+        self.feature_types = ["c" if name in categorical_features else "q" for name in feature_names]
+        self.target = dataset.TARGET_COLUMNS[vehicle]
+        self.param_grid = param_grid
+        self.default_params = default_params # Used with search="none"
+        self.model_path = model_path
+
+
+VEHICLES = {
+    "ev": VehicleConfig(
+        "ev", "ev_data.csv", ev_encoder.encode_ev_frame, ev_encoder.TRAINED_FEATURES, ev_encoder.CATEGORICAL_FEATURES,
+        param_grid={
+            "n_estimators": [100, 200],
+            "learning_rate": [0.01, 0.05, 0.1],
+            "max_depth": [3, 5, 7],
+            "subsample": [0.8, 1.0],
+            "colsample_bytree": [0.8, 1.0],
+        },
+        default_params={"n_estimators": 200, "learning_rate": 0.1, "max_depth": 3, "subsample": 0.8, "colsample_bytree": 1.0},
+        model_path=os.path.join("Backend", "models", "ev_model.joblib"),
+    ),
+    "hv": VehicleConfig(
+        "hv", "hv.csv", hv_encoder.encode_hv_frame, hv_encoder.TRAINED_FEATURES, hv_encoder.CATEGORICAL_FEATURES,
+        param_grid={
+            "n_estimators": [100, 200],
+            "learning_rate": [0.01, 0.05, 0.1],
+            "max_depth": [3, 5, 7],
+        },
+        default_params={"n_estimators": 200, "learning_rate": 0.1, "max_depth": 3},
+        model_path=os.path.join("Backend", "models", "hv_model.joblib"),
+    ),
+}
+
+
+# --- Data splits ---
+
+def _part_mask(u: np.ndarray, part: str) -> np.ndarray:
+    """Row selection for a split from per-row uniform draws: test | val | fit, with train = val + fit."""
+    val_end = TEST_SIZE + VAL_SIZE * (1 - TEST_SIZE)
+    if part == "test":
+        return u < TEST_SIZE
+    if part == "train":
+        return u >= TEST_SIZE
+    if part == "val":
+        return (u >= TEST_SIZE) & (u < val_end)
+    if part == "fit":
+        return u >= val_end
+    raise ValueError(f"Unknown split: {part}")
+
+
+def iter_feature_batches(config: VehicleConfig, data_path: str, part: str,
+                         batch_rows: int = DEFAULT_BATCH_ROWS) -> Iterator[Tuple[np.ndarray, np.ndarray, List[str], List[str]]]:
+    """
+    Yields (features, target, feature names, feature types) for one split of a dataset, reading and
+    encoding it one Parquet batch at a time. Batch i draws its split from the seed [SEED, i],
+    so every pass over the same file and batch_rows assigns every row to the same split.
+    """
+    columns = dataset.training_columns(data_path, config.vehicle)
+    for i, chunk in enumerate(dataset.iter_dataset(data_path, columns=columns, batch_rows=batch_rows)):
+        features = config.encode_func(chunk.drop(columns=[config.target]), is_training_data=True)
+        mask = _part_mask(np.random.default_rng([SEED, i]).random(len(features)), part)
+        if not mask.any():
+            continue
+        target = chunk[config.target].to_numpy(dtype=np.float64)
+        yield features[mask], target[mask], config.feature_names, config.feature_types
+
+
+class FeatureBatchIter(xgb.DataIter):
+    """Feeds iter_feature_batches to QuantileDMatrix, or to an external-memory DMatrix when cache_prefix is set."""
+
+    def __init__(self, config: VehicleConfig, data_path: str, part: str, batch_rows: int, cache_prefix: Optional[str] = None):
+        self._args = (config, data_path, part, batch_rows)
+        self._batches = None
+        super().__init__(cache_prefix=cache_prefix)
+
+    def next(self, input_data) -> int:
+        if self._batches is None:
+            self._batches = iter_feature_batches(*self._args)
+        for X, y, feature_names, feature_types in self._batches:
+            input_data(data=X, label=y, feature_names=feature_names, feature_types=feature_types)
+            return 1
+        return 0
+
+    def reset(self):
+        self._batches = None
+
+
+# --- Metrics, artifacts and plots ---
+
+class RegressionMetrics:
+    """RMSE / MAE / R2 accumulated batch by batch; keeps up to 'keep_rows' points for the plots."""
+
+    def __init__(self, keep_rows: int = 100_000):
+        self.n = 0
+        self.sum_sq_err = 0.0
+        self.sum_abs_err = 0.0
+        self.sum_y = 0.0
+        self.sum_y_sq = 0.0
+        self.keep_rows = keep_rows
+        self.kept_true, self.kept_pred = [], []
+
+    def update(self, y_true: np.ndarray, y_pred: np.ndarray):
+        y_true = np.asarray(y_true, dtype=np.float64)
+        err = y_true - np.asarray(y_pred, dtype=np.float64)
+        self.n += len(y_true)
+        self.sum_sq_err += float(err @ err)
+        self.sum_abs_err += float(np.abs(err).sum())
+        self.sum_y += float(y_true.sum())
+        self.sum_y_sq += float(y_true @ y_true)
+        room = self.keep_rows - sum(len(part) for part in self.kept_true)
+        if room > 0:
+            self.kept_true.append(y_true[:room])
+            self.kept_pred.append(np.asarray(y_pred)[:room])
+
+    def result(self) -> Tuple[float, float, float]:
+        rmse = float(np.sqrt(self.sum_sq_err / self.n))
+        mae = self.sum_abs_err / self.n
+        total = self.sum_y_sq - self.sum_y ** 2 / self.n
+        r2 = 1.0 - self.sum_sq_err / total if total > 0 else 0.0
+        return rmse, mae, r2
+
+    def kept(self) -> Tuple[np.ndarray, np.ndarray]:
+        return np.concatenate(self.kept_true), np.concatenate(self.kept_pred)
+
+
+def save_model(model, path, vehicle: Optional[str] = None):
+    """
+    Saves the joblib artifact. When 'path' is the served model of 'vehicle', its native booster and
+    compiled trees are re-exported too; everything is written to staging files first, so a failed
+    export leaves all served files as they were.
+    """
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    staging = staging_path(path)
+    joblib.dump(model, staging)
+    try:
+        staged = stage_served_artifacts(vehicle, path, staging) if vehicle else []
+    except Exception:
+        discard_staged([(staging, path)])
+        raise
+    os.replace(staging, path)
+    install_staged(staged)
+    logging.info(f"Model saved to {path}")
+    if staged:
+        logging.info(f"Re-exported {', '.join(served for _, served in staged)}")
+
+
+def plot_feature_importance(model, feature_names, path, title, top_n=15):
+    fi = pd.Series(model.feature_importances_, index=feature_names).sort_values(ascending=False)
+    plt.figure(figsize=(10, 6))
+    sns.barplot(x=fi.values[:top_n], y=fi.index[:top_n])
+    plt.title(title)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    logging.info(f"Saved feature importance plot to {path}.")
+
+
+def plot_actual_vs_pred(y_true, y_pred, path, title):
+    plt.figure(figsize=(6, 6))
+    sns.scatterplot(x=y_true, y=y_pred, alpha=0.6)
+    lims = [min(y_true.min(), y_pred.min()), max(y_true.max(), y_pred.max())]
+    plt.plot(lims, lims, "--r")
+    plt.xlabel("Actual (km)")
+    plt.ylabel("Predicted (km)")
+    plt.title(title)
+    plt.tight_layout()
+    plt.savefig(path)
+    plt.close()
+    logging.info(f"Saved actual vs predicted plot to {path}.")
+
+
+def append_csv_row(path: str, row: Dict[str, Any]):
+    """Appends a row to a CSV, writing the header when the file is new."""
+    new_file = not os.path.exists(path)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(row))
+        if new_file:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024 # ru_maxrss is in KiB on Linux
+
+
+def booster_params(params: Dict[str, Any], max_bin: int, nthread: int) -> Dict[str, Any]:
+    """Native xgb.train parameters for sklearn-style 'params' (n_estimators is the round count, passed separately)."""
+    native = {"objective": "reg:squarederror", "seed": SEED, "tree_method": "hist", "max_bin": max_bin}
+    if nthread > 0:
+        native["nthread"] = nthread
+    native.update({key: value for key, value in params.items() if key != "n_estimators"})
+    return native
+
+
+def to_sklearn_model(booster: xgb.Booster, params: Dict[str, Any], max_bin: int) -> XGBRegressor:
+    """Wraps a trained booster in the XGBRegressor the API and evaluate_models.py load from joblib."""
+    model = XGBRegressor(objective="reg:squarederror", random_state=SEED, n_jobs=-1, enable_categorical=True,
+                         tree_method="hist", max_bin=max_bin, **params)
+    model.load_model(bytearray(booster.save_raw("ubj")))
+    return model
+
+
+# --- Training ---
+
+def train_model(vehicle: str, data_path: Optional[str] = None, model_path: Optional[str] = None,
+                output_dir: str = "outputs", search: str = "grid", data_mode: str = "memory",
+                nthread: int = 0, max_bin: int = DEFAULT_MAX_BIN, batch_rows: int = DEFAULT_BATCH_ROWS,
+                params: Optional[Dict[str, Any]] = None, use_feature_cache: bool = True, plot: bool = True) -> Dict[str, Any]:
+    """
+    Trains, evaluates and saves one range model. 'search' picks the hyperparameters ("none" uses
+    'params' or the vehicle defaults); nthread=0 uses every core. Writes <vehicle>_metrics.csv and
+    <vehicle>_train_profile.csv (wall time per phase and peak RSS) to 'output_dir'.
+    """
+    config = VEHICLES[vehicle]
+    data_path = data_path or config.data_path
+    model_path = model_path or config.model_path
+    if data_mode not in DATA_MODES:
+        raise ValueError(f"Unknown data mode: {data_mode}. Expected one of {DATA_MODES}.")
+    if search == "grid" and data_mode != "memory":
+        raise ValueError("Grid search needs the training data in memory; use --search halving or none.")
+    os.makedirs(output_dir, exist_ok=True)
+    logging.info(f"Starting {config.label} model training pipeline ({data_mode} data, {search} search)")
+    timings = {}
+    run_start = time.perf_counter()
+    quantile_args = {"max_bin": max_bin, "nthread": nthread or None}
+
+    # 1. Training matrices (and the features for the grid search, which works on DataFrames)
+    start = time.perf_counter()
+    cache_dir = None
+    if data_mode == "memory":
+        features = load_features(data_path, vehicle, use_cache=use_feature_cache)
+        data_key = features.key
+        train_idx, test_idx = train_test_split(np.arange(len(features)), test_size=TEST_SIZE, random_state=SEED)
+        feature_names = features.feature_names
+        matrix_args = {"feature_names": feature_names, "feature_types": features.feature_types(), "enable_categorical": True}
+
+        def quantile_matrix(rows, ref=None):
+            return xgb.QuantileDMatrix(features.matrix[rows], label=features.target[rows], ref=ref, **matrix_args, **quantile_args)
+
+        dtrain = quantile_matrix(train_idx)
+    else:
+        # Stream splits differ from the in-memory ones, so their logged search trials must not mix
+        data_key = f"{feature_cache_key(data_path, vehicle)}:{data_mode}:{batch_rows}"
+        if data_mode == "stream":
+            dtrain = xgb.QuantileDMatrix(FeatureBatchIter(config, data_path, "train", batch_rows), **quantile_args)
+        else:
+            cache_dir = os.path.join(FEATURE_CACHE_DIR, f"external-{vehicle}-{os.getpid()}")
+            os.makedirs(cache_dir, exist_ok=True)
+            dtrain = xgb.DMatrix(FeatureBatchIter(config, data_path, "train", batch_rows,
+                                                  cache_prefix=os.path.join(cache_dir, "train")), nthread=nthread or None)
+        feature_names = dtrain.feature_names
+    timings["load_s"] = time.perf_counter() - start
+    logging.info(f"Training matrix: {dtrain.num_row()} rows x {dtrain.num_col()} features ({timings['load_s']:.1f} s)")
+
+    # 2. Hyperparameters
+    start = time.perf_counter()
+    search_summary = None
+    if search == "grid":
+        frame = features.to_frame()
+        base_model = XGBRegressor(objective="reg:squarederror", random_state=SEED, n_jobs=nthread or -1,
+                                  enable_categorical=True, tree_method="hist", max_bin=max_bin)
+        grid = GridSearchCV(estimator=base_model, param_grid=config.param_grid, scoring="neg_root_mean_squared_error",
+                            cv=5, verbose=1, n_jobs=-1)
+        grid.fit(frame.iloc[train_idx], features.target[train_idx])
+        best_params = grid.best_params_
+        search_summary = {"search": "grid", "fits": len(grid.cv_results_["params"]) * grid.n_splits_,
+                          "validation_rmse": -grid.best_score_, "best_params": best_params}
+        del frame
+    elif search == "halving":
+        # Successive halving with early stopping on a validation split of the training rows;
+        # n_estimators becomes the early-stopped round count of the winning config
+        if data_mode == "memory":
+            fit_idx, val_idx = train_test_split(train_idx, test_size=VAL_SIZE, random_state=SEED)
+            dfit = quantile_matrix(fit_idx)
+            dval = quantile_matrix(val_idx, ref=dfit)
+        else:
+            dfit = xgb.QuantileDMatrix(FeatureBatchIter(config, data_path, "fit", batch_rows), **quantile_args)
+            dval = xgb.QuantileDMatrix(FeatureBatchIter(config, data_path, "val", batch_rows), ref=dfit, **quantile_args)
+        halving = SuccessiveHalvingSearch(
+            expand_grid(config.param_grid),
+            base_params=booster_params({}, max_bin, nthread),
+            max_rounds=5 * max(config.param_grid["n_estimators"]),
+            log_path=os.path.join(output_dir, f"{vehicle}_search_trials.jsonl"),
+            data_key=data_key,
+        )
+        result = halving.run(dfit, dval)
+        del dfit, dval
+        best_params = {**result["best_params"], "n_estimators": result["best_rounds"]}
+        search_summary = {"search": "halving", "time_to_best_s": result["time_to_best_s"], "fits": result["fits"],
+                          "validation_rmse": result["best_score"], "best_params": best_params}
+    else:
+        best_params = {**config.default_params, **(params or {})}
+    timings["search_s"] = time.perf_counter() - start
+    if search_summary is not None:
+        search_summary["wall_s"] = round(timings["search_s"], 2)
+        search_summary.setdefault("time_to_best_s", search_summary["wall_s"]) # The grid only knows its best at the end
+    logging.info(f"Hyperparameters ({search} search, {timings['search_s']:.1f} s): {best_params}")
+
+    # 3. Final model on all training rows
+    start = time.perf_counter()
+    booster = xgb.train(booster_params(best_params, max_bin, nthread), dtrain,
+                        num_boost_round=int(best_params.get("n_estimators", 100)))
+    timings["train_s"] = time.perf_counter() - start
+    n_train_rows = dtrain.num_row()
+    del dtrain
+    if cache_dir is not None:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    # 4. Evaluation on the held-out rows
+    start = time.perf_counter()
+    metrics = RegressionMetrics()
+    if data_mode == "memory":
+        metrics.update(features.target[test_idx], booster.inplace_predict(features.matrix[test_idx]))
+    else:
+        for X, y, _, _ in iter_feature_batches(config, data_path, "test", batch_rows):
+            metrics.update(y, booster.inplace_predict(X))
+    rmse, mae, r2 = metrics.result()
+    timings["eval_s"] = time.perf_counter() - start
+    logging.info(f"   Tuned Model Metrics ({config.label}):")
+    logging.info(f"   RMSE : {rmse:.2f} km")
+    logging.info(f"   MAE  : {mae:.2f} km")
+    logging.info(f"   R2   : {r2:.4f}")
+
+    # 5. Artifacts
+    model = to_sklearn_model(booster, best_params, max_bin)
+    save_model(model, model_path, vehicle)
+    pd.DataFrame({
+        "metric": ["RMSE", "MAE", "R2"],
+        "value": [rmse, mae, r2]
+    }).to_csv(os.path.join(output_dir, f"{vehicle}_metrics.csv"), index=False)
+    if search_summary is not None:
+        search_summary["test_rmse"] = rmse
+        record_search_summary(os.path.join(output_dir, f"{vehicle}_search_summary.csv"), search_summary)
+    if plot:
+        plot_feature_importance(model, feature_names, os.path.join(output_dir, f"{vehicle}_feature_importance.png"),
+                                f"Top Feature Importances ({config.label})")
+        plot_actual_vs_pred(*metrics.kept(), os.path.join(output_dir, f"{vehicle}_actual_vs_predicted.png"),
+                            f"Actual vs Predicted ({config.label})")
+
+    profile = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "vehicle": vehicle,
+        "data_mode": data_mode,
+        "search": search,
+        "train_rows": n_train_rows,
+        "nthread": nthread,
+        "max_bin": max_bin,
+        **{key: round(value, 3) for key, value in timings.items()},
+        "wall_s": round(time.perf_counter() - run_start, 3),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+    append_csv_row(os.path.join(output_dir, f"{vehicle}_train_profile.csv"), profile)
+    logging.info(f"Training took {profile['wall_s']:.1f} s, peak RSS {profile['peak_rss_mb']:.0f} MB")
+    return {"model_path": model_path, "params": best_params, "rmse": rmse, "mae": mae, "r2": r2, "profile": profile}
@@ -0,0 +1,166 @@
+# Backend/training/search.py
+# Successive-halving hyperparameter search for the XGBoost range models.
+#
+# Every configuration of the grid (minus n_estimators, which early stopping decides) is first
+# trained with a small round budget on a train/validation split; the best 1/eta of them move on
+# to an eta-times larger budget, until one is left or the budget reaches max_rounds. Each trial
+# stops early once the validation RMSE has not improved for early_stopping_rounds rounds.
+# Finished trials are appended to a JSONL log, so an interrupted search resumes where it stopped.
+import os
+import csv
+import json
+import math
+import time
+import logging
+import itertools
+from typing import Any, Dict, List, Optional
+
+import xgboost as xgb
+
+SEARCH_MODES = ("grid", "halving")
+
+
+def expand_grid(param_grid: Dict[str, List[Any]], exclude=("n_estimators",)) -> List[Dict[str, Any]]:
+    """All combinations of a GridSearchCV-style grid, without the excluded keys."""
+    keys = [key for key in param_grid if key not in exclude]
+    return [dict(zip(keys, values)) for values in itertools.product(*(param_grid[key] for key in keys))]
+
+
+class SuccessiveHalvingSearch:
+    """
+    Successive halving over a list of XGBoost parameter sets, with early stopping per trial.
+
+    'base_params' are native xgb.train parameters shared by all trials (objective, seed, ...).
+    'log_path' is the resumable trial log; records written for other data ('data_key') are ignored.
+    """
+
+    def __init__(self, configs: List[Dict[str, Any]], base_params: Dict[str, Any], min_rounds: int = 50,
+                 max_rounds: int = 1000, eta: int = 3, early_stopping_rounds: int = 20,
+                 log_path: Optional[str] = None, data_key: str = ""):
+        self.configs = configs
+        self.base_params = base_params
+        self.min_rounds = min_rounds
+        self.max_rounds = max_rounds
+        self.eta = eta
+        self.early_stopping_rounds = early_stopping_rounds
+        self.log_path = log_path
+        self.data_key = data_key
+        self.trials: List[Dict[str, Any]] = [] # In the order they were run (including resumed ones)
+
+    def budgets(self) -> List[int]:
+        """Round budget of every rung: min_rounds * eta^k, capped at max_rounds."""
+        budgets, n_configs, rounds = [], len(self.configs), self.min_rounds
+        while True:
+            budgets.append(min(rounds, self.max_rounds))
+            if n_configs <= 1 or rounds >= self.max_rounds:
+                return budgets
+            n_configs = math.ceil(n_configs / self.eta)
+            rounds *= self.eta
+
+    def _trial_key(self, params: Dict[str, Any], rounds: int) -> str:
+        # A logged trial is only reused when everything that shaped its result matches (thread count does not)
+        base_params = {key: value for key, value in self.base_params.items() if key != "nthread"}
+        return json.dumps({"params": params, "rounds": rounds, "base_params": base_params,
+                           "early_stopping_rounds": self.early_stopping_rounds}, sort_keys=True)
+
+    def _load_log(self) -> Dict[str, Dict[str, Any]]:
+        done = {}
+        if self.log_path and os.path.exists(self.log_path):
+            with open(self.log_path) as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError: # A line cut short by an interrupted run
+                        continue
+                    if record.get("data_key") == self.data_key:
+                        done[self._trial_key(record["params"], record["rounds"])] = record
+        return done
+
+    def _append_log(self, record: Dict[str, Any]):
+        if self.log_path:
+            os.makedirs(os.path.dirname(self.log_path) or ".", exist_ok=True)
+            with open(self.log_path, "a") as f:
+                f.write(json.dumps(record) + "\n")
+
+    def _run_trial(self, params: Dict[str, Any], rounds: int, dtrain: xgb.DMatrix, dval: xgb.DMatrix) -> Dict[str, Any]:
+        start = time.perf_counter()
+        booster = xgb.train({**self.base_params, **params, "eval_metric": "rmse"}, dtrain, num_boost_round=rounds,
+                            evals=[(dval, "validation")], early_stopping_rounds=self.early_stopping_rounds,
+                            verbose_eval=False)
+        return {
+            "data_key": self.data_key,
+            "params": params,
+            "rounds": rounds,
+            "score": float(booster.best_score),
+            "best_rounds": int(booster.best_iteration) + 1,
+            "seconds": round(time.perf_counter() - start, 4),
+        }
+
+    def run(self, dtrain: xgb.DMatrix, dval: xgb.DMatrix) -> Dict[str, Any]:
+        """
+        Runs (or resumes) the search on prebuilt train/validation matrices (built once, so every
+        trial reuses the same quantized data); returns the best parameters, round count and timing summary.
+        """
+        done = self._load_log()
+
+        survivors = list(self.configs)
+        budgets = self.budgets()
+        for rung, rounds in enumerate(budgets):
+            results = []
+            for params in survivors:
+                record = done.get(self._trial_key(params, rounds))
+                if record is None:
+                    record = self._run_trial(params, rounds, dtrain, dval)
+                    self._append_log(record)
+                self.trials.append(record)
+                results.append(record)
+            results.sort(key=lambda r: r["score"])
+            logging.info(f"Halving rung {rung}: {len(results)} configs x {rounds} rounds, "
+                         f"best validation RMSE {results[0]['score']:.3f} ({results[0]['params']})")
+            if rung < len(budgets) - 1:
+                survivors = [r["params"] for r in results[:max(1, math.ceil(len(results) / self.eta))]]
+
+        best = results[0]
+        # Time-to-best counts trial time only, so it is the same whether or not the search was resumed
+        elapsed, time_to_best = 0.0, 0.0
+        for record in self.trials:
+            elapsed += record["seconds"]
+            if record is best:
+                time_to_best = elapsed
+        return {
+            "best_params": best["params"],
+            "best_rounds": best["best_rounds"],
+            "best_score": best["score"],
+            "time_to_best_s": round(time_to_best, 2),
+            "trial_seconds": round(elapsed, 2),
+            "fits": len(self.trials),
+        }
+
+
+def record_search_summary(path: str, summary: Dict[str, Any]):
+    """
+    Appends one search run to a CSV (one row per run, e.g. outputs/ev_search_summary.csv) and
+    logs how it compares with the latest run of the other search mode, if there is one.
+    """
+    fields = ["search", "wall_s", "time_to_best_s", "fits", "validation_rmse", "test_rmse", "best_params"]
+    previous = []
+    if os.path.exists(path):
+        with open(path, newline="") as f:
+            previous = list(csv.DictReader(f))
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "a", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        if not previous:
+            writer.writeheader()
+        writer.writerow({**summary, "best_params": json.dumps(summary["best_params"], sort_keys=True)})
+
+    others = [row for row in previous if row["search"] != summary["search"]]
+    if others:
+        other = others[-1]
+        logging.info(f"Search comparison: {summary['search']} took {summary['wall_s']:.1f} s "
+                     f"(best after {summary['time_to_best_s']:.1f} s, test RMSE {summary['test_rmse']:.3f}); "
+                     f"last {other['search']} run took {float(other['wall_s']):.1f} s "
+                     f"(best after {float(other['time_to_best_s']):.1f} s, test RMSE {float(other['test_rmse']):.3f})")
@@ -0,0 +1,82 @@
+# Backend/utils/batch.py
+import math
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+from pydantic import BaseModel, ValidationError
+
+
+def validate_rows(rows: List[Any], schema: type[BaseModel],
+                  extra_checks: Callable[[Dict[str, Any]], List[str]] | None = None
+                  ) -> Tuple[List[int], List[Dict[str, Any]], Dict[int, List[str]]]:
+    """
+    Validates every row of a batch request on its own, so one bad row does not fail the batch.
+    Returns the indices of the valid rows, their validated dicts, and the errors per invalid row.
+    """
+    valid_indices, valid_dicts, errors = [], [], {}
+    for i, row in enumerate(rows):
+        if not isinstance(row, dict):
+            errors[i] = [f"Expected an object, got {type(row).__name__}."]
+            continue
+        try:
+            row_dict = schema(**row).dict()
+        except ValidationError as e:
+            errors[i] = [f"{'.'.join(str(part) for part in err['loc'])}: {err['msg']}" for err in e.errors()]
+            continue
+
+        row_errors = extra_checks(row_dict) if extra_checks else []
+        if row_errors:
+            errors[i] = row_errors
+            continue
+
+        valid_indices.append(i)
+        valid_dicts.append(row_dict)
+    return valid_indices, valid_dicts, errors
+
+
+def rounded_prediction(prediction) -> float:
+    value = float(prediction)
+    if not math.isfinite(value):
+        raise ValueError(f"Model returned invalid prediction: {value}")
+    return round(value, 2)
+
+
+def assemble_results(n_rows: int, valid_indices: List[int], values, errors: Dict[int, List[str]],
+                     key: str = "predicted_range_km", convert: Callable[[Any], Any] = rounded_prediction) -> List[Dict[str, Any]]:
+    """
+    Merges the values for the valid rows (under 'key', passed through 'convert') and the errors for
+    the invalid ones back into input order. A value 'convert' rejects with ValueError becomes that
+    row's error.
+    """
+    results: List[Dict[str, Any]] = [{"index": i} for i in range(n_rows)]
+    for i, value in zip(valid_indices, values):
+        try:
+            results[i][key] = convert(value)
+        except ValueError as e:
+            results[i]["errors"] = [str(e)]
+    for i, row_errors in errors.items():
+        results[i]["errors"] = row_errors
+    return results
+
+
+def frame_to_matrix(df) -> np.ndarray:
+    """Returns the float32 matrix XGBoost sees for a preprocessed frame (categoricals as their codes)."""
+    import pandas as pd
+    columns = [df[col].cat.codes if isinstance(df[col].dtype, pd.CategoricalDtype) else df[col] for col in df.columns]
+    return np.column_stack(columns).astype(np.float32)
+
+
+def predict_frame(name: str, df) -> np.ndarray:
+    """
+    Scores a preprocessed frame, or an encoded feature matrix, with the named model. Inputs of at
+    least PROCESS_POOL_MIN_ROWS rows go to the process pool when one is configured; smaller ones
+    are scored in process.
+    """
+    from Backend.config import PROCESS_POOL_MIN_ROWS
+    from Backend.models.process_pool import get_process_pool
+    from Backend.models.registry import registry
+
+    pool = get_process_pool() if len(df) >= PROCESS_POOL_MIN_ROWS else None
+    if pool is not None:
+        return pool.predict(name, df if isinstance(df, np.ndarray) else frame_to_matrix(df))
+    return registry.get(name).predict(df)
@@ -0,0 +1,111 @@
+# Backend/utils/bench.py
+# Shared pieces of the benchmark scripts: latency summaries, run metadata, JSON result files
+# and the comparison of a run against a saved baseline.
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import subprocess
+from typing import Any, Dict, List, Sequence
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_REGRESSION = 0.10 # Relative slowdown that counts as a regression
+
+DATA_PATHS = {"ev": os.path.join("Backend", "data", "ev_data.csv"), "hv": os.path.join("Backend", "data", "hv.csv")}
+
+# ev_data.csv has no cargo column (training fills it with 0), but EVInput requires one
+INPUT_DEFAULTS = {"ev": {"cargo_volume_liters": 0.0}, "hv": {}}
+
+
+def sample_inputs(vehicle: str, n: int, seed: int = 0) -> pd.DataFrame:
+    """'n' raw API inputs (the EVInput / HVInput fields) sampled from the vehicle's CSV, with replacement past its size."""
+    from Backend.schemas.ev_schema import EVInput
+    from Backend.schemas.hv_schema import HVInput
+
+    df = pd.read_csv(DATA_PATHS[vehicle])
+    for column, value in INPUT_DEFAULTS[vehicle].items():
+        if column not in df.columns:
+            df[column] = value
+    fields = list({"ev": EVInput, "hv": HVInput}[vehicle].model_fields)
+    return df[fields].sample(n=n, replace=n > len(df), random_state=seed).reset_index(drop=True)
+
+
+def latency_summary(seconds: Sequence[float]) -> Dict[str, float]:
+    """p50/p95/p99/mean/max of a list of durations, in milliseconds."""
+    ms = np.asarray(seconds, dtype=np.float64) * 1000
+    if not len(ms):
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None, "mean_ms": None, "max_ms": None}
+    p50, p95, p99 = np.percentile(ms, [50, 95, 99])
+    return {"p50_ms": round(float(p50), 4), "p95_ms": round(float(p95), 4), "p99_ms": round(float(p99), 4),
+            "mean_ms": round(float(ms.mean()), 4), "max_ms": round(float(ms.max()), 4)}
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def environment_info(settings: Dict[str, Any] | None = None) -> Dict[str, Any]:
+    """What a result depends on besides the code: commit, interpreter, library versions, cores."""
+    import pandas, xgboost, sklearn
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pandas.__version__,
+        "xgboost": xgboost.__version__,
+        "scikit-learn": sklearn.__version__,
+        "argv": sys.argv,
+        **({"settings": settings} if settings else {}),
+    }
+
+
+def write_results(path: str, results: Dict[str, Any]):
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+    logging.info(f"Wrote benchmark results to {path}")
+
+
+def compare_to_baseline(current: Dict[str, Dict[str, Any]], baseline_path: str, metrics: Sequence[str],
+                        max_regression: float = DEFAULT_MAX_REGRESSION, higher_is_better: Sequence[str] = (),
+                        settings: Dict[str, Any] | None = None) -> List[Dict[str, Any]]:
+    """
+    Compares the 'results' of a run, {case: {metric: value}}, with those of a saved run. Returns one
+    entry per case and metric found in both; 'regression' is set when the metric got worse by more
+    than 'max_regression' (e.g. 0.10 = 10% slower). Metrics in 'higher_is_better' (throughput) get
+    worse when they drop. Differences from the baseline's 'settings' are logged, since they make
+    the numbers incomparable.
+    """
+    with open(baseline_path) as f:
+        saved = json.load(f)
+    baseline = saved["results"]
+    baseline_settings = saved.get("environment", {}).get("settings", {})
+    for key, value in (settings or {}).items():
+        if key in baseline_settings and baseline_settings[key] != value:
+            logging.warning(f"Setting '{key}' differs from the baseline ({baseline_settings[key]!r} -> {value!r}).")
+    comparisons = []
+    for case, values in current.items():
+        for metric in metrics:
+            old, new = baseline.get(case, {}).get(metric), values.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if metric in higher_is_better else change
+            comparisons.append({"case": case, "metric": metric, "baseline": old, "current": new,
+                                "change": round(change, 4), "regression": worse > max_regression})
+    for entry in comparisons:
+        log = logging.warning if entry["regression"] else logging.info
+        log(f"{entry['case']} {entry['metric']}: {entry['baseline']:.4g} -> {entry['current']:.4g} "
+            f"({entry['change']:+.1%}){' REGRESSION' if entry['regression'] else ''}")
+    return comparisons
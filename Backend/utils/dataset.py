@@ -0,0 +1,123 @@
+# Backend/utils/dataset.py
+# Columnar storage for the training / evaluation datasets. A CSV (ev_data.csv, hv.csv) is parsed
+# once into a typed Parquet file next to it: float64 numeric columns and dictionary-encoded
+# categoricals, written in row groups. Readers memory-map the Parquet file and load only the
+# columns and row groups they ask for; the file is rebuilt when the CSV is newer.
+import os
+import logging
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as pa_dataset
+import pyarrow.parquet as pq
+
+CATEGORICAL_COLUMNS = ["ambient_temp", "driving_mode", "drive_type", "hvac_on"]
+CATEGORICAL_TYPE = pa.dictionary(pa.int32(), pa.string())
+
+# Raw columns preprocess_*_input reads (derived columns are recomputed there) and the targets
+INPUT_COLUMNS = {
+    "ev": ["battery_percentage", "battery_age_years", "ambient_temp", "terrain_slope", "speed_avg_kmph",
+           "acceleration_level", "hvac_on", "driving_mode", "drive_type", "cargo_volume_liters", "top_speed_kmph",
+           "total_power_kw", "total_torque_nm", "battery_capacity_kwh"],
+    "hv": ["hydrogen_percentage", "fuel_cell_age_years", "fuel_cell_efficiency", "ambient_temp", "terrain_slope",
+           "speed_avg_kmph", "acceleration_level", "hvac_on", "driving_mode", "drive_type", "cargo_volume_liters",
+           "top_speed_kmph", "total_power_kw", "total_torque_nm"],
+}
+TARGET_COLUMNS = {"ev": "electric_range_km", "hv": "range_in_km"}
+
+DEFAULT_ROW_GROUP_ROWS = 1_000_000
+_CSV_BLOCK_BYTES = 64 * 2**20
+
+# Filters use the pyarrow DNF form, e.g. [("ambient_temp", "==", "cold"), ("speed_avg_kmph", "<", 90)]
+Filters = Optional[List[Tuple]]
+
+
+def parquet_path_for(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".parquet"
+
+
+def csv_to_parquet(csv_path: str, parquet_path: Optional[str] = None, row_group_rows: int = DEFAULT_ROW_GROUP_ROWS) -> str:
+    """Streams a CSV into a typed Parquet file (one row group per 'row_group_rows' rows) and returns its path."""
+    parquet_path = parquet_path or parquet_path_for(csv_path)
+    header = pa_csv.open_csv(csv_path).schema.names
+    column_types = {name: CATEGORICAL_TYPE if name in CATEGORICAL_COLUMNS else pa.float64() for name in header}
+    reader = pa_csv.open_csv(csv_path, read_options=pa_csv.ReadOptions(block_size=_CSV_BLOCK_BYTES),
+                             convert_options=pa_csv.ConvertOptions(column_types=column_types))
+
+    # Write to a temporary name so a failed conversion never leaves a truncated file behind
+    tmp_path = parquet_path + ".tmp"
+    rows = 0
+    try:
+        with pq.ParquetWriter(tmp_path, reader.schema) as writer:
+            pending, pending_rows = [], 0
+            for batch in reader:
+                pending.append(batch)
+                pending_rows += batch.num_rows
+                if pending_rows >= row_group_rows:
+                    table = pa.Table.from_batches(pending)
+                    writer.write_table(table, row_group_size=row_group_rows)
+                    rows += table.num_rows
+                    pending, pending_rows = [], 0
+            if pending:
+                writer.write_table(pa.Table.from_batches(pending), row_group_size=row_group_rows)
+                rows += pending_rows
+        os.replace(tmp_path, parquet_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    logging.info(f"Converted {csv_path} ({rows} rows) to {parquet_path}")
+    return parquet_path
+
+
+def ensure_parquet(path: str) -> str:
+    """Returns a Parquet path for 'path', converting a CSV first when its Parquet copy is missing or stale."""
+    if path.endswith(".parquet"):
+        return path
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+    parquet_path = parquet_path_for(path)
+    if not os.path.exists(parquet_path) or os.path.getmtime(parquet_path) < os.path.getmtime(path):
+        csv_to_parquet(path, parquet_path)
+    return parquet_path
+
+
+def dataset_columns(path: str) -> List[str]:
+    return pq.read_schema(ensure_parquet(path)).names
+
+
+def read_dataset(path: str, columns: Optional[Sequence[str]] = None, filters: Filters = None) -> pd.DataFrame:
+    """
+    Reads a CSV or Parquet dataset as a DataFrame via the memory-mapped Parquet copy. Only 'columns'
+    are decoded, and row groups whose statistics cannot match 'filters' are skipped.
+    Categorical columns come back as pandas categoricals.
+    """
+    table = pq.read_table(ensure_parquet(path), columns=list(columns) if columns is not None else None,
+                          filters=filters, memory_map=True)
+    # self_destruct frees each Arrow column as soon as it has been converted
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def iter_dataset(path: str, columns: Optional[Sequence[str]] = None, filters: Filters = None,
+                 batch_rows: int = DEFAULT_ROW_GROUP_ROWS) -> Iterator[pd.DataFrame]:
+    """Like read_dataset, but yields DataFrames of at most 'batch_rows' rows so large files never load whole."""
+    dataset = pa_dataset.dataset(ensure_parquet(path), format="parquet")
+    expression = pq.filters_to_expression(filters) if filters else None
+    for batch in dataset.to_batches(columns=list(columns) if columns is not None else None, filter=expression,
+                                    batch_size=batch_rows):
+        if batch.num_rows:
+            yield batch.to_pandas()
+
+
+def training_columns(path: str, vehicle: str) -> List[str]:
+    """The model input columns present in the file, plus the target."""
+    available = set(dataset_columns(path))
+    return [col for col in INPUT_COLUMNS[vehicle] if col in available] + [TARGET_COLUMNS[vehicle]]
+
+
+def load_training_data(path: str, vehicle: str, filters: Filters = None) -> Tuple[pd.DataFrame, pd.Series]:
+    """Reads only the raw input columns and target of a training/evaluation file; returns (inputs, target)."""
+    target = TARGET_COLUMNS[vehicle]
+    df = read_dataset(path, columns=training_columns(path, vehicle), filters=filters)
+    return df.drop(columns=[target]), df[target]
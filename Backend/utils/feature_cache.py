@@ -0,0 +1,138 @@
+# Backend/utils/feature_cache.py
+# Content-addressed cache of preprocessed training features. An entry is keyed on the bytes of
+# the raw data file, the source of the preprocessing, encoder and dataset-loading modules, and
+# TRAINED_FEATURES; changing any of them gives a new key, so stale features are never reused.
+# An entry holds the encoded float32 feature matrix (categoricals as their codes, exactly what
+# XGBoost sees) and the target as .npy files that are memory-mapped on load.
+import os
+import json
+import shutil
+import hashlib
+import logging
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from Backend.preprocess import ev_preprocess, hv_preprocess, ev_encoder, hv_encoder, frame_encoding
+from Backend.utils import dataset, ev_feature_reference, hv_feature_reference
+
+FEATURE_CACHE_DIR = os.getenv("FEATURE_CACHE_DIR", os.path.join("Backend", "data", "feature_cache"))
+
+# vehicle -> (modules the features depend on, frame encoder, encoder module, feature reference module)
+_PIPELINES = {
+    "ev": ((ev_preprocess, ev_encoder, frame_encoding), ev_encoder.encode_ev_frame, ev_encoder, ev_feature_reference),
+    "hv": ((hv_preprocess, hv_encoder, frame_encoding), hv_encoder.encode_hv_frame, hv_encoder, hv_feature_reference),
+}
+
+_CACHE_FORMAT = b"feature-cache-v1"
+
+
+def _hash_file(h, path: str):
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(16 * 2**20), b""):
+            h.update(block)
+
+
+def feature_cache_key(data_path: str, vehicle: str) -> str:
+    modules, _, _, reference = _PIPELINES[vehicle]
+    h = hashlib.sha256(_CACHE_FORMAT)
+    _hash_file(h, data_path)
+    for module in (*modules, dataset): # dataset decides which raw columns are read
+        _hash_file(h, module.__file__)
+    h.update(json.dumps(reference.TRAINED_FEATURES).encode())
+    return h.hexdigest()
+
+
+class FeatureSet:
+    """Preprocessed features and target of one dataset, backed by memory-mapped arrays."""
+
+    def __init__(self, matrix: np.ndarray, target: np.ndarray, feature_names: List[str], categorical: List[str], key: str):
+        self.matrix = matrix
+        self.target = target
+        self.feature_names = feature_names
+        self.categorical = categorical
+        self.key = key
+
+    def __len__(self):
+        return len(self.target)
+
+    def feature_types(self) -> List[str]:
+        """XGBoost feature types for 'matrix' ('c' for the one-hot categoricals, 'q' otherwise)."""
+        return ["c" if name in self.categorical else "q" for name in self.feature_names]
+
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Rebuilds the preprocessed DataFrame the models are trained on. Numeric columns stay float32
+        (XGBoost converts to float32 anyway); categorical columns get back their fixed DUMMY_DTYPE.
+        """
+        columns = {}
+        for i, name in enumerate(self.feature_names):
+            column = self.matrix[:, i]
+            if name in self.categorical:
+                columns[name] = pd.Categorical.from_codes(column.astype(np.int8), dtype=ev_preprocess.DUMMY_DTYPE)
+            else:
+                columns[name] = np.array(column)
+        return pd.DataFrame(columns)
+
+    def target_series(self, name: str = None) -> pd.Series:
+        return pd.Series(np.array(self.target), name=name)
+
+
+def _load_entry(entry_dir: str, key: str) -> FeatureSet:
+    with open(os.path.join(entry_dir, "meta.json")) as f:
+        meta = json.load(f)
+    return FeatureSet(
+        matrix=np.load(os.path.join(entry_dir, "features.npy"), mmap_mode="r"),
+        target=np.load(os.path.join(entry_dir, "target.npy"), mmap_mode="r"),
+        feature_names=meta["feature_names"],
+        categorical=meta["categorical"],
+        key=key,
+    )
+
+
+def build_features(data_path: str, vehicle: str, entry_dir: str, key: str) -> FeatureSet:
+    """Preprocesses the raw file and writes a cache entry (via a temporary directory, so readers never see half of one)."""
+    _, encode_func, encoder, reference = _PIPELINES[vehicle]
+    inputs, target = dataset.load_training_data(data_path, vehicle)
+    features = encode_func(inputs, is_training_data=True)
+    del inputs
+
+    tmp_dir = f"{entry_dir}.tmp{os.getpid()}"
+    os.makedirs(tmp_dir, exist_ok=True)
+    try:
+        np.save(os.path.join(tmp_dir, "features.npy"), features)
+        np.save(os.path.join(tmp_dir, "target.npy"), target.to_numpy(dtype=np.float64))
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump({
+                "vehicle": vehicle,
+                "data_path": os.path.abspath(data_path),
+                "rows": len(features),
+                "feature_names": list(reference.TRAINED_FEATURES),
+                "categorical": list(encoder.CATEGORICAL_FEATURES),
+            }, f, indent=2)
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError: # Another process stored the same entry first
+            shutil.rmtree(tmp_dir)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+    logging.info(f"Cached {len(features)} preprocessed {vehicle.upper()} rows in {entry_dir}")
+    return _load_entry(entry_dir, key)
+
+
+def load_features(data_path: str, vehicle: str, cache_dir: str = FEATURE_CACHE_DIR, use_cache: bool = True) -> FeatureSet:
+    """
+    Returns the preprocessed features and target for a raw data file (CSV or Parquet), reusing the
+    cached entry when one exists for the current inputs. use_cache=False rebuilds the entry.
+    """
+    key = feature_cache_key(data_path, vehicle)
+    entry_dir = os.path.join(cache_dir, f"{vehicle}-{key[:16]}")
+    if use_cache and os.path.exists(os.path.join(entry_dir, "meta.json")):
+        logging.info(f"Using cached {vehicle.upper()} features from {entry_dir}")
+        return _load_entry(entry_dir, key)
+    if os.path.exists(entry_dir):
+        shutil.rmtree(entry_dir)
+    os.makedirs(cache_dir, exist_ok=True)
+    return build_features(data_path, vehicle, entry_dir, key)
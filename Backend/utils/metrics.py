@@ -0,0 +1,270 @@
+# Backend/utils/metrics.py
+# In-process request metrics, served in the Prometheus text format by GET /metrics.
+#
+# MetricsMiddleware times every request and counts it by route and status. Inside a request,
+# handlers time their stages with track_stage("preprocess") etc.; the durations are collected on
+# a per-request RequestTimer (found through a context variable) and recorded when the response
+# ends, with the route template as label. Two stages are derived instead of wrapped:
+#   validation    - request start until mark_validated(), i.e. body parsing and schema validation
+#                   done by FastAPI before the handler runs (plus any track_stage("validation"));
+#   serialization - end of the last timed stage until the response starts, i.e. building the
+#                   response and rendering it to JSON.
+# Recording is a bisect and a few additions under a lock, so it stays cheap on the hot path.
+import bisect
+import threading
+import time
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterable, List, Sequence, Tuple
+
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 4096, 16384, 65536, 262144)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter per label combination."""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_labels(self.labelnames, labels)} {_number(value)}" for labels, value in values]
+        return lines
+
+
+class Histogram:
+    """Fixed-bucket histogram per label combination."""
+
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labelnames = tuple(labelnames)
+        self._series: Dict[Tuple, list] = {} # labels -> [per-bucket counts (+Inf last), sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][i] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _number(bound)
+                bucket_labels = _labels(self.labelnames, labels, 'le="' + le + '"')
+                lines.append(f"{self.name}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labelnames, labels)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """
+    The metrics of the app. Collectors are called at scrape time and return extra
+    (name, type, help, [(labels dict, value)]) families, for values kept elsewhere
+    (e.g. the prediction cache counters), so those cost nothing per request.
+    """
+
+    def __init__(self):
+        self._metrics: list = []
+        self._collectors: List[Callable[[], Iterable[tuple]]] = []
+
+    def counter(self, name: str, help: str, labelnames: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, help, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, help: str, buckets: Sequence[float] = LATENCY_BUCKETS,
+                  labelnames: Sequence[str] = ()) -> Histogram:
+        metric = Histogram(name, help, buckets, labelnames)
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[tuple]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines += metric.render()
+        for collector in self._collectors:
+            for name, kind, help, samples in collector():
+                lines += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+                lines += [f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}" for labels, value in samples]
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+REQUESTS = metrics.counter("greenmiles_requests_total", "HTTP requests by route, method and status.",
+                           ("route", "method", "status"))
+ERRORS = metrics.counter("greenmiles_errors_total", "Requests that failed: status >= 500 or an error handled in the route.",
+                         ("route",))
+REQUEST_SECONDS = metrics.histogram("greenmiles_request_duration_seconds", "Time from request start to the last response byte.",
+                                    labelnames=("route",))
+STAGE_SECONDS = metrics.histogram("greenmiles_stage_duration_seconds",
+                                  "Time per request stage: validation, preprocess, predict, serialization, ...",
+                                  labelnames=("route", "stage"))
+MODEL_PREDICT_SECONDS = metrics.histogram("greenmiles_model_predict_seconds", "Duration of one model predict call.",
+                                          labelnames=("model",))
+BATCH_ROWS = metrics.histogram("greenmiles_batch_rows", "Rows per model call: micro_batch (gathered single-row "
+                               "requests), request (/batch routes) or stream_chunk (bulk scoring).",
+                               buckets=SIZE_BUCKETS, labelnames=("model", "kind"))
+
+
+class RequestTimer:
+    """Stage durations of one request, recorded when its response ends."""
+
+    __slots__ = ("start", "mark", "stages", "error")
+
+    def __init__(self, start: float):
+        self.start = start
+        self.mark = None # End of the last timed stage
+        self.stages: Dict[str, float] = {}
+        self.error = False
+
+    def add(self, stage: str, seconds: float):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+
+_current_timer: ContextVar[RequestTimer | None] = ContextVar("greenmiles_request_timer", default=None)
+
+
+class _Stage:
+    __slots__ = ("timer", "name", "start", "seconds")
+
+    def __init__(self, timer: RequestTimer | None, name: str):
+        self.timer = timer
+        self.name = name
+        self.seconds = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        self.seconds = end - self.start
+        if self.timer is not None:
+            self.timer.add(self.name, self.seconds)
+            self.timer.mark = end
+        return False
+
+
+def track_stage(name: str) -> _Stage:
+    """
+    Context manager that adds its duration to stage 'name' of the current request (only measured
+    outside one). The duration is also left on the returned object as 'seconds'.
+    """
+    return _Stage(_current_timer.get(), name)
+
+
+def mark_validated():
+    """Call first thing in a handler: the time since the request started is its validation stage."""
+    timer = _current_timer.get()
+    if timer is not None:
+        now = time.perf_counter()
+        timer.add("validation", now - timer.start)
+        timer.mark = now
+
+
+def count_error():
+    """Counts an error the route handled itself (e.g. answered with a 200 error body)."""
+    timer = _current_timer.get()
+    if timer is not None:
+        timer.error = True
+
+
+def observe_batch(model: str, kind: str, rows: int, seconds: float | None = None):
+    BATCH_ROWS.observe(rows, model, kind)
+    if seconds is not None:
+        MODEL_PREDICT_SECONDS.observe(seconds, model)
+
+
+def _route_label(scope) -> str:
+    """
+    Path template of the matched route, e.g. "/predict/{vehicle}/stream". Depending on the FastAPI
+    version the route may carry only its own path without the router prefix, so the prefix is taken
+    from the front of the request path the template matches.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched" # Templates, not raw paths, keep the label set small
+    path = scope["path"]
+    for i, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[i:]):
+            return path[:i] + path_format
+    return path_format
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (no extra task per request) that times and counts HTTP requests."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        timer = RequestTimer(time.perf_counter())
+        token = _current_timer.set(timer)
+        status = [500]
+
+        async def send_timed(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+                if timer.mark is not None and "serialization" not in timer.stages:
+                    timer.add("serialization", time.perf_counter() - timer.mark)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _current_timer.reset(token)
+            route = _route_label(scope)
+            REQUESTS.inc(route, scope["method"], str(status[0]))
+            REQUEST_SECONDS.observe(time.perf_counter() - timer.start, route)
+            if timer.error or status[0] >= 500:
+                ERRORS.inc(route)
+            for stage, seconds in timer.stages.items():
+                STAGE_SECONDS.observe(seconds, route, stage)
@@ -0,0 +1,116 @@
+# Backend/utils/road_graph.py
+# Local road graphs for stop planning, read from <name>.json files in ROAD_GRAPH_DIR:
+#   {"name": ..., "nodes": [{"id": "A1", "charger": true, "h2_station": false}, ...],
+#    "edges": [{"from": "A1", "to": "B1", "length_km": 83.0, "slope": -2.8, "speed_kmph": 120}, ...]}
+# Roads are two-way unless an edge sets "oneway": true; the reverse direction gets the negated
+# slope. A loaded graph is kept until its file changes, together with the memo of predicted edge
+# ranges (see Backend/utils/stop_planner.py), so repeated plans on the same graph reuse both.
+import json
+import os
+import re
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from Backend.config import ROAD_GRAPH_DIR, ROUTE_EDGE_CACHE_SIZE, ROUTE_EDGE_CACHE_TTL_S
+from Backend.models.prediction_cache import PredictionCache
+
+# Node flag marking where each model's vehicle can stop to charge/refuel
+STATION_FLAGS = {"ev": "charger", "hv": "h2_station"}
+
+_GRAPH_NAME = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+class GraphError(ValueError):
+    """A graph file is malformed."""
+
+
+class RoadGraph:
+    """Directed edges as parallel arrays, with the outgoing edge indices of every node."""
+
+    def __init__(self, name: str, nodes: List[dict], edges: List[dict]):
+        self.name = name
+        if not all(isinstance(node, dict) and "id" in node for node in nodes):
+            raise GraphError(f"Graph '{name}': every node needs an 'id'.")
+        self.nodes = [str(node["id"]) for node in nodes]
+        self.index = {node_id: i for i, node_id in enumerate(self.nodes)}
+        if len(self.index) != len(self.nodes):
+            raise GraphError(f"Graph '{name}' has duplicate node ids.")
+        self.stations = {vehicle: np.array([bool(node.get(flag, False)) for node in nodes])
+                         for vehicle, flag in STATION_FLAGS.items()}
+
+        source, target, length, slope, speed = [], [], [], [], []
+        for i, edge in enumerate(edges):
+            try:
+                a, b = self.index[str(edge["from"])], self.index[str(edge["to"])]
+                values = float(edge["length_km"]), float(edge.get("slope", 0.0)), float(edge["speed_kmph"])
+            except KeyError as e:
+                raise GraphError(f"Graph '{name}', edge {i}: unknown node or missing field {e}.")
+            except (TypeError, ValueError) as e:
+                raise GraphError(f"Graph '{name}', edge {i}: {e}")
+            if not (values[0] > 0 and values[2] > 0 and all(np.isfinite(values))):
+                raise GraphError(f"Graph '{name}', edge {i}: length_km and speed_kmph must be positive.")
+            directions = [(a, b, values[1])] if edge.get("oneway") else [(a, b, values[1]), (b, a, -values[1])]
+            for a, b, grade in directions:
+                source.append(a)
+                target.append(b)
+                length.append(values[0])
+                slope.append(grade)
+                speed.append(values[2])
+        self.source = np.array(source, dtype=np.int64)
+        self.target = np.array(target, dtype=np.int64)
+        self.length_km = np.array(length)
+        self.slope = np.array(slope)
+        self.speed_kmph = np.array(speed)
+        self.hours = self.length_km / self.speed_kmph
+        self.out_edges: List[List[int]] = [[] for _ in self.nodes]
+        for e, a in enumerate(source):
+            self.out_edges[a].append(e)
+
+        # Memo of predicted edge ranges, keyed by (model version, vehicle, edge, level bucket)
+        self.edge_ranges = PredictionCache(max_size=ROUTE_EDGE_CACHE_SIZE, ttl_s=ROUTE_EDGE_CACHE_TTL_S)
+
+    def info(self) -> dict:
+        return {
+            "name": self.name,
+            "nodes": len(self.nodes),
+            "edges": len(self.source),
+            **{f"{flag}_nodes": int(self.stations[vehicle].sum()) for vehicle, flag in STATION_FLAGS.items()},
+            "edge_cache": self.edge_ranges.stats(),
+        }
+
+
+def load_graph(path: str) -> RoadGraph:
+    with open(path) as f:
+        data = json.load(f)
+    name = data.get("name", os.path.splitext(os.path.basename(path))[0])
+    return RoadGraph(name, data.get("nodes", []), data.get("edges", []))
+
+
+_graphs: Dict[str, Tuple[float, RoadGraph]] = {} # name -> (file mtime, graph)
+_graphs_lock = threading.Lock()
+
+
+def graph_names() -> List[str]:
+    if not os.path.isdir(ROAD_GRAPH_DIR):
+        return []
+    return sorted(os.path.splitext(f)[0] for f in os.listdir(ROAD_GRAPH_DIR) if f.endswith(".json"))
+
+
+def get_graph(name: str) -> RoadGraph:
+    """The named graph, loaded on first use and again whenever its file changes. KeyError if unknown."""
+    path = os.path.join(ROAD_GRAPH_DIR, f"{name}.json")
+    if not _GRAPH_NAME.match(name) or not os.path.isfile(path):
+        raise KeyError(f"Unknown graph: {name}. Available: {graph_names()}.")
+    mtime = os.path.getmtime(path)
+    with _graphs_lock:
+        cached = _graphs.get(name)
+        if cached is None or cached[0] != mtime:
+            _graphs[name] = cached = (mtime, load_graph(path))
+        return cached[1]
+
+
+def loaded_graphs() -> List[RoadGraph]:
+    with _graphs_lock:
+        return [graph for _, graph in _graphs.values()]
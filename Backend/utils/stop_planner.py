@@ -0,0 +1,176 @@
+# Backend/utils/stop_planner.py
+# Charging/refuel stop planning on a RoadGraph: the fastest route from origin to destination on
+# which the vehicle's level never drops below the reserve, stopping at charger (EV) or hydrogen
+# station (HV) nodes to fill up. Energy per edge follows the trip simulator (Backend/utils/trip.py):
+# an edge of d km with predicted range R uses 100 * d / R percentage points.
+#
+# The search is A* over labels (node, elapsed hours, level). Its heuristic is the fastest driving
+# time to the destination with energy ignored (one reverse Dijkstra per plan), a lower bound since
+# stops only add time; so the first label to reach the destination is the fastest feasible plan.
+# A label is dropped when another one at the same node is no slower and has at least as much left.
+# Edge ranges are predicted at the level rounded down to a bucket and memoized on the graph; when a
+# label is expanded, the memo misses among its node's outgoing edges are scored in one batch.
+import heapq
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+import pandas as pd
+
+from Backend.config import ROUTE_LEVEL_BUCKET_PERCENT, ROUTE_MAX_LABELS
+from Backend.utils.road_graph import RoadGraph
+from Backend.utils.trip import used_percentage
+
+
+# Input fields taken from the edge being driven rather than from the request
+EDGE_FIELDS = ("speed_avg_kmph", "terrain_slope")
+
+
+class PlanError(ValueError):
+    """The plan request cannot be searched (the routes answer it with 400)."""
+
+
+def fastest_hours_to(graph: RoadGraph, destination: int) -> np.ndarray:
+    """Driving hours from every node to 'destination' (inf where it cannot be reached)."""
+    incoming: List[List[int]] = [[] for _ in graph.nodes]
+    for e, b in enumerate(graph.target.tolist()):
+        incoming[b].append(e)
+    hours = np.full(len(graph.nodes), np.inf)
+    hours[destination] = 0.0
+    heap = [(0.0, destination)]
+    while heap:
+        h, node = heapq.heappop(heap)
+        if h > hours[node]:
+            continue
+        for e in incoming[node]:
+            a, candidate = graph.source[e], h + graph.hours[e]
+            if candidate < hours[a]:
+                hours[a] = candidate
+                heapq.heappush(heap, (candidate, a))
+    return hours
+
+
+class EdgeRanges:
+    """
+    Predicted range of the vehicle on graph edges, through the graph's memo. Entries are keyed by
+    (model version, vehicle, edge, level bucket); the vehicle is every input field but its level
+    and the ones each edge sets.
+    """
+
+    def __init__(self, graph: RoadGraph, vehicle: Dict[str, Any], level_column: str, model_version: str,
+                 score: Callable[[pd.DataFrame], np.ndarray], bucket: float = ROUTE_LEVEL_BUCKET_PERCENT):
+        self.graph = graph
+        self.vehicle = vehicle
+        self.level_column = level_column
+        edge_fields = (level_column, *EDGE_FIELDS)
+        self.key = (model_version, tuple(sorted((k, v) for k, v in vehicle.items() if k not in edge_fields)))
+        self.score = score
+        self.bucket = bucket
+        self.predicted = 0 # Edge ranges this plan had to score
+        self.reused = 0 # Served from the memo
+
+    def get(self, edges: List[int], level: float) -> np.ndarray:
+        bucket = int(level // self.bucket)
+        memo = self.graph.edge_ranges
+        keys = [(self.key, e, bucket) for e in edges]
+        ranges = np.empty(len(edges))
+        missing = []
+        for i, key in enumerate(keys):
+            value = memo.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                ranges[i] = value
+        self.reused += len(edges) - len(missing)
+        if missing:
+            scored = np.array([edges[i] for i in missing])
+            frame = pd.DataFrame(self.vehicle, index=pd.RangeIndex(len(missing)))
+            frame[self.level_column] = bucket * self.bucket
+            frame["speed_avg_kmph"] = self.graph.speed_kmph[scored]
+            frame["terrain_slope"] = self.graph.slope[scored]
+            predictions = np.asarray(self.score(frame), dtype=np.float64)
+            if not np.isfinite(predictions).all():
+                raise ValueError("Model returned invalid predictions for the road graph.")
+            for i, prediction in zip(missing, predictions.tolist()):
+                ranges[i] = prediction
+                memo.put(keys[i], prediction)
+            self.predicted += len(missing)
+        return ranges
+
+
+def plan_stops(graph: RoadGraph, edge_ranges: EdgeRanges, stations: np.ndarray, origin: str, destination: str,
+               start_level: float, reserve: float, fill_to: float, stop_hours: float,
+               max_labels: int = ROUTE_MAX_LABELS) -> Dict[str, Any]:
+    """
+    Fastest route with its stops. 'stations' flags the nodes where the level can be raised to
+    'fill_to', which costs 'stop_hours'. Raises PlanError.
+    """
+    for node in (origin, destination):
+        if node not in graph.index:
+            raise PlanError(f"Unknown node: {node}. Graph '{graph.name}' has {len(graph.nodes)} nodes.")
+    if not reserve < fill_to:
+        raise PlanError("fill_to_percentage must be above reserve_percentage.")
+    source, goal = graph.index[origin], graph.index[destination]
+    heuristic = fastest_hours_to(graph, goal)
+
+    # Label: (node, hours, level, parent label, edge driven to get here or -1 for a stop)
+    labels: List[tuple] = []
+    settled: List[List[tuple]] = [[] for _ in graph.nodes] # (hours, level) of expanded labels
+    heap: List[tuple] = []
+
+    def push(node, hours, level, parent, edge):
+        if np.isfinite(heuristic[node]):
+            labels.append((node, hours, level, parent, edge))
+            heapq.heappush(heap, (hours + heuristic[node], hours, -level, len(labels) - 1))
+
+    push(source, 0.0, float(start_level), -1, -1)
+    while heap:
+        _, hours, negative_level, label = heapq.heappop(heap)
+        node, level = labels[label][0], -negative_level
+        if any(t <= hours and l >= level for t, l in settled[node]):
+            continue
+        settled[node].append((hours, level))
+        if node == goal:
+            return _plan_result(graph, labels, label, edge_ranges, expanded=sum(map(len, settled)))
+        if len(labels) > max_labels:
+            raise PlanError(f"No plan found within {max_labels} search labels.")
+
+        if stations[node] and level < fill_to:
+            push(node, hours + stop_hours, fill_to, label, -1)
+        edges = graph.out_edges[node]
+        used = used_percentage(graph.length_km[edges], edge_ranges.get(edges, level))
+        for e, left in zip(edges, (level - used).tolist()):
+            if left >= reserve:
+                push(graph.target[e], hours + graph.hours[e], left, label, e)
+
+    return {"feasible": False, "labels_expanded": sum(map(len, settled)),
+            "edge_predictions": edge_ranges.predicted, "edge_cache_hits": edge_ranges.reused}
+
+
+def _plan_result(graph: RoadGraph, labels: List[tuple], label: int, edge_ranges: EdgeRanges, expanded: int) -> Dict[str, Any]:
+    steps = []
+    while label >= 0:
+        steps.append(labels[label])
+        label = labels[label][3]
+    steps.reverse()
+
+    route, stops, distance, driving = [graph.nodes[steps[0][0]]], [], 0.0, 0.0
+    for (_, _, previous_level, _, _), (node, _, level, _, edge) in zip(steps, steps[1:]):
+        if edge < 0:
+            stops.append({"node": graph.nodes[node], "arrival_percentage": round(previous_level, 2),
+                          "departure_percentage": round(level, 2)})
+        else:
+            route.append(graph.nodes[node])
+            distance += graph.length_km[edge]
+            driving += graph.hours[edge]
+    return {
+        "feasible": True,
+        "route": route,
+        "stops": stops,
+        "distance_km": round(float(distance), 2),
+        "driving_hours": round(float(driving), 2),
+        "total_hours": round(float(steps[-1][1]), 2),
+        "arrival_percentage": round(float(steps[-1][2]), 2),
+        "labels_expanded": expanded,
+        "edge_predictions": edge_ranges.predicted,
+        "edge_cache_hits": edge_ranges.reused,
+    }
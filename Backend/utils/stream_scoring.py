@@ -0,0 +1,119 @@
+# Backend/utils/stream_scoring.py
+# Chunked bulk scoring of trip logs in the ev_data.csv / hv.csv column layout. Input is read
+# 'chunk_rows' rows at a time, each chunk goes through encode_*_frame (the vectorized equivalent of
+# preprocess_*_input) and one predict call, and the predictions are formatted chunk by chunk, so
+# memory use does not grow with file size.
+import io
+import json
+import itertools
+from typing import IO, Iterator, Tuple
+
+import numpy as np
+import pandas as pd
+
+from Backend.preprocess.ev_encoder import encode_ev_frame
+from Backend.preprocess.hv_encoder import encode_hv_frame
+from Backend.utils.batch import predict_frame
+from Backend.utils.metrics import track_stage, observe_batch
+
+PREPROCESSORS = {"ev": encode_ev_frame, "hv": encode_hv_frame}
+INPUT_FORMATS = ("csv", "ndjson")
+OUTPUT_FORMATS = ("ndjson", "csv")
+DEFAULT_CHUNK_ROWS = 50000
+
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+# Columns the encoders cannot do without; other missing inputs are scored as 0, like preprocess_*_input
+REQUIRED_COLUMNS = {
+    "ev": ["ambient_temp", "driving_mode", "drive_type"],
+    "hv": ["ambient_temp", "hvac_on", "driving_mode", "drive_type"],
+}
+
+
+class MissingColumnsError(ValueError):
+    """The input lacks columns listed in REQUIRED_COLUMNS."""
+
+
+def iter_input_chunks(source: IO, input_format: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """Reads a CSV (with header) or NDJSON file object as DataFrames of at most 'chunk_rows' rows."""
+    if input_format == "csv":
+        try:
+            reader = pd.read_csv(source, chunksize=chunk_rows)
+        except pd.errors.EmptyDataError:
+            return # Empty upload: no rows to score
+        yield from reader
+    elif input_format == "ndjson":
+        yield from pd.read_json(source, lines=True, chunksize=chunk_rows)
+    else:
+        raise ValueError(f"Unknown input format: {input_format}. Expected one of {INPUT_FORMATS}.")
+
+
+def check_columns(vehicle: str, chunk: pd.DataFrame):
+    missing = [col for col in REQUIRED_COLUMNS[vehicle] if col not in chunk.columns]
+    if missing:
+        raise MissingColumnsError(f"Missing required columns: {missing}.")
+
+
+def open_input(vehicle: str, source: IO, input_format: str, chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[pd.DataFrame]:
+    """
+    iter_input_chunks with the first chunk already read and its columns checked, so a file that
+    cannot be parsed or lacks required columns fails before any output is produced.
+    """
+    if vehicle not in PREPROCESSORS:
+        raise ValueError(f"Unknown vehicle type: {vehicle}. Expected one of {list(PREPROCESSORS)}.")
+    chunks = iter_input_chunks(source, input_format, chunk_rows)
+    first = next(chunks, None)
+    if first is None:
+        return iter(())
+    check_columns(vehicle, first)
+    return itertools.chain([first], chunks)
+
+
+def score_chunks(vehicle: str, chunks: Iterator[pd.DataFrame]) -> Iterator[Tuple[int, np.ndarray]]:
+    """Yields (first row number, predictions) for every input chunk."""
+    preprocess_func = PREPROCESSORS[vehicle]
+    start_row = 0
+    for chunk in chunks:
+        if len(chunk):
+            check_columns(vehicle, chunk) # NDJSON chunks need not share the first one's columns
+            # DataFrame mode maps unknown categories to 0 with a warning instead of failing the file
+            with track_stage("preprocess"):
+                features = preprocess_func(chunk, is_training_data=True)
+            with track_stage("predict") as stage:
+                predictions = np.asarray(predict_frame(vehicle, features))
+            observe_batch(vehicle, "stream_chunk", len(features), stage.seconds)
+            yield start_row, predictions
+        start_row += len(chunk)
+
+
+def format_predictions(start_row: int, predictions: np.ndarray, output_format: str, include_header: bool) -> str:
+    """Formats one chunk of predictions as NDJSON lines or CSV rows (row number, predicted range)."""
+    rows = range(start_row, start_row + len(predictions))
+    values = np.round(predictions.astype(np.float64), 2)
+    if output_format == "ndjson":
+        return "".join(json.dumps({"row": row, "predicted_range_km": float(value)}) + "\n" for row, value in zip(rows, values))
+    if output_format == "csv":
+        buffer = io.StringIO()
+        pd.DataFrame({"row": rows, "predicted_range_km": values}).to_csv(buffer, index=False, header=include_header)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown output format: {output_format}. Expected one of {OUTPUT_FORMATS}.")
+
+
+def stream_scores(vehicle: str, source: IO, input_format: str = "csv", output_format: str = "ndjson",
+                  chunk_rows: int = DEFAULT_CHUNK_ROWS) -> Iterator[str]:
+    """Scores a file object chunk by chunk and yields the formatted output of each chunk."""
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}. Expected one of {OUTPUT_FORMATS}.")
+    return stream_chunk_scores(vehicle, open_input(vehicle, source, input_format, chunk_rows), output_format)
+
+
+def stream_chunk_scores(vehicle: str, chunks: Iterator[pd.DataFrame], output_format: str = "ndjson") -> Iterator[str]:
+    """Scores input chunks (e.g. from open_input) and yields the formatted output of each chunk."""
+    first = True
+    for start_row, predictions in score_chunks(vehicle, chunks):
+        with track_stage("serialization"):
+            text = format_predictions(start_row, predictions, output_format, include_header=first)
+        yield text
+        first = False
+    if first and output_format == "csv": # Empty input still gets a header
+        yield "row,predicted_range_km\n"
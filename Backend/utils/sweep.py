@@ -0,0 +1,98 @@
+# Backend/utils/sweep.py
+# What-if sweeps: one base input with one or two fields varied over a grid. The whole Cartesian
+# grid is built as one DataFrame (base values broadcast, axis values laid out by np.meshgrid
+# indices), encoded with encode_*_frame and scored with a single predict call, so a 100 x 100
+# surface costs one 10,000-row batch instead of 10,000 requests.
+import math
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel, ValidationError
+
+from Backend.config import SWEEP_MAX_POINTS
+
+MAX_AXES = 2
+
+Axes = List[Tuple[str, List[Any]]] # (field, values) per axis
+
+
+class SweepError(ValueError):
+    """The sweep request cannot be run (the routes answer it with 400)."""
+
+
+def axis_values(axis) -> List[Any]:
+    """The grid of a SweepAxis: its explicit values, or num evenly spaced points from start to stop."""
+    grid = (axis.start, axis.stop, axis.num)
+    if axis.values is not None:
+        if any(part is not None for part in grid):
+            raise SweepError(f"Axis '{axis.field}': give either values or start/stop/num, not both.")
+        if not axis.values:
+            raise SweepError(f"Axis '{axis.field}' has no values.")
+        return list(axis.values)
+    if any(part is None for part in grid):
+        raise SweepError(f"Axis '{axis.field}' needs either values or all of start, stop and num.")
+    if axis.num < 1:
+        raise SweepError(f"Axis '{axis.field}': num must be at least 1.")
+    return np.linspace(axis.start, axis.stop, axis.num).tolist()
+
+
+def resolve_axes(base: Dict[str, Any], axes: Sequence, schema: type[BaseModel],
+                 extra_checks: Callable[[Dict[str, Any]], List[str]] | None = None,
+                 max_points: int = SWEEP_MAX_POINTS) -> Axes:
+    """
+    Checks the axes of a sweep and returns (field, values) per axis. Each value is validated by
+    'schema' and 'extra_checks' in place of the base value, so it is converted the way a single
+    request would be (e.g. "yes" -> True for a bool field). Raises SweepError.
+    """
+    if not 1 <= len(axes) <= MAX_AXES:
+        raise SweepError(f"A sweep takes 1 to {MAX_AXES} axes, got {len(axes)}.")
+    fields = [axis.field for axis in axes]
+    if len(set(fields)) != len(fields):
+        raise SweepError(f"Each axis must vary a different field, got {fields}.")
+    for field in fields:
+        if field not in schema.model_fields:
+            raise SweepError(f"Unknown field: {field}. Expected one of {list(schema.model_fields)}.")
+    # Sized before any grid is built, so an oversized num is rejected without allocating it
+    points = math.prod(len(axis.values) if axis.values is not None else axis.num or 0 for axis in axes)
+    if points > max_points:
+        raise SweepError(f"The sweep has {points} points; at most {max_points} are allowed.")
+    grids = [axis_values(axis) for axis in axes]
+
+    base_errors = extra_checks(base) if extra_checks else []
+    if base_errors:
+        raise SweepError(f"base: {base_errors[0]}")
+    resolved = []
+    for field, values in zip(fields, grids):
+        validated = []
+        for value in values:
+            try:
+                row = schema(**{**base, field: value}).dict()
+            except ValidationError as e:
+                raise SweepError(f"Axis '{field}', value {value!r}: {e.errors()[0]['msg']}")
+            row_errors = extra_checks(row) if extra_checks else []
+            if row_errors:
+                raise SweepError(f"Axis '{field}': {row_errors[0]}")
+            validated.append(row[field])
+        resolved.append((field, validated))
+    return resolved
+
+
+def build_sweep_frame(base: Dict[str, Any], axes: Axes) -> pd.DataFrame:
+    """One row per grid point, in C order (the last axis varies fastest)."""
+    shape = tuple(len(values) for _, values in axes)
+    indices = np.meshgrid(*(np.arange(size) for size in shape), indexing="ij")
+    columns = dict(base)
+    for (field, values), index in zip(axes, indices):
+        columns[field] = np.asarray(values)[index.ravel()]
+    return pd.DataFrame(columns, index=pd.RangeIndex(math.prod(shape)))
+
+
+def sweep_response(axes: Axes, predictions) -> Dict[str, Any]:
+    shape = tuple(len(values) for _, values in axes)
+    surface = np.round(np.asarray(predictions, dtype=np.float64), 2).reshape(shape)
+    return {
+        "axes": [{"field": field, "values": values} for field, values in axes],
+        "points": surface.size,
+        "predicted_range_km": surface.tolist(),
+    }
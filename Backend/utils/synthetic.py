@@ -0,0 +1,146 @@
+# Backend/utils/synthetic.py
+# Chunked, seeded and optionally multi-process writing of synthetic datasets. A generator is a
+# function (rng, n_rows) -> DataFrame; the dataset is cut into fixed-size chunks and chunk i is
+# always drawn from the i-th child of SeedSequence(seed), so a seeded dataset is identical for
+# any number of workers. Only one chunk per process is held in memory at a time.
+import os
+import shutil
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+OUTPUT_FORMATS = ("csv", "parquet")
+DEFAULT_CHUNK_ROWS = 1_000_000
+
+ChunkGenerator = Callable[[np.random.Generator, int], pd.DataFrame]
+
+
+def resolve_output_format(filename: str, output_format: Optional[str] = None) -> str:
+    """Uses 'output_format' when given, otherwise the file extension (.parquet -> parquet, anything else -> csv)."""
+    if output_format is None:
+        output_format = "parquet" if filename.endswith(".parquet") else "csv"
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}. Expected one of {OUTPUT_FORMATS}.")
+    return output_format
+
+
+def choice(rng: np.random.Generator, options: List[str], n_rows: int) -> pd.Categorical:
+    """Vectorized random.choice: uniform picks from 'options', stored as a categorical."""
+    return pd.Categorical.from_codes(rng.integers(0, len(options), size=n_rows), categories=options)
+
+
+def _chunk_sizes(num_samples: int, chunk_rows: int) -> List[int]:
+    full, rest = divmod(num_samples, chunk_rows)
+    return [chunk_rows] * full + ([rest] if rest else [])
+
+
+def _write_csv_rows(df: pd.DataFrame, f):
+    """Appends the rows of 'df' (no header) to a binary file."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        f.write(df.to_csv(index=False, header=False).encode())
+        return
+    # About 6x faster than DataFrame.to_csv. Values are identical once parsed; whole numbers
+    # are written as "45" rather than "45.0". The generators never emit quotes or commas.
+    options = pa_csv.WriteOptions(include_header=False, quoting_style="none")
+    pa_csv.write_csv(pa.Table.from_pandas(df, preserve_index=False), f, options)
+
+
+def _parquet_writer(filename: str, schema):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise ImportError("Parquet output requires pyarrow (pip install pyarrow).") from e
+    return pq.ParquetWriter(filename, schema)
+
+
+def _write_chunks(generate_chunk: ChunkGenerator, filename: str, output_format: str, sizes: List[int],
+                  seeds: List[np.random.SeedSequence], include_header: bool = True) -> int:
+    """Writes the given chunks in order to one file; returns the number of rows written."""
+    written = 0
+    if output_format == "csv":
+        with open(filename, "wb") as f:
+            for i, (size, seed) in enumerate(zip(sizes, seeds)):
+                df = generate_chunk(np.random.default_rng(seed), size)
+                if include_header and i == 0:
+                    f.write((",".join(df.columns) + "\n").encode())
+                _write_csv_rows(df, f)
+                written += size
+        return written
+
+    import pyarrow as pa
+    writer = None
+    try:
+        for size, seed in zip(sizes, seeds):
+            table = pa.Table.from_pandas(generate_chunk(np.random.default_rng(seed), size), preserve_index=False)
+            if writer is None:
+                writer = _parquet_writer(filename, table.schema)
+            writer.write_table(table) # One row group per chunk
+            written += size
+    finally:
+        if writer is not None:
+            writer.close()
+    return written
+
+
+def _merge_parts(parts: List[str], filename: str, output_format: str):
+    """Concatenates the worker part files into 'filename' and removes them."""
+    if output_format == "csv":
+        with open(filename, "wb") as out: # Only the first part has a header
+            for part in parts:
+                with open(part, "rb") as f:
+                    shutil.copyfileobj(f, out, 16 * 2**20)
+    else:
+        import pyarrow.parquet as pq
+        writer = None
+        try:
+            for part in parts:
+                part_file = pq.ParquetFile(part)
+                if writer is None:
+                    writer = _parquet_writer(filename, part_file.schema_arrow)
+                for group in range(part_file.num_row_groups):
+                    writer.write_table(part_file.read_row_group(group))
+        finally:
+            if writer is not None:
+                writer.close()
+    for part in parts:
+        os.remove(part)
+
+
+def write_synthetic_dataset(generate_chunk: ChunkGenerator, num_samples: int, filename: str, seed: Optional[int] = None,
+                            chunk_rows: int = DEFAULT_CHUNK_ROWS, workers: int = 1,
+                            output_format: Optional[str] = None) -> int:
+    """
+    Generates 'num_samples' rows with 'generate_chunk' and writes them to 'filename' as CSV or Parquet.
+    With workers > 1 each process writes a contiguous run of chunks to a part file and the parts
+    are concatenated in order. 'generate_chunk' must be a module-level function so it can be pickled.
+    """
+    output_format = resolve_output_format(filename, output_format)
+    sizes = _chunk_sizes(num_samples, max(1, chunk_rows))
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = max(1, min(workers, len(sizes)))
+    if workers == 1:
+        return _write_chunks(generate_chunk, filename, output_format, sizes, seeds)
+
+    bounds = np.linspace(0, len(sizes), workers + 1).astype(int)
+    parts = [f"{filename}.part{i:03d}" for i in range(workers)]
+    # spawn, like the inference pool: each worker starts from a clean interpreter
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = [
+                pool.submit(_write_chunks, generate_chunk, part, output_format, sizes[start:stop], seeds[start:stop], i == 0)
+                for i, (part, start, stop) in enumerate(zip(parts, bounds[:-1], bounds[1:]))
+            ]
+            written = sum(future.result() for future in futures)
+    except BaseException:
+        for part in parts: # The pool has exited, so no worker is still writing
+            if os.path.exists(part):
+                os.remove(part)
+        raise
+    _merge_parts(parts, filename, output_format)
+    return written
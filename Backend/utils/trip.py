@@ -0,0 +1,130 @@
+# Backend/utils/trip.py
+# Trip simulation: a trip is a list of segments, each driven under its own conditions (speed,
+# slope, temperature, HVAC ...). The models predict the range for one charge/tank level under one
+# set of conditions; a segment of d km with predicted range R is charged 100 * d / R percentage
+# points (R read as the distance one full level lasts under those conditions), so the level falls
+# linearly with distance and runs out. The trained models keep predicting a few hundred km at 0%,
+# so taking d / R of the level left instead would only ever decay geometrically and never run out.
+# Each segment's starting level depends on every segment before it; rather than one predict call
+# per segment, the whole trip is scored in a few batched passes. The first pass predicts every
+# segment at the trip's starting level; each pass recomputes the trajectory with one cumulative
+# sum, and the next one re-predicts, in one batch, the segments whose starting level has since
+# moved by more than the tolerance, until none has.
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from pydantic import BaseModel
+
+from Backend.config import TRIP_MAX_PASSES, TRIP_MAX_SEGMENTS, TRIP_TOLERANCE_PERCENT
+from Backend.utils.dataset import CATEGORICAL_COLUMNS
+
+# Input field holding the charge/tank level, per model
+LEVEL_COLUMNS = {"ev": "battery_percentage", "hv": "hydrogen_percentage"}
+
+
+def used_percentage(distance_km, range_km):
+    """Level (percentage points) used to drive 'distance_km' where the predicted range is 'range_km'."""
+    with np.errstate(divide="ignore"):
+        return np.where(range_km > 0, 100.0 * distance_km / np.maximum(range_km, 1e-9), np.inf)
+
+
+class TripError(ValueError):
+    """The trip cannot be simulated (the routes answer it with 400)."""
+
+
+def build_trip_frame(vehicle: Dict[str, Any], segments: Sequence[BaseModel],
+                     extra_checks: Callable[[Dict[str, Any]], List[str]] | None = None,
+                     max_segments: int = TRIP_MAX_SEGMENTS) -> Tuple[pd.DataFrame, np.ndarray]:
+    """
+    One model input row per segment: the vehicle's fields, overridden by the fields each segment
+    sets. Returns the frame and the segment distances. 'extra_checks' runs once per distinct
+    combination of categorical values, not once per segment. Raises TripError.
+    """
+    if not segments:
+        raise TripError("A trip needs at least one segment.")
+    if len(segments) > max_segments:
+        raise TripError(f"The trip has {len(segments)} segments; at most {max_segments} are allowed.")
+    # Read column by column: much cheaper than .dict() per segment for thousands of them
+    overrides = pd.DataFrame({field: [getattr(segment, field) for segment in segments]
+                              for field in type(segments[0]).model_fields})
+    distances = overrides.pop("distance_km").to_numpy(dtype=np.float64)
+    bad = np.flatnonzero(~np.isfinite(distances) | (distances < 0))
+    if len(bad):
+        raise TripError(f"Segment {bad[0]}: distance_km must be a finite, non-negative number.")
+
+    frame = pd.DataFrame(vehicle, index=pd.RangeIndex(len(segments)))
+    for col in overrides.columns:
+        values = overrides[col]
+        given = values.notna()
+        if given.all():
+            frame[col] = values
+        elif given.any():
+            frame[col] = values.where(given, vehicle[col])
+
+    categoricals = [col for col in CATEGORICAL_COLUMNS if col in overrides.columns]
+    if extra_checks and categoricals:
+        for i, row in frame[categoricals].drop_duplicates().iterrows():
+            errors = extra_checks({**vehicle, **row.to_dict()})
+            if errors:
+                raise TripError(f"Segment {i}: {errors[0]}")
+    return frame, distances
+
+
+def simulate_trip(frame: pd.DataFrame, distances: np.ndarray, level_column: str,
+                  score: Callable[[pd.DataFrame], np.ndarray], reserve: float = 0.0,
+                  max_passes: int = TRIP_MAX_PASSES, tolerance: float = TRIP_TOLERANCE_PERCENT) -> Dict[str, Any]:
+    """
+    Carries the charge/tank level through the segments of 'frame'. 'score' returns the predicted
+    range of every row of the frame it is given (one batched predict call per pass).
+    """
+    n = len(frame)
+    start = float(frame[level_column].iloc[0])
+    starts = np.full(n, start)
+    ranges = np.empty(n)
+    scored_at = np.full(n, np.nan) # Level each segment's range was last predicted at
+    passes = 0
+    while True:
+        # Only segments whose starting level moved since they were scored are scored again
+        stale = np.flatnonzero(~(np.abs(starts - scored_at) <= tolerance))
+        if not len(stale) or passes == max_passes:
+            break
+        predictions = np.asarray(score(frame.iloc[stale].assign(**{level_column: starts[stale]})), dtype=np.float64)
+        if not np.isfinite(predictions).all():
+            raise ValueError("Model returned invalid predictions for the trip.")
+        ranges[stale], scored_at[stale] = predictions, starts[stale]
+        passes += 1
+        left = start - np.cumsum(used_percentage(distances, ranges)) # Below 0 once the level ran out
+        ends = np.maximum(left, 0.0)
+        starts = np.concatenate(([start], ends[:-1]))
+    converged = not len(stale)
+
+    used = starts - ends
+    reachable = left >= reserve
+    unreachable = np.flatnonzero(~reachable)
+    cumulative = np.cumsum(distances)
+    if len(unreachable):
+        first = int(unreachable[0])
+        # The level falls linearly within a segment: how far the part above the reserve lasts
+        within = (starts[first] - reserve) * ranges[first] / 100.0 if ranges[first] > 0 else 0.0
+        reachable_km = cumulative[first] - distances[first] + np.clip(within, 0.0, distances[first])
+    else:
+        first, reachable_km = None, cumulative[-1]
+
+    segments = [
+        {"index": i, "start_percentage": s, "predicted_range_km": r, "used_percentage": u,
+         "remaining_percentage": e, "reachable": ok}
+        for i, (s, r, u, e, ok) in enumerate(zip(
+            np.round(starts, 2).tolist(), np.round(ranges, 2).tolist(), np.round(used, 2).tolist(),
+            np.round(ends, 2).tolist(), reachable.tolist()))
+    ]
+    return {
+        "feasible": first is None,
+        "total_distance_km": round(float(cumulative[-1]), 2),
+        "reachable_distance_km": round(float(reachable_km), 2),
+        "first_unreachable_segment": first,
+        "remaining_percentage": round(float(ends[-1]), 2),
+        "passes": passes,
+        "converged": converged,
+        "segments": segments,
+    }